@@ -6,7 +6,7 @@ This script serves as a simple wrapper around the pipeline module.
 """
 
 import sys
-from src import main
+from src.data_archive_ml_synthesizer.pipeline import main
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -1,10 +1,27 @@
 """
 Package initialization for data_archive_ml_synthesizer.
 
-This file exposes key components from the package modules.
+This file exposes key components from the package modules. They are imported
+on first access, so importing the package does not load SDV, pandas or lxml.
 """
 
-from src.data_archive_ml_synthesizer.loader import DataLoader
-from src.data_archive_ml_synthesizer.model import GenerativeModel, ModelFactory
-from src.data_archive_ml_synthesizer.pipeline import main
-from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+import importlib
+
+# Exposed names and the modules defining them
+_EXPORTS = {
+    'DataLoader': 'src.data_archive_ml_synthesizer.loader',
+    'GenerativeModel': 'src.data_archive_ml_synthesizer.model',
+    'ModelFactory': 'src.data_archive_ml_synthesizer.model',
+    'main': 'src.data_archive_ml_synthesizer.pipeline',
+    'XMLReassembler': 'src.data_archive_ml_synthesizer.reassembler',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name]), name)
+    globals()[name] = value
+    return value
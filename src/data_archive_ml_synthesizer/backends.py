@@ -0,0 +1,326 @@
+"""
+Module for the registry of synthesizer backends.
+
+A backend is a pair of functions: one creating an unfitted synthesizer from
+the metadata and the configuration, one loading a synthesizer saved by it.
+Synthesizers offer fit(tables), sample(scale), reset_sampling() and
+save(path). The registry holds:
+
+- ``hma`` (alias ``multi_table``): SDV's HMASynthesizer
+- ``fast``: the NumPy FastSynthesizer
+- ``gaussian_copula`` and ``ctgan``: one SDV single-table synthesizer per
+  table, with the foreign keys re-linked from the children-per-parent counts
+
+The backends other than ``hma`` model the tables independently and fit them
+concurrently in ``model.fit_workers`` processes.
+
+Further backends can be registered with ``register_backend``, or named in
+``model.type`` as ``package.module:ClassName`` for a class taking the metadata
+and the configuration and offering a ``load`` class method.
+
+SDV and cloudpickle are imported when an SDV backend creates, saves or loads
+a synthesizer, not when the registry is imported.
+"""
+
+import importlib
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data_archive_ml_synthesizer.fast_synthesizer import FastSynthesizer
+from src.data_archive_ml_synthesizer.metadata_builder import load_sdv_metadata
+
+if TYPE_CHECKING:
+    from sdv.multi_table.hma import HMASynthesizer
+
+# Registered backends: name -> (create(metadata, config), load(path))
+_BACKENDS: Dict[str, Tuple[Callable[[Dict[str, Any], Dict[str, Any]], Any], Callable[[Path], Any]]] = {}
+
+# Alternative names of registered backends
+_ALIASES = {'multi_table': 'hma'}
+
+
+def register_backend(name: str, create: Callable[[Dict[str, Any], Dict[str, Any]], Any],
+                     load: Callable[[Path], Any]) -> None:
+    """
+    Register a synthesizer backend.
+
+    Args:
+        name: Name selected with ``model.type``.
+        create: Function creating an unfitted synthesizer from the metadata and the configuration.
+        load: Function loading a synthesizer saved by the backend.
+    """
+    _BACKENDS[name] = (create, load)
+
+
+def backend_names() -> List[str]:
+    """Return the names of the registered backends."""
+    return sorted(_BACKENDS)
+
+
+def resolve_backend(name: str) -> str:
+    """
+    Resolve a backend name or alias, importing ``module:Class`` backends on first use.
+
+    Args:
+        name: Backend name, alias or ``package.module:ClassName``.
+
+    Returns:
+        The registered name of the backend.
+
+    Raises:
+        ValueError: If the backend is unknown or cannot be imported.
+    """
+    name = _ALIASES.get(name, name)
+    if name not in _BACKENDS and ':' in name:
+        module_name, class_name = name.split(':', 1)
+        try:
+            backend_class = getattr(importlib.import_module(module_name), class_name)
+        except (ImportError, AttributeError) as e:
+            raise ValueError(f"Cannot import synthesizer backend '{name}': {str(e)}")
+        register_backend(name, backend_class, backend_class.load)
+    if name not in _BACKENDS:
+        raise ValueError(f"Unsupported model type '{name}', expected one of {', '.join(backend_names())}")
+    return name
+
+
+def create_backend(name: str, metadata: Dict[str, Any], config: Dict[str, Any]) -> Any:
+    """
+    Create an unfitted synthesizer of a backend.
+
+    Args:
+        name: Backend name, alias or ``package.module:ClassName``.
+        metadata: SDV-compatible metadata as a dictionary.
+        config: Configuration dictionary.
+
+    Returns:
+        The synthesizer.
+    """
+    create, _ = _BACKENDS[resolve_backend(name)]
+    return create(metadata, config)
+
+
+def load_backend(name: str, model_path: Path) -> Any:
+    """
+    Load a synthesizer saved by a backend.
+
+    Args:
+        name: Backend name, alias or ``package.module:ClassName``.
+        model_path: Path of the saved synthesizer.
+
+    Returns:
+        The loaded synthesizer.
+    """
+    _, load = _BACKENDS[resolve_backend(name)]
+    return load(model_path)
+
+
+class _SingleTableModel:
+    """
+    Adapter fitting an SDV single-table synthesizer to a table's non-key columns.
+    """
+
+    def __init__(self, synthesizer_class: type, df: pd.DataFrame, table_metadata: Dict[str, Any],
+                 key_columns: List[str], seed: int):
+        """
+        Fit the synthesizer.
+
+        Args:
+            synthesizer_class: SDV single-table synthesizer class.
+            df: Training rows.
+            table_metadata: SDV metadata of the table.
+            key_columns: Primary and foreign key columns, which are left out.
+            seed: Seed of the synthesizer's random state.
+        """
+        from sdv.metadata import Metadata
+
+        self.columns = list(df.columns)
+        self.modeled = [column for column in self.columns if column not in key_columns]
+        columns = {column: spec for column, spec in table_metadata.get('columns', {}).items()
+                   if column in self.modeled}
+        metadata = Metadata.load_from_dict({'tables': {'table': {'columns': columns}}})
+        self.synthesizer = synthesizer_class(metadata)
+        self.synthesizer.fit(df[self.modeled])
+        self.reseed(seed)
+
+    def reseed(self, seed: int) -> None:
+        """
+        Reset the synthesizer's sampling state to a seed.
+
+        Args:
+            seed: Seed of the random state.
+        """
+        # SDV only exposes a reset to its fixed seed, so the seed is applied through the private setter
+        set_random_state = getattr(self.synthesizer, '_set_random_state', None)
+        if set_random_state is not None:
+            set_random_state(seed)
+        else:
+            self.synthesizer.reset_sampling()
+
+    def sample(self, n: int, rng: np.random.Generator) -> Dict[str, Any]:
+        """
+        Sample the non-key columns of n rows.
+
+        Args:
+            n: Number of rows.
+            rng: Unused, the synthesizer keeps its own random state.
+
+        Returns:
+            Dictionary mapping column names to sampled values.
+        """
+        if not self.modeled:
+            return {}
+        if n == 0:
+            return {column: np.array([], dtype=object) for column in self.modeled}
+        df = self.synthesizer.sample(num_rows=n)
+        return {column: df[column].to_numpy() for column in self.modeled}
+
+
+class IndependentSynthesizer(FastSynthesizer):
+    """
+    Synthesizer modeling each table with its own SDV single-table synthesizer.
+
+    The tables are fitted without their keys. Primary keys are generated and
+    foreign keys are re-linked to the sampled parents by drawing each parent's
+    number of children from the training distribution, as in FastSynthesizer.
+    """
+
+    def __init__(self, metadata: Dict[str, Any], synthesizer_class: type, random_seed: Optional[int] = None,
+                 workers: int = 1):
+        """
+        Initialize the IndependentSynthesizer.
+
+        Args:
+            metadata: SDV-compatible metadata as a dictionary.
+            synthesizer_class: SDV single-table synthesizer class used for every table.
+            random_seed: Seed restored by reset_sampling.
+            workers: Number of processes fitting tables concurrently.
+        """
+        self.synthesizer_class = synthesizer_class
+        super().__init__(metadata, random_seed, workers)
+
+    def _fit_table(self, df: pd.DataFrame, table_metadata: Dict[str, Any], key_columns: List[str],
+                   rng: np.random.Generator) -> _SingleTableModel:
+        """Fit an SDV single-table synthesizer to the table's non-key columns."""
+        return _SingleTableModel(self.synthesizer_class, df, table_metadata, key_columns,
+                                 int(rng.integers(2**31)))
+
+    def reset_sampling(self, seed: Optional[int] = None) -> None:
+        """
+        Restart the key counters and the random generators of all tables.
+
+        Args:
+            seed: Seed of the random generators. Defaults to the seed given at creation.
+        """
+        super().reset_sampling(seed)
+        for table_model in self.tables.values():
+            table_model.reseed(int(self.rng.integers(2**31)))
+
+    def save(self, file_path: Path) -> None:
+        """
+        Save the synthesizer to a file with cloudpickle, as SDV does.
+
+        Args:
+            file_path: Path of the file.
+        """
+        import cloudpickle
+
+        with open(file_path, 'wb') as f:
+            cloudpickle.dump(self, f)
+
+    @classmethod
+    def load(cls, file_path: Path) -> 'IndependentSynthesizer':
+        """
+        Load a synthesizer saved with save.
+
+        Args:
+            file_path: Path of the file.
+
+        Returns:
+            The loaded synthesizer.
+        """
+        import cloudpickle
+
+        with open(file_path, 'rb') as f:
+            return cloudpickle.load(f)
+
+
+def _fit_workers(model_config: Dict[str, Any]) -> int:
+    """Return the number of processes fitting tables concurrently, from ``model.fit_workers``."""
+    return int(model_config.get('fit_workers') or os.cpu_count() or 1)
+
+
+def _create_hma(metadata: Dict[str, Any], config: Dict[str, Any]) -> 'HMASynthesizer':
+    """Create an SDV HMASynthesizer."""
+    from sdv.multi_table.hma import HMASynthesizer
+    # Convert dictionary metadata to Metadata object (shared with the rest of the run)
+    return HMASynthesizer(metadata=load_sdv_metadata(metadata))
+
+
+def _load_hma(model_path: Path) -> 'HMASynthesizer':
+    """Load an SDV HMASynthesizer."""
+    from sdv.multi_table.hma import HMASynthesizer
+    return HMASynthesizer.load(model_path)
+
+
+def reset_sampling(synthesizer: Any, seed: int) -> None:
+    """
+    Reset a synthesizer's sampling state to a seed.
+
+    SDV's multi-table reset_sampling restores a fixed seed, and its sample
+    runs under that seed instead of the global NumPy state, so the seed is
+    applied to the synthesizer and to each of its table synthesizers through
+    their private random state.
+
+    Args:
+        synthesizer: Synthesizer of any backend.
+        seed: Seed of the random state.
+    """
+    if isinstance(synthesizer, FastSynthesizer):
+        synthesizer.reset_sampling(seed)
+        return
+    synthesizer.reset_sampling()
+    if hasattr(synthesizer, '_numpy_seed'):
+        synthesizer._numpy_seed = seed % 2**32
+    table_synthesizers = getattr(synthesizer, '_table_synthesizers', {})
+    # One seed per table, in table order, so a table's state does not depend on the dictionary order
+    table_seeds = np.random.SeedSequence(seed % 2**32).generate_state(len(table_synthesizers))
+    for table_seed, table_name in zip(table_seeds, sorted(table_synthesizers)):
+        table_synthesizer = table_synthesizers[table_name]
+        # Child tables of HMA get their model per parent row, drawn from the synthesizer's NumPy seed
+        if getattr(table_synthesizer, '_model', None) is not None:
+            table_synthesizer._set_random_state(int(table_seed))
+
+
+def _create_fast(metadata: Dict[str, Any], config: Dict[str, Any]) -> FastSynthesizer:
+    """Create a FastSynthesizer."""
+    model_config = config.get('model', {})
+    return FastSynthesizer(metadata, model_config.get('random_seed'), _fit_workers(model_config))
+
+
+def _create_independent(class_name: str) -> Callable[[Dict[str, Any], Dict[str, Any]], IndependentSynthesizer]:
+    """
+    Return a factory of IndependentSynthesizers using an SDV single-table synthesizer.
+
+    Args:
+        class_name: Name of the synthesizer class in ``sdv.single_table``.
+
+    Returns:
+        Function creating the synthesizer from the metadata and the configuration.
+    """
+    def create(metadata: Dict[str, Any], config: Dict[str, Any]) -> IndependentSynthesizer:
+        # Looked up on use, so that CTGAN's torch import is only paid when it is selected
+        synthesizer_class = getattr(importlib.import_module('sdv.single_table'), class_name)
+        model_config = config.get('model', {})
+        return IndependentSynthesizer(metadata, synthesizer_class, model_config.get('random_seed'),
+                                      _fit_workers(model_config))
+    return create
+
+
+register_backend('hma', _create_hma, _load_hma)
+register_backend('fast', _create_fast, FastSynthesizer.load)
+register_backend('gaussian_copula', _create_independent('GaussianCopulaSynthesizer'), IndependentSynthesizer.load)
+register_backend('ctgan', _create_independent('CTGANSynthesizer'), IndependentSynthesizer.load)
@@ -0,0 +1,288 @@
+"""
+Module for benchmarking the synthesizer backends.
+
+Each registered backend is trained on scaled copies of the input tables and
+samples as many rows as it was trained on. Every run happens in a fresh
+process, so that its peak resident set size can be measured. The benchmark
+reports the fit and sample times, the peak RSS and a fidelity score per
+table: one minus the Kolmogorov-Smirnov statistic for numerical and datetime
+columns and one minus the total variation distance for other columns,
+averaged over the columns. The children-per-parent count distributions of
+the relationships are compared the same way.
+
+Run it with ``python -m src.data_archive_ml_synthesizer.benchmark``.
+"""
+
+import argparse
+import copy
+import logging
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.data_archive_ml_synthesizer.backends import backend_names
+from src.data_archive_ml_synthesizer.loader import DataLoader
+from src.data_archive_ml_synthesizer.metadata_builder import MetadataBuilder
+from src.data_archive_ml_synthesizer.model import GenerativeModel
+from src.data_archive_ml_synthesizer.pipeline import load_config, setup_logging
+from src.data_archive_ml_synthesizer.sampler import Sampler
+
+
+def _ks_score(real: np.ndarray, synthetic: np.ndarray) -> float:
+    """
+    One minus the two-sample Kolmogorov-Smirnov statistic.
+
+    Args:
+        real: Real values without missing values.
+        synthetic: Synthetic values without missing values.
+
+    Returns:
+        Score between 0 and 1, 1 for identical distributions.
+    """
+    if not len(real) or not len(synthetic):
+        return float(len(real) == len(synthetic))
+    real, synthetic = np.sort(real), np.sort(synthetic)
+    points = np.concatenate([real, synthetic])
+    distance = np.abs(np.searchsorted(real, points, side='right') / len(real)
+                      - np.searchsorted(synthetic, points, side='right') / len(synthetic))
+    return float(1 - distance.max())
+
+
+def _tv_score(real: pd.Series, synthetic: pd.Series) -> float:
+    """
+    One minus the total variation distance of two categorical distributions.
+
+    Args:
+        real: Real values.
+        synthetic: Synthetic values.
+
+    Returns:
+        Score between 0 and 1, 1 for identical distributions.
+    """
+    real_frequencies = real.astype(str).value_counts(normalize=True)
+    synthetic_frequencies = synthetic.astype(str).value_counts(normalize=True)
+    frequencies = pd.concat([real_frequencies, synthetic_frequencies], axis=1).fillna(0)
+    return float(1 - 0.5 * np.abs(frequencies.iloc[:, 0] - frequencies.iloc[:, 1]).sum())
+
+
+def _numbers(series: pd.Series, sdtype: str) -> np.ndarray:
+    """Convert a numerical or datetime column to floats without missing values."""
+    if sdtype == 'datetime':
+        values = pd.to_datetime(series, errors='coerce', utc=True).dropna().astype('int64')
+    else:
+        values = pd.to_numeric(series, errors='coerce').dropna()
+    return values.to_numpy(dtype=np.float64)
+
+
+def fidelity_scores(real: Dict[str, pd.DataFrame], synthetic: Dict[str, pd.DataFrame],
+                    metadata: Dict[str, Any]) -> Dict[str, float]:
+    """
+    Score how closely synthetic tables follow the real ones.
+
+    Key columns are skipped. Relationships are scored by their children-per-parent
+    count distributions.
+
+    Args:
+        real: Dictionary mapping table names to real DataFrames.
+        synthetic: Dictionary mapping table names to synthetic DataFrames.
+        metadata: SDV-compatible metadata as a dictionary.
+
+    Returns:
+        Dictionary with a score per table, ``relationships`` and their mean as ``overall``.
+    """
+    relationships = metadata.get('relationships', [])
+    scores = {}
+    for table_name, real_df in real.items():
+        synthetic_df = synthetic.get(table_name)
+        if synthetic_df is None:
+            continue
+        table_metadata = metadata.get('tables', {}).get(table_name, {})
+        keys = {table_metadata.get('primary_key')} | {
+            relationship['child_foreign_key'] for relationship in relationships
+            if relationship['child_table_name'] == table_name
+        }
+        column_scores = []
+        for column, spec in table_metadata.get('columns', {}).items():
+            if column in keys or column not in real_df.columns or column not in synthetic_df.columns:
+                continue
+            sdtype = spec.get('sdtype')
+            if sdtype in ('numerical', 'datetime'):
+                column_scores.append(_ks_score(_numbers(real_df[column], sdtype),
+                                               _numbers(synthetic_df[column], sdtype)))
+            else:
+                column_scores.append(_tv_score(real_df[column], synthetic_df[column]))
+        if column_scores:
+            scores[table_name] = float(np.mean(column_scores))
+
+    relationship_scores = []
+    for relationship in relationships:
+        counts = []
+        for tables in (real, synthetic):
+            parent_keys = tables[relationship['parent_table_name']][relationship['parent_primary_key']]
+            child_keys = tables[relationship['child_table_name']][relationship['child_foreign_key']]
+            counts.append(child_keys.value_counts().reindex(parent_keys, fill_value=0).to_numpy(dtype=np.float64))
+        relationship_scores.append(_ks_score(*counts))
+    if relationship_scores:
+        scores['relationships'] = float(np.mean(relationship_scores))
+
+    scores['overall'] = float(np.mean(list(scores.values()))) if scores else 0.0
+    return scores
+
+
+def scale_tables(tables: Dict[str, pd.DataFrame], factor: int) -> Dict[str, pd.DataFrame]:
+    """
+    Concatenate copies of the tables, prefixing the IDs of copy ``i`` with ``c{i}_``.
+
+    Args:
+        tables: Dictionary mapping table names to DataFrames.
+        factor: Number of copies.
+
+    Returns:
+        Dictionary with the scaled DataFrames.
+    """
+    if factor <= 1:
+        return tables
+    copies = [Sampler._qualify_ids(tables, f"c{index}_") for index in range(factor)]
+    return {table_name: pd.concat([tables_copy[table_name] for tables_copy in copies], ignore_index=True)
+            for table_name in tables}
+
+
+def _peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_backend(config: Dict[str, Any], tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any],
+                 model_type: str) -> Dict[str, Any]:
+    """
+    Fit and sample one backend in a benchmark worker process.
+
+    Args:
+        config: Configuration dictionary.
+        tables: Dictionary mapping table names to the training DataFrames.
+        metadata: SDV-compatible metadata as a dictionary.
+        model_type: Backend to run.
+
+    Returns:
+        The fit and sample times in seconds, the sampled rows, the peak RSS in MB and the fidelity scores.
+    """
+    run_config = copy.deepcopy(config)
+    run_config.setdefault('model', {})['type'] = model_type
+    run_config.setdefault('output', {})['model_path'] = None
+    run_config.setdefault('cache', {})['enabled'] = False
+
+    model = GenerativeModel(run_config)
+    start_time = time.perf_counter()
+    model.train(tables, metadata)
+    fit_seconds = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    synthetic = model.sample({table_name: len(df) for table_name, df in tables.items()})
+    sample_seconds = time.perf_counter() - start_time
+
+    return {
+        'model_type': model_type,
+        'fit_seconds': fit_seconds,
+        'sample_seconds': sample_seconds,
+        'rows': {table_name: len(df) for table_name, df in synthetic.items()},
+        'peak_rss_mb': _peak_rss_mb(),
+        'fidelity': fidelity_scores(tables, synthetic, metadata),
+    }
+
+
+def benchmark_backends(config: Dict[str, Any], tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any],
+                       model_types: Optional[Sequence[str]] = None,
+                       scales: Sequence[int] = (1,)) -> List[Dict[str, Any]]:
+    """
+    Fit and sample every backend on scaled copies of the tables and measure its cost and fidelity.
+
+    The models are neither saved nor taken from the model cache. Each run
+    happens in its own spawned process.
+
+    Args:
+        config: Configuration dictionary.
+        tables: Dictionary mapping table names to the training DataFrames.
+        metadata: SDV-compatible metadata as a dictionary.
+        model_types: Backends to compare; defaults to all registered backends.
+        scales: Numbers of copies of the tables to train on.
+
+    Returns:
+        One result per backend and scale with the fit and sample times in seconds,
+        the peak RSS in MB and the fidelity scores.
+    """
+    logger = logging.getLogger(__name__)
+    model_types = list(model_types or backend_names())
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for scale in scales:
+        scaled = scale_tables(tables, scale)
+        for model_type in model_types:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(_run_backend, config, scaled, metadata, model_type).result()
+            result['scale'] = scale
+            logger.info(f"{model_type} x{scale}: fit {result['fit_seconds']:.2f}s, "
+                        f"sample {result['sample_seconds']:.2f}s, peak RSS {result['peak_rss_mb']:.0f} MB, "
+                        f"fidelity {result['fidelity']['overall']:.3f}")
+            results.append(result)
+    return results
+
+
+def cheapest_backend(results: List[Dict[str, Any]], min_fidelity: float) -> Optional[Dict[str, Any]]:
+    """
+    Pick the fastest run whose overall fidelity meets a bar.
+
+    Args:
+        results: Results of benchmark_backends for one scale.
+        min_fidelity: Minimum overall fidelity score.
+
+    Returns:
+        The result with the lowest fit plus sample time, or None if no run meets the bar.
+    """
+    eligible = [result for result in results if result['fidelity']['overall'] >= min_fidelity]
+    return min(eligible, key=lambda result: result['fit_seconds'] + result['sample_seconds'], default=None)
+
+
+def main():
+    """
+    Main entry point of the backend benchmark.
+    """
+    parser = argparse.ArgumentParser(description='Compare the cost and fidelity of the synthesizer backends')
+    parser.add_argument('--config', '-c', type=str, default='config.yaml',
+                        help='Path to configuration file (default: config.yaml)')
+    parser.add_argument('--types', nargs='+',
+                        help='Backends to compare (default: all registered backends)')
+    parser.add_argument('--scales', nargs='+', type=int, default=[1],
+                        help='Numbers of copies of the input to train on (default: 1)')
+    parser.add_argument('--min-fidelity', type=float, default=0.8,
+                        help='Fidelity bar for picking the cheapest backend (default: 0.8)')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    setup_logging(config)
+
+    dmdsec_df, file_df, structmap_df = DataLoader(config).load_data()
+    tables = {'dmdSec': dmdsec_df, 'file': file_df, 'structMap': structmap_df}
+    metadata = MetadataBuilder(config).build_metadata(dmdsec_df, file_df, structmap_df)
+
+    results = benchmark_backends(config, tables, metadata, args.types, args.scales)
+    print(f"{'backend':<16} {'scale':>6} {'fit [s]':>10} {'sample [s]':>11} {'peak RSS [MB]':>14} {'fidelity':>9}")
+    for result in results:
+        print(f"{result['model_type']:<16} {result['scale']:>6} {result['fit_seconds']:>10.2f} "
+              f"{result['sample_seconds']:>11.2f} {result['peak_rss_mb']:>14.0f} {result['fidelity']['overall']:>9.3f}")
+
+    for scale in args.scales:
+        best = cheapest_backend([result for result in results if result['scale'] == scale], args.min_fidelity)
+        choice = best['model_type'] if best else 'none'
+        print(f"Cheapest backend with fidelity >= {args.min_fidelity} at scale {scale}: {choice}")
+
+
+if __name__ == '__main__':
+    main()
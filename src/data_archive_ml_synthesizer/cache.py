@@ -0,0 +1,198 @@
+"""
+Module for caching parsed input tables on disk.
+
+This module provides a content-addressed cache for the validated DataFrames
+produced by the DataLoader. Entries are keyed by a hash of the input files'
+contents and the loader configuration, stored as uncompressed Arrow IPC files
+and memory-mapped when read back, so re-running the pipeline on unchanged
+inputs skips parsing entirely. The cache is capped in size and evicts the
+least recently used entries first.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+import pandas as pd
+
+
+# Bumped whenever the on-disk layout or the loader output changes incompatibly
+CACHE_VERSION = 3
+
+# Number of bytes hashed per read
+HASH_BLOCK_SIZE = 1 << 20
+
+# File touched on every access to track recency for LRU eviction
+ACCESS_MARKER = '.last_access'
+
+
+def hash_file(file_path: Path, hasher: Optional["hashlib.blake2b"] = None) -> "hashlib.blake2b":
+    """
+    Feed the contents of a file into a hash object.
+
+    Args:
+        file_path: Path to the file.
+        hasher: Existing hash object to update; a new BLAKE2b hash is created if omitted.
+
+    Returns:
+        The updated hash object.
+    """
+    hasher = hasher or hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            hasher.update(block)
+    return hasher
+
+
+class TableCache:
+    """
+    Class for storing and retrieving DataFrames keyed by input content.
+    """
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int):
+        """
+        Initialize the TableCache.
+
+        Args:
+            cache_dir: Directory holding the cache entries.
+            max_size_bytes: Total size above which least recently used entries are evicted.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.logger = logging.getLogger(__name__)
+
+    def make_key(self, input_files: Iterable[Path], settings: Dict[str, Any]) -> str:
+        """
+        Compute the cache key for a set of input files and loader settings.
+
+        Args:
+            input_files: Input files whose contents determine the loaded tables.
+            settings: JSON-serializable loader settings that affect the result.
+
+        Returns:
+            Hex digest identifying the cache entry.
+        """
+        hasher = hashlib.blake2b(digest_size=20)
+        hasher.update(f"v{CACHE_VERSION}".encode())
+        hasher.update(json.dumps(settings, sort_keys=True, default=str).encode())
+        for file_path in input_files:
+            hasher.update(str(file_path).encode())
+            hash_file(file_path, hasher)
+        return hasher.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Load the tables stored under a key.
+
+        Args:
+            key: Cache key returned by make_key.
+
+        Returns:
+            Dictionary mapping table names to DataFrames, or None on a cache miss.
+        """
+        import pyarrow as pa
+
+        entry_dir = self.cache_dir / key
+        if not entry_dir.is_dir():
+            return None
+
+        tables = {}
+        try:
+            with open(entry_dir / 'tables.json', 'r') as f:
+                manifest = json.load(f)
+            for table_name, arrow_string_columns in manifest.items():
+                with pa.memory_map(str(entry_dir / f"{table_name}.arrow"), 'r') as source:
+                    arrow_table = pa.ipc.open_file(source).read_all()
+                df = arrow_table.to_pandas(split_blocks=True)
+                # Arrow-backed string columns wrap the mapped buffers instead of Python objects
+                for column in arrow_string_columns:
+                    df[column] = pd.arrays.ArrowStringArray(arrow_table.column(column))
+                tables[table_name] = df
+        except (OSError, ValueError, pa.ArrowException) as e:
+            self.logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            return None
+
+        (entry_dir / ACCESS_MARKER).touch()
+        return tables
+
+    def put(self, key: str, tables: Dict[str, pd.DataFrame]) -> bool:
+        """
+        Store tables under a key and evict old entries if the cache is over its size cap.
+
+        The entry is written to a temporary directory and renamed into place, so
+        concurrent readers never see a partially written entry.
+
+        Args:
+            key: Cache key returned by make_key.
+            tables: Dictionary mapping table names to DataFrames.
+
+        Returns:
+            True if the entry was stored, False if the tables cannot be cached.
+        """
+        import pyarrow as pa
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        staging_dir = Path(tempfile.mkdtemp(prefix=f".{key}.", dir=self.cache_dir))
+
+        try:
+            for table_name, df in tables.items():
+                arrow_table = pa.Table.from_pandas(df, preserve_index=True)
+                with pa.OSFile(str(staging_dir / f"{table_name}.arrow"), 'wb') as sink:
+                    with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                        writer.write_table(arrow_table)
+            manifest = {
+                table_name: [
+                    column for column, dtype in df.dtypes.items()
+                    if isinstance(dtype, pd.StringDtype) and dtype.storage == 'pyarrow'
+                ]
+                for table_name, df in tables.items()
+            }
+            with open(staging_dir / 'tables.json', 'w') as f:
+                json.dump(manifest, f)
+            (staging_dir / ACCESS_MARKER).touch()
+
+            if (self.cache_dir / key).exists():
+                # Another run stored the same entry in the meantime
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                return True
+            os.replace(staging_dir, self.cache_dir / key)
+        except (OSError, pa.ArrowException) as e:
+            self.logger.warning(f"Could not cache tables under {key}: {str(e)}")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            return False
+
+        self._evict()
+        return True
+
+    def _entries(self) -> List[Path]:
+        """Return the complete entries in the cache directory."""
+        if not self.cache_dir.is_dir():
+            return []
+        return [path for path in self.cache_dir.iterdir() if path.is_dir() and not path.name.startswith('.')]
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits its size cap.
+        """
+        entries = []
+        for entry_dir in self._entries():
+            size = sum(path.stat().st_size for path in entry_dir.iterdir())
+            marker = entry_dir / ACCESS_MARKER
+            last_access = marker.stat().st_mtime if marker.exists() else 0.0
+            entries.append((last_access, size, entry_dir))
+
+        total_size = sum(size for _, size, _ in entries)
+        for last_access, size, entry_dir in sorted(entries):
+            if total_size <= self.max_size_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total_size -= size
+            idle = time.time() - last_access
+            self.logger.info(f"Evicted cache entry {entry_dir.name} ({size / 1e6:.1f} MB, idle {idle:.0f}s)")
@@ -0,0 +1,393 @@
+"""
+Module for enforcing domain rules on synthetic tables.
+
+Synthesizers do not know the rules that hold between columns, so sampled rows
+can have a modification date before their creation date, a negative size or a
+checksum whose length does not fit its algorithm. Constraints are declared in
+the ``constraints`` section of the configuration, each with a ``type``, the
+``table`` it applies to and an ``action``:
+
+- ``repair`` (default): violating values are fixed in place
+- ``reject``: violating rows are dropped together with their children, and
+  references to them are cleared
+- ``report``: violations are only counted, for rules the training data itself
+  does not always follow
+
+Constraint types:
+
+- ``order``: ``low`` <= ``high`` for two numerical or datetime columns;
+  repaired by swapping the two values
+- ``range``: ``column`` between ``min`` and ``max``; repaired by clipping
+- ``parent_match``: ``column`` equals ``parent_column`` of the parent row in
+  ``parent_table``, joined on ``foreign_key``; repaired by copying the parent's value
+- ``length``: the length of ``column`` is ``lengths[by]`` for the value of the
+  ``by`` column; repaired by drawing random characters from ``alphabet``
+  (hexadecimal digits by default)
+
+Every check and repair works on whole columns, so a constraint takes time
+linear in the number of rows. The number of violations and the time taken are
+reported per constraint.
+"""
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data_archive_ml_synthesizer.model import CHILD_REFERENCES
+
+
+# Characters of repaired values of length constraints by default
+HEX_DIGITS = '0123456789abcdef'
+
+# Supported constraint actions
+ACTIONS = ('repair', 'reject', 'report')
+
+
+def _writable(df: pd.DataFrame, column: str) -> pd.DataFrame:
+    """Return a copy of the DataFrame in which the column accepts values outside its categories."""
+    df = df.copy()
+    if isinstance(df[column].dtype, pd.CategoricalDtype):
+        df[column] = df[column].astype(object)
+    return df
+
+
+class Constraint(ABC):
+    """
+    Base class of the constraints on a synthetic table.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        """
+        Initialize the constraint from its configuration.
+
+        Args:
+            spec: Dictionary with the ``type``, ``table``, ``action``, an optional ``name``
+                  and the parameters of the constraint type.
+
+        Raises:
+            ValueError: If the action is not supported.
+        """
+        self.table = spec['table']
+        self.action = spec.get('action', 'repair')
+        if self.action not in ACTIONS:
+            raise ValueError(f"Unsupported constraint action '{self.action}', expected one of {', '.join(ACTIONS)}")
+        self.name = spec.get('name') or f"{spec['type']}:{self.table}.{'/'.join(self.columns(spec))}"
+
+    @staticmethod
+    @abstractmethod
+    def columns(spec: Dict[str, Any]) -> List[str]:
+        """Return the columns of the constrained table that a specification refers to."""
+
+    @abstractmethod
+    def required(self) -> Dict[str, List[str]]:
+        """Return the columns needed per table."""
+
+    @abstractmethod
+    def violations(self, tables: Dict[str, pd.DataFrame]) -> np.ndarray:
+        """
+        Find the rows breaking the constraint.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+
+        Returns:
+            Boolean mask over the rows of the constrained table.
+        """
+
+    @abstractmethod
+    def repair(self, tables: Dict[str, pd.DataFrame], mask: np.ndarray, rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Fix the violating rows.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+            mask: Violating rows of the constrained table.
+            rng: Random generator.
+
+        Returns:
+            The repaired table.
+        """
+
+
+class OrderConstraint(Constraint):
+    """
+    Constraint keeping one column at most another, for numbers or dates.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.low = spec['low']
+        self.high = spec['high']
+        super().__init__(spec)
+
+    @staticmethod
+    def columns(spec: Dict[str, Any]) -> List[str]:
+        return [spec['low'], spec['high']]
+
+    def required(self) -> Dict[str, List[str]]:
+        return {self.table: [self.low, self.high]}
+
+    def violations(self, tables: Dict[str, pd.DataFrame]) -> np.ndarray:
+        df = tables[self.table]
+        low, high = df[self.low], df[self.high]
+        if pd.api.types.is_numeric_dtype(low) and pd.api.types.is_numeric_dtype(high):
+            return (low > high).to_numpy(dtype=bool)
+        # Missing or unparsable dates compare as false
+        low = pd.to_datetime(low, errors='coerce', utc=True)
+        high = pd.to_datetime(high, errors='coerce', utc=True)
+        return (low > high).to_numpy(dtype=bool)
+
+    def repair(self, tables: Dict[str, pd.DataFrame], mask: np.ndarray, rng: np.random.Generator) -> pd.DataFrame:
+        df = _writable(_writable(tables[self.table], self.low), self.high)
+        low = df[self.low].to_numpy(dtype=object)[mask]
+        df.loc[mask, self.low] = df.loc[mask, self.high].to_numpy(dtype=object)
+        df.loc[mask, self.high] = low
+        return df
+
+
+class RangeConstraint(Constraint):
+    """
+    Constraint keeping a numerical column within bounds.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.column = spec['column']
+        self.min = spec.get('min')
+        self.max = spec.get('max')
+        super().__init__(spec)
+
+    @staticmethod
+    def columns(spec: Dict[str, Any]) -> List[str]:
+        return [spec['column']]
+
+    def required(self) -> Dict[str, List[str]]:
+        return {self.table: [self.column]}
+
+    def violations(self, tables: Dict[str, pd.DataFrame]) -> np.ndarray:
+        values = pd.to_numeric(tables[self.table][self.column], errors='coerce')
+        mask = np.zeros(len(values), dtype=bool)
+        if self.min is not None:
+            mask |= (values < self.min).to_numpy(dtype=bool)
+        if self.max is not None:
+            mask |= (values > self.max).to_numpy(dtype=bool)
+        return mask
+
+    def repair(self, tables: Dict[str, pd.DataFrame], mask: np.ndarray, rng: np.random.Generator) -> pd.DataFrame:
+        df = _writable(tables[self.table], self.column)
+        values = pd.to_numeric(df[self.column], errors='coerce').clip(lower=self.min, upper=self.max)
+        df.loc[mask, self.column] = values[mask]
+        return df
+
+
+class ParentMatchConstraint(Constraint):
+    """
+    Constraint making a column agree with a column of the parent row.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.column = spec['column']
+        self.parent_table = spec['parent_table']
+        self.parent_column = spec['parent_column']
+        self.foreign_key = spec.get('foreign_key', 'dmd_id')
+        self.parent_key = spec.get('parent_key', self.foreign_key)
+        super().__init__(spec)
+
+    @staticmethod
+    def columns(spec: Dict[str, Any]) -> List[str]:
+        return [spec['column']]
+
+    def required(self) -> Dict[str, List[str]]:
+        return {self.table: [self.column, self.foreign_key], self.parent_table: [self.parent_key, self.parent_column]}
+
+    def _parent_values(self, tables: Dict[str, pd.DataFrame]) -> pd.Series:
+        """Look up the parent column for every row of the constrained table, missing for orphans."""
+        parent_df = tables[self.parent_table]
+        positions = pd.Index(parent_df[self.parent_key]).get_indexer(tables[self.table][self.foreign_key])
+        values = parent_df[self.parent_column].to_numpy(dtype=object)[np.maximum(positions, 0)] \
+            if len(parent_df) else np.full(len(positions), None, dtype=object)
+        return pd.Series(values, index=tables[self.table].index).where(positions >= 0)
+
+    def violations(self, tables: Dict[str, pd.DataFrame]) -> np.ndarray:
+        parent_values = self._parent_values(tables)
+        values = tables[self.table][self.column].astype(object)
+        return (parent_values.notna() & values.ne(parent_values)).to_numpy(dtype=bool)
+
+    def repair(self, tables: Dict[str, pd.DataFrame], mask: np.ndarray, rng: np.random.Generator) -> pd.DataFrame:
+        df = _writable(tables[self.table], self.column)
+        df.loc[mask, self.column] = self._parent_values(tables).to_numpy(dtype=object)[mask]
+        return df
+
+
+class LengthConstraint(Constraint):
+    """
+    Constraint tying the length of a string column to the value of another column.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.column = spec['column']
+        self.by = spec['by']
+        self.lengths = {str(key): int(length) for key, length in spec['lengths'].items()}
+        self.alphabet = spec.get('alphabet', HEX_DIGITS)
+        super().__init__(spec)
+
+    @staticmethod
+    def columns(spec: Dict[str, Any]) -> List[str]:
+        return [spec['column']]
+
+    def required(self) -> Dict[str, List[str]]:
+        return {self.table: [self.column, self.by]}
+
+    def _expected(self, df: pd.DataFrame) -> pd.Series:
+        """Expected length of every row, missing where the ``by`` value has no declared length."""
+        return df[self.by].astype(object).map(self.lengths, na_action='ignore')
+
+    def violations(self, tables: Dict[str, pd.DataFrame]) -> np.ndarray:
+        df = tables[self.table]
+        expected = self._expected(df)
+        lengths = df[self.column].astype('string').str.len()
+        return (expected.notna() & lengths.ne(expected).fillna(True)).to_numpy(dtype=bool)
+
+    def repair(self, tables: Dict[str, pd.DataFrame], mask: np.ndarray, rng: np.random.Generator) -> pd.DataFrame:
+        df = _writable(tables[self.table], self.column)
+        expected = self._expected(df).to_numpy(dtype=object)
+        alphabet = np.frombuffer(self.alphabet.encode('ascii'), dtype=np.uint8)
+        values = df[self.column].to_numpy(dtype=object)
+        # Draw the characters of all values of one length as a single byte matrix
+        for length in set(expected[mask]):
+            rows = mask & (expected == length)
+            codes = alphabet[rng.integers(len(alphabet), size=(int(rows.sum()), int(length)))]
+            values[rows] = np.char.decode(codes.view(f"S{int(length)}").ravel(), 'ascii').astype(object)
+        df[self.column] = values
+        return df
+
+
+# Constraint class per type
+CONSTRAINT_TYPES = {
+    'order': OrderConstraint,
+    'range': RangeConstraint,
+    'parent_match': ParentMatchConstraint,
+    'length': LengthConstraint,
+}
+
+
+class ConstraintEngine:
+    """
+    Class for checking, repairing and rejecting synthetic rows against declared constraints.
+    """
+
+    def __init__(self, specs: List[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ConstraintEngine.
+
+        Args:
+            specs: Constraint specifications from the ``constraints`` configuration section.
+            metadata: SDV-compatible metadata, whose keys and relationships are used to reject rows with their children.
+
+        Raises:
+            ValueError: If a constraint type or action is not supported.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.metadata = metadata or {}
+        self.constraints = []
+        for spec in specs:
+            constraint_class = CONSTRAINT_TYPES.get(spec.get('type'))
+            if constraint_class is None:
+                error_msg = f"Unsupported constraint type '{spec.get('type')}', " \
+                            f"expected one of {', '.join(CONSTRAINT_TYPES)}"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+            self.constraints.append(constraint_class(spec))
+        # Violations and time per constraint of the last apply call
+        self.report: List[Dict[str, Any]] = []
+
+    def apply(self, tables: Dict[str, pd.DataFrame], seed: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Enforce the constraints in their configured order.
+
+        Constraints on tables or columns missing from the input are skipped.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+            seed: Seed of the random repairs.
+
+        Returns:
+            Dictionary with the repaired tables and without the rejected rows.
+        """
+        rng = np.random.default_rng(seed)
+        tables = dict(tables)
+        self.report = []
+        for constraint in self.constraints:
+            start_time = time.perf_counter()
+            missing = [f"{table_name}.{column}" for table_name, columns in constraint.required().items()
+                       for column in columns
+                       if table_name not in tables or column not in tables[table_name].columns]
+            if missing:
+                self.logger.warning(f"Skipping constraint {constraint.name}, missing {', '.join(missing)}")
+                continue
+
+            mask = constraint.violations(tables)
+            count = int(mask.sum())
+            if count and constraint.action == 'repair':
+                tables[constraint.table] = constraint.repair(tables, mask, rng)
+            elif count and constraint.action == 'reject':
+                tables = self._reject(tables, constraint.table, mask)
+
+            seconds = time.perf_counter() - start_time
+            self.report.append({
+                'name': constraint.name,
+                'table': constraint.table,
+                'action': constraint.action,
+                'rows': len(mask),
+                'violations': count,
+                'seconds': seconds,
+            })
+            self.logger.info(f"Constraint {constraint.name}: {count} of {len(mask)} {constraint.table} rows "
+                             f"violated, {constraint.action}ed in {seconds:.3f}s")
+        return tables
+
+    def _reject(self, tables: Dict[str, pd.DataFrame], table_name: str, mask: np.ndarray) -> Dict[str, pd.DataFrame]:
+        """
+        Drop rows together with the child rows referencing them, and clear other references to them.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+            table_name: Table of the dropped rows.
+            mask: Rows to drop.
+
+        Returns:
+            Dictionary with the remaining rows.
+        """
+        table_metadata = self.metadata.get('tables', {})
+        removed: Dict[str, pd.Index] = {}
+        pending = [(table_name, mask)]
+        while pending:
+            name, drop = pending.pop()
+            df = tables[name]
+            key = table_metadata.get(name, {}).get('primary_key')
+            if key and key in df.columns:
+                removed[name] = pd.Index(df[key].to_numpy()[drop]).append(removed.get(name, pd.Index([])))
+            tables[name] = df.loc[~drop].reset_index(drop=True)
+            if name not in removed:
+                continue
+            for relationship in self.metadata.get('relationships', []):
+                child_name = relationship['child_table_name']
+                if relationship['parent_table_name'] != name or child_name not in tables:
+                    continue
+                child_keys = tables[child_name][relationship['child_foreign_key']]
+                orphans = child_keys.isin(removed[name]).to_numpy(dtype=bool)
+                if orphans.any():
+                    pending.append((child_name, orphans))
+
+        for name, column, referenced_table, _ in CHILD_REFERENCES:
+            df = tables.get(name)
+            if df is None or column not in df.columns or referenced_table not in removed:
+                continue
+            cleared = df[column].isin(removed[referenced_table]).to_numpy(dtype=bool)
+            if cleared.any():
+                df = df.copy()
+                df.loc[cleared, column] = None
+                tables[name] = df
+        return tables
@@ -0,0 +1,529 @@
+"""
+Module for a lightweight NumPy synthesizer.
+
+HMA models the dependencies between parent and child tables in detail, which
+makes fitting and sampling slow for bulk test-data generation. The
+FastSynthesizer trades that detail for speed. Each table is modeled by the
+empirical marginals of its columns, joined by a Gaussian copula over their
+normal scores, and each parent-child relationship by the empirical
+distribution of the number of children per parent. Fitting takes one sort per
+column and one correlation matrix per table; sampling is fully vectorized.
+
+The synthesizer offers the fit, sample, reset_sampling, save and load methods
+of the SDV synthesizers it stands in for.
+
+Since the tables are modeled independently, tables with at least
+CONCURRENT_FIT_ROWS training rows in total are fitted concurrently in a
+process pool. The input tables are then written once to Arrow IPC files
+that the workers memory-map (requires pyarrow), instead of being pickled to
+every worker, and the fitted table models are gathered back into the
+synthesizer, which is saved as one artifact.
+"""
+
+import logging
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Number of quantiles kept per numerical column
+QUANTILE_POINTS = 1001
+
+# Most frequent values kept per categorical column
+MAX_CATEGORIES = 10000
+
+# Rows used to estimate a table's copula correlation
+COPULA_ROWS = 100_000
+
+# Training rows from which tables are fitted in a process pool, below it starting the pool costs more
+CONCURRENT_FIT_ROWS = 100_000
+
+# Coefficients of Acklam's rational approximation of the inverse normal CDF
+_ICDF_A = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+           1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+_ICDF_B = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+           6.680131188771972e+01, -1.328068155288572e+01]
+_ICDF_C = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+           -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+_ICDF_D = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+           3.754408661907416e+00]
+
+
+def normal_ppf(u: np.ndarray) -> np.ndarray:
+    """
+    Inverse of the standard normal CDF (relative error below 1.2e-9).
+
+    Args:
+        u: Probabilities strictly between 0 and 1.
+
+    Returns:
+        Normal scores of the probabilities.
+    """
+    u = np.clip(np.asarray(u, dtype=np.float64), 1e-12, 1 - 1e-12)
+    z = np.empty_like(u)
+
+    low = u < 0.02425
+    high = u > 1 - 0.02425
+    mid = ~(low | high)
+
+    q = u[mid] - 0.5
+    r = q * q
+    z[mid] = (((((_ICDF_A[0] * r + _ICDF_A[1]) * r + _ICDF_A[2]) * r + _ICDF_A[3]) * r + _ICDF_A[4]) * r
+              + _ICDF_A[5]) * q / (((((_ICDF_B[0] * r + _ICDF_B[1]) * r + _ICDF_B[2]) * r + _ICDF_B[3]) * r
+                                    + _ICDF_B[4]) * r + 1)
+
+    for mask, sign, tail in ((low, 1.0, u[low]), (high, -1.0, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(tail))
+        z[mask] = sign * (((((_ICDF_C[0] * q + _ICDF_C[1]) * q + _ICDF_C[2]) * q + _ICDF_C[3]) * q + _ICDF_C[4]) * q
+                          + _ICDF_C[5]) / ((((_ICDF_D[0] * q + _ICDF_D[1]) * q + _ICDF_D[2]) * q + _ICDF_D[3]) * q + 1)
+    return z
+
+
+def normal_cdf(z: np.ndarray) -> np.ndarray:
+    """
+    Standard normal CDF (absolute error below 1.5e-7, Abramowitz and Stegun 7.1.26).
+
+    Args:
+        z: Normal scores.
+
+    Returns:
+        Probabilities of the scores.
+    """
+    x = np.abs(np.asarray(z, dtype=np.float64)) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * x)
+    erf = 1 - (((((1.061405429 * t - 1.453152027) * t) + 1.421413741) * t - 0.284496736) * t
+               + 0.254829592) * t * np.exp(-x * x)
+    return 0.5 * (1 + np.sign(z) * erf)
+
+
+class _ColumnModel:
+    """
+    Empirical marginal of one column.
+
+    Numerical and datetime columns keep evenly spaced quantiles, other columns
+    their most frequent values ordered by frequency. Both map values to and from
+    probabilities, which the copula turns into normal scores.
+    """
+
+    def __init__(self, series: pd.Series, sdtype: str):
+        """
+        Fit the marginal of a column.
+
+        Args:
+            series: Training values.
+            sdtype: SDV sdtype of the column.
+        """
+        self.null_rate = float(series.isna().mean()) if len(series) else 0.0
+        values = series.dropna()
+        self.kind = 'datetime' if sdtype == 'datetime' else 'numerical' if sdtype == 'numerical' else 'categorical'
+
+        if self.kind == 'categorical':
+            counts = values.astype(str).value_counts().head(MAX_CATEGORIES)
+            self.categories = counts.index.to_numpy(dtype=object)
+            frequencies = counts.to_numpy(dtype=np.float64)
+            self.cumulative = np.cumsum(frequencies) / frequencies.sum() if len(frequencies) else np.array([])
+            return
+
+        if self.kind == 'datetime':
+            # Dates stored as strings are sampled back as strings of the same shape
+            self.date_format = None
+            if len(values) and isinstance(values.iloc[0], str):
+                example = values.iloc[0]
+                self.date_format = '%Y-%m-%d' if len(example) <= 10 else \
+                    '%Y-%m-%dT%H:%M:%S' + ('Z' if example.endswith('Z') else '')
+            numbers = pd.to_datetime(values, errors='coerce', utc=True).dropna().astype('int64') \
+                .to_numpy(dtype=np.float64)
+        else:
+            numbers = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype=np.float64)
+        self.integer = self.kind == 'datetime' or (len(numbers) > 0 and bool(np.all(numbers == np.round(numbers))))
+        self.quantiles = np.quantile(numbers, np.linspace(0, 1, QUANTILE_POINTS)) if len(numbers) else np.array([])
+
+    def to_uniform(self, series: pd.Series) -> np.ndarray:
+        """
+        Map training values to probabilities by their mid-rank; missing values map to 0.5.
+
+        Args:
+            series: Training values.
+
+        Returns:
+            Probabilities of the values.
+        """
+        if self.kind == 'categorical':
+            codes = pd.Index(self.categories).get_indexer(series.astype(str))
+            lower = np.concatenate([[0.0], self.cumulative])
+            upper = np.concatenate([self.cumulative, [1.0]])
+            u = (lower[codes] + upper[codes]) / 2
+            u[codes < 0] = 0.5
+        else:
+            u = series.rank(pct=True, method='average').to_numpy(dtype=np.float64) - 0.5 / max(len(series), 1)
+            u[np.isnan(u)] = 0.5
+        return u
+
+    def from_uniform(self, u: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """
+        Map probabilities to column values, inserting missing values at the null rate.
+
+        Args:
+            u: Probabilities.
+            rng: Random generator for the missing values.
+
+        Returns:
+            Array of sampled values.
+        """
+        missing = rng.random(len(u)) < self.null_rate
+        if self.kind == 'categorical':
+            if not len(self.categories):
+                return np.full(len(u), None, dtype=object)
+            values = self.categories[np.minimum(np.searchsorted(self.cumulative, u), len(self.categories) - 1)]
+            values = values.copy()
+            values[missing] = None
+            return values
+
+        if not len(self.quantiles):
+            return np.full(len(u), np.nan)
+        values = np.interp(u, np.linspace(0, 1, len(self.quantiles)), self.quantiles)
+        if self.integer:
+            values = np.round(values)
+        if self.kind == 'datetime':
+            dates = pd.Series(pd.to_datetime(values.astype(np.int64)))
+            if self.date_format:
+                return dates.dt.strftime(self.date_format).where(~missing, None).to_numpy(dtype=object)
+            return dates.where(~missing).to_numpy()
+        values[missing] = np.nan
+        return values
+
+
+class _TableModel:
+    """
+    Gaussian copula over the marginals of a table's non-key columns.
+    """
+
+    def __init__(self, df: pd.DataFrame, table_metadata: Dict[str, Any], key_columns: List[str],
+                 rng: np.random.Generator):
+        """
+        Fit the marginals and the copula correlation of a table.
+
+        Args:
+            df: Training rows.
+            table_metadata: SDV metadata of the table.
+            key_columns: Primary and foreign key columns, which are generated rather than modeled.
+            rng: Random generator for the rows used to estimate the correlation.
+        """
+        sdtypes = {column: spec.get('sdtype') for column, spec in table_metadata.get('columns', {}).items()}
+        self.columns = list(df.columns)
+        self.modeled = [column for column in self.columns if column not in key_columns]
+        self.dtypes = {column: df[column].dtype for column in self.modeled}
+        self.marginals = {column: _ColumnModel(df[column], sdtypes.get(column, 'categorical'))
+                          for column in self.modeled}
+
+        rows = df if len(df) <= COPULA_ROWS else df.iloc[np.sort(rng.choice(len(df), COPULA_ROWS, replace=False))]
+        if len(self.modeled) > 1 and len(rows) > 1:
+            scores = np.column_stack([normal_ppf(self.marginals[column].to_uniform(rows[column]))
+                                      for column in self.modeled])
+            correlation = np.nan_to_num(np.corrcoef(scores, rowvar=False))
+            np.fill_diagonal(correlation, 1.0)
+            # Shrink slightly towards the identity so the matrix stays positive definite
+            correlation = 0.99 * correlation + 0.01 * np.eye(len(self.modeled))
+            self.cholesky = np.linalg.cholesky(correlation)
+        else:
+            self.cholesky = np.eye(len(self.modeled))
+
+    def sample(self, n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        """
+        Sample the non-key columns of n rows.
+
+        Args:
+            n: Number of rows.
+            rng: Random generator.
+
+        Returns:
+            Dictionary mapping column names to sampled values.
+        """
+        if not self.modeled:
+            return {}
+        u = normal_cdf(rng.standard_normal((n, len(self.modeled))) @ self.cholesky.T)
+        return {column: self.marginals[column].from_uniform(u[:, i], rng) for i, column in enumerate(self.modeled)}
+
+
+def _fit_shared_table(synthesizer: 'FastSynthesizer', arrow_path: str, table_metadata: Dict[str, Any],
+                      key_columns: List[str], seed: int) -> Any:
+    """
+    Fit one table model in a worker process from a memory-mapped Arrow file.
+
+    Args:
+        synthesizer: Synthesizer whose table model is fitted.
+        arrow_path: Path of the Arrow IPC file holding the table.
+        table_metadata: SDV metadata of the table.
+        key_columns: Primary and foreign key columns.
+        seed: Seed of the table's random generator.
+
+    Returns:
+        The fitted table model.
+    """
+    import pyarrow as pa
+
+    with pa.memory_map(arrow_path, 'r') as source:
+        df = pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+    return synthesizer._fit_table(df, table_metadata, key_columns, np.random.default_rng(seed))
+
+
+class FastSynthesizer:
+    """
+    Multi-table synthesizer built from per-table copulas and children-per-parent counts.
+    """
+
+    def __init__(self, metadata: Dict[str, Any], random_seed: Optional[int] = None, workers: int = 1):
+        """
+        Initialize the FastSynthesizer with metadata.
+
+        Args:
+            metadata: SDV-compatible metadata as a dictionary.
+            random_seed: Seed restored by reset_sampling.
+            workers: Number of processes fitting tables concurrently.
+        """
+        self.metadata = metadata
+        self.random_seed = random_seed
+        self.workers = workers
+        self.logger = logging.getLogger(__name__)
+        self.tables: Dict[str, Any] = {}
+        self.table_sizes: Dict[str, int] = {}
+        # Children-per-parent counts and their probabilities per relationship
+        self.child_counts: Dict[int, np.ndarray] = {}
+        self.child_probabilities: Dict[int, np.ndarray] = {}
+        self.reset_sampling()
+
+    @property
+    def relationships(self) -> List[Dict[str, str]]:
+        """Parent-child relationships of the metadata."""
+        return self.metadata.get('relationships', [])
+
+    def fit(self, tables: Dict[str, pd.DataFrame]) -> None:
+        """
+        Fit the table models and the children-per-parent distributions.
+
+        Every table gets its own seed spawned from the random seed, so the result
+        does not depend on the number of workers.
+
+        Args:
+            tables: Dictionary mapping table names to training DataFrames.
+        """
+        seeds = np.random.SeedSequence(self.random_seed).spawn(len(tables))
+        jobs = {}
+        for (table_name, df), seed in zip(tables.items(), seeds):
+            table_metadata = self.metadata.get('tables', {}).get(table_name, {})
+            key_columns = [table_metadata.get('primary_key')] + [
+                relationship['child_foreign_key'] for relationship in self.relationships
+                if relationship['child_table_name'] == table_name
+            ]
+            jobs[table_name] = (table_metadata, key_columns, int(seed.generate_state(1)[0]))
+            self.table_sizes[table_name] = len(df)
+
+        workers = min(self.workers, len(tables))
+        concurrent = workers > 1 and sum(len(df) for df in tables.values()) >= CONCURRENT_FIT_ROWS
+        if concurrent and self._fit_tables_concurrently(tables, jobs, workers):
+            self.logger.info(f"Fitted {len(tables)} tables with {workers} workers")
+        else:
+            for table_name, (table_metadata, key_columns, seed) in jobs.items():
+                self.tables[table_name] = self._fit_table(tables[table_name], table_metadata, key_columns,
+                                                          np.random.default_rng(seed))
+
+        for index, relationship in enumerate(self.relationships):
+            parent_df = tables[relationship['parent_table_name']]
+            child_df = tables[relationship['child_table_name']]
+            positions = pd.Index(parent_df[relationship['parent_primary_key']]).get_indexer(
+                child_df[relationship['child_foreign_key']])
+            counts = np.bincount(positions[positions >= 0], minlength=len(parent_df))
+            values, frequencies = np.unique(counts, return_counts=True)
+            self.child_counts[index] = values
+            self.child_probabilities[index] = frequencies / frequencies.sum()
+
+        self.logger.info(f"Fitted fast synthesizer on {len(self.tables)} tables")
+
+    def _fit_tables_concurrently(self, tables: Dict[str, pd.DataFrame], jobs: Dict[str, Any], workers: int) -> bool:
+        """
+        Fit the table models in a process pool sharing the tables as memory-mapped Arrow files.
+
+        Args:
+            tables: Dictionary mapping table names to training DataFrames.
+            jobs: Dictionary mapping table names to their metadata, key columns and seed.
+            workers: Number of worker processes.
+
+        Returns:
+            True if the tables were fitted, False if pyarrow is not installed or a table
+            has columns that Arrow cannot store, such as object columns of mixed types.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.logger.warning("Fitting tables one after another, concurrent fitting requires pyarrow")
+            return False
+
+        # Converted before the pool is started, so that unsupported tables fall back to sequential fitting
+        arrow_tables = {}
+        for table_name in jobs:
+            try:
+                arrow_tables[table_name] = pa.Table.from_pandas(tables[table_name], preserve_index=False)
+            except pa.ArrowException as e:
+                self.logger.warning(f"Fitting tables one after another, {table_name} cannot be shared "
+                                    f"as Arrow: {str(e)}")
+                return False
+
+        with tempfile.TemporaryDirectory(prefix='fit-tables-') as share_dir:
+            futures = {}
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for table_name, (table_metadata, key_columns, seed) in jobs.items():
+                    arrow_path = os.path.join(share_dir, f"{table_name}.arrow")
+                    arrow_table = arrow_tables[table_name]
+                    with pa.OSFile(arrow_path, 'wb') as sink:
+                        with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                            writer.write_table(arrow_table)
+                    futures[table_name] = executor.submit(_fit_shared_table, self, arrow_path, table_metadata,
+                                                          key_columns, seed)
+                for table_name, future in futures.items():
+                    self.tables[table_name] = future.result()
+        return True
+
+    def _fit_table(self, df: pd.DataFrame, table_metadata: Dict[str, Any], key_columns: List[str],
+                   rng: np.random.Generator) -> Any:
+        """
+        Fit the model of a table's non-key columns.
+
+        Subclasses may return any model with a ``columns`` list of all the table's
+        columns and a ``sample(n, rng)`` method returning the non-key columns.
+
+        Args:
+            df: Training rows.
+            table_metadata: SDV metadata of the table.
+            key_columns: Primary and foreign key columns, which are generated rather than modeled.
+            rng: Random generator.
+
+        Returns:
+            The fitted table model.
+        """
+        return _TableModel(df, table_metadata, key_columns, rng)
+
+    def reset_sampling(self, seed: Optional[int] = None) -> None:
+        """
+        Restart the key counters and the random generator.
+
+        Args:
+            seed: Seed of the random generator. Defaults to the seed given at creation.
+        """
+        self.rng = np.random.default_rng(self.random_seed if seed is None else seed)
+        self.key_counters: Dict[str, int] = {}
+
+    def sample(self, scale: float = 1.0) -> Dict[str, pd.DataFrame]:
+        """
+        Sample all tables, sizing root tables by the scale and child tables by their parents.
+
+        Args:
+            scale: Ratio of sampled to training rows for the root tables.
+
+        Returns:
+            Dictionary mapping table names to sampled DataFrames.
+
+        Raises:
+            ValueError: If relationships form a cycle or refer to parent tables without a model.
+        """
+        child_tables = {relationship['child_table_name'] for relationship in self.relationships}
+        sampled: Dict[str, pd.DataFrame] = {}
+
+        pending = list(self.tables)
+        while pending:
+            remaining = len(pending)
+            for table_name in list(pending):
+                parents = [(index, relationship) for index, relationship in enumerate(self.relationships)
+                           if relationship['child_table_name'] == table_name]
+                if any(relationship['parent_table_name'] not in sampled for _, relationship in parents):
+                    continue
+
+                columns: Dict[str, Any] = {}
+                if table_name in child_tables:
+                    # Children follow the first relationship, further foreign keys are drawn from their parents
+                    index, relationship = parents[0]
+                    parent_keys = sampled[relationship['parent_table_name']][relationship['parent_primary_key']]
+                    counts = self.rng.choice(self.child_counts[index], size=len(parent_keys),
+                                             p=self.child_probabilities[index])
+                    n = int(counts.sum())
+                    columns[relationship['child_foreign_key']] = np.repeat(parent_keys.to_numpy(dtype=object), counts)
+                    for index, relationship in parents[1:]:
+                        keys = sampled[relationship['parent_table_name']][relationship['parent_primary_key']]
+                        columns[relationship['child_foreign_key']] = self.rng.choice(
+                            keys.to_numpy(dtype=object), size=n) if len(keys) else np.full(n, None, dtype=object)
+                else:
+                    n = int(round(self.table_sizes[table_name] * scale))
+
+                model = self.tables[table_name]
+                primary_key = self.metadata.get('tables', {}).get(table_name, {}).get('primary_key')
+                if primary_key:
+                    columns[primary_key] = self._next_keys(table_name, n)
+                columns.update(model.sample(n, self.rng))
+                sampled[table_name] = pd.DataFrame({column: columns[column] for column in model.columns})
+                pending.remove(table_name)
+
+            if len(pending) == remaining:
+                unresolved = [f"{relationship['parent_table_name']}.{relationship['parent_primary_key']} -> "
+                              f"{relationship['child_table_name']}.{relationship['child_foreign_key']}"
+                              for relationship in self.relationships if relationship['child_table_name'] in pending]
+                error_msg = f"Cannot sample {', '.join(pending)}: parents of the relationships " \
+                            f"{', '.join(unresolved)} are never sampled"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+
+        return {table_name: sampled[table_name] for table_name in self.tables}
+
+    def _next_keys(self, table_name: str, n: int) -> np.ndarray:
+        """
+        Generate n new primary keys for a table.
+
+        Args:
+            table_name: Name of the table.
+            n: Number of keys.
+
+        Returns:
+            Array of keys, unique until the next reset_sampling.
+        """
+        start = self.key_counters.get(table_name, 0)
+        self.key_counters[table_name] = start + n
+        return np.array([f"{table_name}-{i}" for i in range(start, start + n)], dtype=object)
+
+    def save(self, file_path: Path) -> None:
+        """
+        Save the synthesizer to a file.
+
+        Args:
+            file_path: Path of the file.
+        """
+        with open(file_path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @classmethod
+    def load(cls, file_path: Path) -> 'FastSynthesizer':
+        """
+        Load a synthesizer saved with save.
+
+        Args:
+            file_path: Path of the file.
+
+        Returns:
+            The loaded synthesizer.
+        """
+        with open(file_path, 'rb') as f:
+            return pickle.load(f)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Leave out the logger when pickling."""
+        state = self.__dict__.copy()
+        state.pop('logger', None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the logger after unpickling."""
+        self.__dict__.update(state)
+        self.logger = logging.getLogger(__name__)
@@ -0,0 +1,207 @@
+"""
+Module for checking referential integrity of the input tables.
+
+This module provides a vectorized check of the references between the three
+tables: file.dmd_id and structMap.dmd_id must point at a dmdSec row,
+structMap.file_id at a file row and structMap.parent_id at another structMap
+row, without the parent_id chain forming a cycle. Membership tests use
+pandas Index lookups and the parent chains are resolved by pointer jumping
+over NumPy arrays, so no per-row Python loops are involved.
+
+Depending on the configured mode, problems are reported, cause a failure, are
+repaired (dangling optional references are cleared) or the offending rows are
+dropped.
+"""
+
+import logging
+from typing import Dict, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Supported integrity modes
+INTEGRITY_MODES = ('warn', 'fail', 'repair', 'drop')
+
+
+def find_dangling(values: pd.Series, keys: pd.Series) -> np.ndarray:
+    """
+    Find non-null references that do not match any key.
+
+    Args:
+        values: Referencing column.
+        keys: Referenced primary key column.
+
+    Returns:
+        Boolean array marking the dangling references.
+    """
+    present = values.notna().to_numpy()
+    missing = pd.Index(keys.dropna().unique()).get_indexer(values) < 0
+    return present & missing
+
+
+def _resolve_parent_chains(struct_ids: pd.Series, parent_ids: pd.Series) -> np.ndarray:
+    """
+    Follow every div's chain of parent_id references to its end.
+
+    Each row points at the position of its parent, at a virtual ROOT node
+    (position n) when parent_id is null, or at a virtual DANGLING node
+    (position n + 1) when parent_id is unknown. Repeatedly replacing each pointer
+    by its pointer's pointer doubles the distance covered per step, so after
+    ceil(log2(n)) + 1 steps every chain has either reached one of the
+    self-looping virtual nodes or is trapped in a cycle, in which case it points
+    at a node on that cycle.
+
+    Args:
+        struct_ids: Primary keys of the structMap rows.
+        parent_ids: parent_id column of the structMap rows.
+
+    Returns:
+        Array with the end position of each row's chain.
+    """
+    num_rows = len(struct_ids)
+    root, dangling = num_rows, num_rows + 1
+
+    positions = pd.Index(struct_ids).get_indexer(parent_ids)
+    pointers = np.where(positions < 0, dangling, positions)
+    pointers = np.where(parent_ids.isna().to_numpy(), root, pointers)
+    pointers = np.concatenate([pointers, [root, dangling]])
+
+    for _ in range(max(1, int(np.ceil(np.log2(num_rows + 2)))) + 1):
+        pointers = pointers[pointers]
+
+    return pointers[:num_rows]
+
+
+class ReferentialIntegrityChecker:
+    """
+    Class for checking and enforcing referential integrity across the input tables.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the ReferentialIntegrityChecker with configuration.
+
+        Args:
+            config: Dictionary containing configuration parameters. The mode is read
+                    from ``input.integrity`` (default: 'warn').
+
+        Raises:
+            ValueError: If the configured mode is unknown.
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+        self.mode = config.get('input', {}).get('integrity', 'warn')
+
+        if self.mode not in INTEGRITY_MODES:
+            error_msg = f"Unknown integrity mode '{self.mode}', expected one of: {', '.join(INTEGRITY_MODES)}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    def check(self, tables: Dict[str, pd.DataFrame]) -> Tuple[Dict[str, pd.DataFrame], Dict[str, Dict[str, int]]]:
+        """
+        Check the references between the tables and enforce the configured mode.
+
+        Args:
+            tables: Dictionary with the 'dmdSec', 'file' and 'structMap' DataFrames.
+
+        Returns:
+            Tuple (tables, report). The tables are unchanged in 'warn' and 'fail'
+            mode. The report maps each table name to orphan counts per reference;
+            'parent_id_cycles' counts divs trapped in a parent_id cycle and
+            'unrooted' counts divs whose ancestry does not end at a root div.
+
+        Raises:
+            ValueError: In 'fail' mode, if any reference is broken.
+        """
+        dmdsec_df, file_df, structmap_df = tables['dmdSec'], tables['file'], tables['structMap']
+
+        file_orphans = find_dangling(file_df['dmd_id'], dmdsec_df['dmd_id'])
+        struct_dmd_orphans = find_dangling(structmap_df['dmd_id'], dmdsec_df['dmd_id'])
+        struct_file_orphans = (find_dangling(structmap_df['file_id'], file_df['file_id'])
+                               if 'file_id' in structmap_df.columns else np.zeros(len(structmap_df), dtype=bool))
+        parent_orphans = find_dangling(structmap_df['parent_id'], structmap_df['struct_id'])
+        chain_ends = _resolve_parent_chains(structmap_df['struct_id'], structmap_df['parent_id'])
+        in_cycle = chain_ends < len(structmap_df)
+
+        report = {
+            'file': {
+                'dmd_id': int(file_orphans.sum()),
+            },
+            'structMap': {
+                'dmd_id': int(struct_dmd_orphans.sum()),
+                'file_id': int(struct_file_orphans.sum()),
+                'parent_id': int(parent_orphans.sum()),
+                'parent_id_cycles': int(in_cycle.sum()),
+                'unrooted': int((chain_ends != len(structmap_df)).sum()),
+            },
+        }
+        self._log_report(report)
+
+        if not self.is_clean(report) and self.mode == 'fail':
+            error_msg = f"Referential integrity check failed: {report}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        if self.is_clean(report) or self.mode == 'warn':
+            return tables, report
+
+        # Files and divs cannot be re-attached to an unknown dmdSec, so they are dropped in both modes
+        file_df = file_df.loc[~file_orphans]
+        structmap_df = structmap_df.loc[~struct_dmd_orphans]
+        if 'file_id' in structmap_df.columns:
+            # Dropped files leave further dangling file pointers behind
+            struct_file_orphans = find_dangling(structmap_df['file_id'], file_df['file_id'])
+        else:
+            struct_file_orphans = np.zeros(len(structmap_df), dtype=bool)
+
+        if self.mode == 'repair':
+            structmap_df = structmap_df.copy()
+            structmap_df.loc[struct_file_orphans, 'file_id'] = None
+            parent_orphans = find_dangling(structmap_df['parent_id'], structmap_df['struct_id'])
+            structmap_df.loc[parent_orphans, 'parent_id'] = None
+            # Every cycle contains at least one chain end; making those roots breaks all cycles
+            chain_ends = _resolve_parent_chains(structmap_df['struct_id'], structmap_df['parent_id'])
+            cycle_entries = np.zeros(len(structmap_df), dtype=bool)
+            cycle_entries[np.unique(chain_ends[chain_ends < len(structmap_df)])] = True
+            structmap_df.loc[cycle_entries, 'parent_id'] = None
+        else:
+            structmap_df = structmap_df.loc[~struct_file_orphans]
+            chain_ends = _resolve_parent_chains(structmap_df['struct_id'], structmap_df['parent_id'])
+            structmap_df = structmap_df.loc[chain_ends == len(structmap_df)]
+
+        repaired = {
+            'dmdSec': dmdsec_df,
+            'file': file_df.reset_index(drop=True),
+            'structMap': structmap_df.reset_index(drop=True),
+        }
+        self.logger.info(f"Integrity {self.mode}: file {len(tables['file'])} -> {len(repaired['file'])} rows, "
+                         f"structMap {len(tables['structMap'])} -> {len(repaired['structMap'])} rows")
+        return repaired, report
+
+    @staticmethod
+    def is_clean(report: Dict[str, Dict[str, int]]) -> bool:
+        """
+        Check whether a report contains no broken references.
+
+        Args:
+            report: Report returned by check.
+
+        Returns:
+            True if every orphan count is zero.
+        """
+        return all(count == 0 for counts in report.values() for count in counts.values())
+
+    def _log_report(self, report: Dict[str, Dict[str, int]]) -> None:
+        """
+        Log the orphan counts of a report.
+
+        Args:
+            report: Report returned by check.
+        """
+        for table_name, counts in report.items():
+            summary = ', '.join(f"{reference}={count}" for reference, count in counts.items())
+            if any(counts.values()):
+                self.logger.warning(f"Referential integrity issues in {table_name}: {summary}")
+            else:
+                self.logger.debug(f"Referential integrity of {table_name} OK: {summary}")
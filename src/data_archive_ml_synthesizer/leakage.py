@@ -0,0 +1,383 @@
+"""
+Module for detecting training data copied into synthetic tables.
+
+Most string columns are modeled as categoricals, so synthesizers reproduce
+titles, hrefs, checksums and identifiers of real records verbatim. The
+LeakageDetector indexes the training tables once and then scans synthetic
+tables chunk by chunk, batch after batch, for:
+
+- exact copies: per configured column, a sorted array of 64-bit hashes of the
+  real values, probed by binary search
+- row copies: per table, 64-bit fingerprints of whole rows over the columns
+  that are not IDs (``*_id``)
+- near duplicates: per configured text column, MinHash signatures of
+  character shingles, bucketed by LSH bands; a synthetic value sharing a
+  band with a real value is a near duplicate when their estimated Jaccard
+  similarity reaches ``similarity_threshold``, checked for every real value
+  of the shared buckets
+
+Shingles, signatures and band keys are computed for whole chunks with NumPy,
+so the scan is a single pass taking time linear in the number of rows, and the
+indexes hold fixed-size hashes only. Copies are counted per column and, with
+``privacy.action: redact``, copied values are replaced by nulls; row copies
+are only reported.
+"""
+
+import logging
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Default number of synthetic rows scanned at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Number of texts shingled at a time, which bounds the memory of the shingle matrix
+SHINGLE_CHUNK_SIZE = 4096
+
+# Texts are cut to this many characters before shingling
+MAX_TEXT_LENGTH = 1000
+
+# Multiplier of the rolling shingle and band hashes
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+# Seed of the MinHash functions, fixed so that indexes and scans agree
+MINHASH_SEED = 0x5EED
+
+# Supported actions on copies
+ACTIONS = ('report', 'redact')
+
+
+def _text_values(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a column to strings, skipping missing and empty values.
+
+    Args:
+        series: Column values.
+
+    Returns:
+        Tuple of the mask of present values and their strings.
+    """
+    values = series.astype(object)
+    present = values.notna().to_numpy(dtype=bool)
+    strings = values[present].astype(str)
+    nonempty = (strings.str.len() > 0).to_numpy(dtype=bool)
+    present[present] = nonempty
+    return present, strings[nonempty].to_numpy(dtype=object)
+
+
+def _value_hashes(strings: np.ndarray) -> np.ndarray:
+    """Hash strings to 64-bit integers with pandas' keyed hash, which is stable across processes."""
+    return pd.util.hash_array(strings)
+
+
+class _HashSet:
+    """
+    Sorted array of 64-bit hashes with vectorized membership tests.
+    """
+
+    def __init__(self, hashes: np.ndarray):
+        self.hashes = np.unique(hashes)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Return the mask of the hashes in the set."""
+        if not len(self.hashes):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.minimum(np.searchsorted(self.hashes, hashes), len(self.hashes) - 1)
+        return self.hashes[positions] == hashes
+
+
+class MinHashLSH:
+    """
+    MinHash signatures of character shingles with a banded LSH index.
+    """
+
+    def __init__(self, shingle_size: int = 4, num_perm: int = 64, bands: int = 16, threshold: float = 0.8):
+        """
+        Initialize the hash functions.
+
+        Args:
+            shingle_size: Number of characters per shingle.
+            num_perm: Number of MinHash functions, a multiple of the number of bands.
+            bands: Number of LSH bands.
+            threshold: Estimated Jaccard similarity from which a value is a near duplicate.
+
+        Raises:
+            ValueError: If num_perm is not a multiple of bands.
+        """
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.shingle_size = shingle_size
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        rng = np.random.default_rng(MINHASH_SEED)
+        # Multiply-shift hashing needs odd multipliers
+        self.multipliers = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.offsets = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.signatures = np.zeros((0, num_perm), dtype=np.uint32)
+        self.band_keys: List[np.ndarray] = []
+        self.band_rows: List[np.ndarray] = []
+
+    def _shingle_hashes(self, texts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Hash the shingles of texts as a matrix with one row per text.
+
+        Args:
+            texts: Non-empty strings.
+
+        Returns:
+            Tuple of the shingle hashes and the mask of the shingles within each text.
+        """
+        normalized = pd.Series(texts, dtype=object).str.lower().str.split().str.join(' ')
+        normalized = normalized.str.slice(0, MAX_TEXT_LENGTH)
+        lengths = normalized.str.len().to_numpy(dtype=np.int64)
+        width = max(int(lengths.max()), self.shingle_size)
+        codes = np.array(normalized.tolist(), dtype=f"U{width}").view(np.uint32).reshape(len(texts), width)
+        windows = width - self.shingle_size + 1
+        hashes = np.zeros((len(texts), windows), dtype=np.uint64)
+        for offset in range(self.shingle_size):
+            hashes = hashes * HASH_MULTIPLIER + codes[:, offset:offset + windows].astype(np.uint64)
+        # Texts shorter than a shingle keep their one zero-padded window
+        valid = np.arange(windows) < np.maximum(lengths - self.shingle_size + 1, 1)[:, None]
+        return hashes, valid
+
+    def signatures_of(self, texts: np.ndarray) -> np.ndarray:
+        """
+        Compute the MinHash signatures of texts.
+
+        Args:
+            texts: Non-empty strings.
+
+        Returns:
+            Matrix of 32-bit signatures with one row per text.
+        """
+        signatures = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for start in range(0, len(texts), SHINGLE_CHUNK_SIZE):
+            hashes, valid = self._shingle_hashes(texts[start:start + SHINGLE_CHUNK_SIZE])
+            for index in range(self.num_perm):
+                # The high half of a multiply-shift hash is a 32-bit universal hash
+                permuted = (hashes * self.multipliers[index] + self.offsets[index]) >> np.uint64(32)
+                signatures[start:start + len(hashes), index] = np.where(valid, permuted, 2**32 - 1).min(axis=1)
+        return signatures
+
+    def _band_keys(self, signatures: np.ndarray, band: int) -> np.ndarray:
+        """Combine the signature values of one band into 64-bit keys."""
+        keys = np.full(len(signatures), band, dtype=np.uint64)
+        for column in range(band * self.rows, (band + 1) * self.rows):
+            keys = keys * HASH_MULTIPLIER + signatures[:, column].astype(np.uint64)
+        return keys
+
+    def index(self, texts: np.ndarray) -> None:
+        """
+        Index the distinct real texts.
+
+        Args:
+            texts: Non-empty strings.
+        """
+        self.signatures = self.signatures_of(pd.unique(texts))
+        self.band_keys, self.band_rows = [], []
+        for band in range(self.bands):
+            keys = self._band_keys(self.signatures, band)
+            order = np.argsort(keys, kind='stable')
+            self.band_keys.append(keys[order])
+            self.band_rows.append(order)
+
+    def query(self, texts: np.ndarray) -> np.ndarray:
+        """
+        Find the texts with a near duplicate in the index.
+
+        In every band, the text is compared with all indexed texts of its bucket.
+
+        Args:
+            texts: Non-empty strings.
+
+        Returns:
+            Mask of the near duplicates.
+        """
+        found = np.zeros(len(texts), dtype=bool)
+        if not len(texts) or not len(self.signatures):
+            return found
+        signatures = self.signatures_of(texts)
+        for band in range(self.bands):
+            pending = np.flatnonzero(~found)
+            keys = self._band_keys(signatures[pending], band)
+            band_keys = self.band_keys[band]
+            # Buckets are runs of equal keys in the sorted band, one pair per text and bucket member
+            starts = np.searchsorted(band_keys, keys, side='left')
+            counts = np.searchsorted(band_keys, keys, side='right') - starts
+            total = int(counts.sum())
+            if not total:
+                continue
+            queries = np.repeat(pending, counts)
+            positions = np.repeat(starts - (np.cumsum(counts) - counts), counts) + np.arange(total)
+            real = self.signatures[self.band_rows[band][positions]]
+            similarity = (signatures[queries] == real).mean(axis=1)
+            found[queries[similarity >= self.threshold]] = True
+        return found
+
+
+class LeakageDetector:
+    """
+    Class for finding and redacting training values copied into synthetic tables.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the LeakageDetector with the ``privacy`` configuration section.
+
+        Args:
+            config: Dictionary containing configuration parameters.
+
+        Raises:
+            ValueError: If the action is not supported.
+        """
+        self.logger = logging.getLogger(__name__)
+        privacy_config = config.get('privacy', {})
+        self.action = privacy_config.get('action', 'report')
+        if self.action not in ACTIONS:
+            error_msg = f"Unsupported privacy action '{self.action}', expected one of {', '.join(ACTIONS)}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+        self.exact_columns: Dict[str, List[str]] = privacy_config.get('exact_columns', {})
+        self.near_duplicate_columns: Dict[str, List[str]] = privacy_config.get('near_duplicate_columns', {})
+        self.row_fingerprints = privacy_config.get('row_fingerprints', True)
+        self.chunk_size = int(privacy_config.get('chunk_size') or DEFAULT_CHUNK_SIZE)
+        self.lsh_params = {
+            'shingle_size': int(privacy_config.get('shingle_size', 4)),
+            'num_perm': int(privacy_config.get('num_perm', 64)),
+            'bands': int(privacy_config.get('bands', 16)),
+            'threshold': float(privacy_config.get('similarity_threshold', 0.8)),
+        }
+
+        self.exact_index: Dict[Tuple[str, str], _HashSet] = {}
+        self.row_index: Dict[str, Tuple[List[str], _HashSet]] = {}
+        self.near_index: Dict[Tuple[str, str], MinHashLSH] = {}
+        # Rows scanned and copies found per table, accumulated over all scans
+        self.report: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _row_columns(df: pd.DataFrame) -> List[str]:
+        """Return the columns of a table that take part in row fingerprints."""
+        return sorted(column for column in df.columns if not str(column).endswith('_id'))
+
+    @staticmethod
+    def _row_hashes(df: pd.DataFrame, columns: List[str]) -> np.ndarray:
+        """Fingerprint rows over the string forms of their values, with missing values as empty strings."""
+        text = pd.DataFrame({column: df[column].astype(object).where(df[column].notna(), '').astype(str)
+                             for column in columns})
+        return pd.util.hash_pandas_object(text, index=False).to_numpy()
+
+    def fit(self, tables: Dict[str, pd.DataFrame]) -> 'LeakageDetector':
+        """
+        Build the indexes of the real tables.
+
+        Args:
+            tables: Dictionary mapping table names to the training DataFrames.
+
+        Returns:
+            The fitted detector.
+        """
+        for table_name, df in tables.items():
+            for column in self.exact_columns.get(table_name, []):
+                if column in df.columns:
+                    _, strings = _text_values(df[column])
+                    self.exact_index[(table_name, column)] = _HashSet(_value_hashes(strings))
+            for column in self.near_duplicate_columns.get(table_name, []):
+                if column in df.columns:
+                    lsh = MinHashLSH(**self.lsh_params)
+                    lsh.index(_text_values(df[column])[1])
+                    self.near_index[(table_name, column)] = lsh
+            if self.row_fingerprints:
+                columns = self._row_columns(df)
+                if columns:
+                    self.row_index[table_name] = (columns, _HashSet(self._row_hashes(df, columns)))
+
+        self.logger.info(f"Indexed {len(self.exact_index)} columns for exact copies, "
+                         f"{len(self.near_index)} for near duplicates and {len(self.row_index)} tables for row copies")
+        return self
+
+    def scan(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Scan synthetic tables for copies and redact them if configured.
+
+        Args:
+            tables: Dictionary mapping table names to synthetic DataFrames.
+
+        Returns:
+            Dictionary with the synthetic tables, redacted if ``privacy.action`` is redact.
+        """
+        scanned = {}
+        for table_name, df in tables.items():
+            report = self.report.setdefault(table_name, {'rows': 0, 'row_copies': 0, 'exact': {},
+                                                         'near_duplicates': {}})
+            redact: Dict[str, np.ndarray] = {}
+            for start in range(0, len(df), self.chunk_size):
+                chunk = df.iloc[start:start + self.chunk_size]
+                for kind, masks in (('exact', self._exact_copies(table_name, chunk)),
+                                    ('near_duplicates', self._near_duplicates(table_name, chunk))):
+                    for column, mask in masks.items():
+                        report[kind][column] = report[kind].get(column, 0) + int(mask.sum())
+                        redact.setdefault(column, np.zeros(len(df), dtype=bool))[start:start + len(mask)] |= mask
+                if table_name in self.row_index:
+                    columns, row_hashes = self.row_index[table_name]
+                    if all(column in chunk.columns for column in columns):
+                        report['row_copies'] += int(row_hashes.contains(self._row_hashes(chunk, columns)).sum())
+            report['rows'] += len(df)
+
+            if self.action == 'redact' and any(mask.any() for mask in redact.values()):
+                df = df.copy()
+                for column, mask in redact.items():
+                    if mask.any():
+                        df[column] = df[column].astype(object)
+                        df.loc[mask, column] = None
+            scanned[table_name] = df
+        return scanned
+
+    def _exact_copies(self, table_name: str, chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return the mask of exact copies per indexed column of a chunk."""
+        masks = {}
+        for column in self.exact_columns.get(table_name, []):
+            index = self.exact_index.get((table_name, column))
+            if index is None or column not in chunk.columns:
+                continue
+            present, strings = _text_values(chunk[column])
+            mask = np.zeros(len(chunk), dtype=bool)
+            mask[present] = index.contains(_value_hashes(strings))
+            masks[column] = mask
+        return masks
+
+    def _near_duplicates(self, table_name: str, chunk: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Return the mask of near duplicates per indexed column of a chunk."""
+        masks = {}
+        for column in self.near_duplicate_columns.get(table_name, []):
+            lsh = self.near_index.get((table_name, column))
+            if lsh is None or column not in chunk.columns:
+                continue
+            present, strings = _text_values(chunk[column])
+            mask = np.zeros(len(chunk), dtype=bool)
+            mask[present] = lsh.query(strings)
+            masks[column] = mask
+        return masks
+
+    def log_report(self) -> None:
+        """Log the copy rates found so far, as warnings where copies were found."""
+        for table_name, report in self.report.items():
+            rows = report['rows']
+            if not rows:
+                continue
+            findings = [f"{count} row copies" for count in [report['row_copies']] if count]
+            findings += [f"{count} exact {column}" for column, count in report['exact'].items() if count]
+            findings += [f"{count} near-duplicate {column}" for column, count in report['near_duplicates'].items()
+                         if count]
+            if findings:
+                action = 'redacted' if self.action == 'redact' else 'found'
+                self.logger.warning(f"Training data copies in {rows} synthetic {table_name} rows {action}: "
+                                    f"{', '.join(findings)}")
+            else:
+                self.logger.info(f"No training data copies in {rows} synthetic {table_name} rows")
@@ -3,20 +3,245 @@ Module for loading and validating input JSON files.
 
 This module provides functionality to load the three JSON files
 (dmdSec.json, file.json, structMap.json) and perform basic validation
-of their structure.
+of their structure. Besides JSON arrays, the tables can also be read from
+NDJSON, Parquet and Arrow IPC files, with optional per-column dtypes, or be
+extracted directly from a directory of METS XML documents.
 """
 
+import glob
 import json
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from src.data_archive_ml_synthesizer.cache import TableCache
+from src.data_archive_ml_synthesizer.integrity import ReferentialIntegrityChecker
+
+
+# Default number of records buffered per chunk in streaming mode
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Number of characters read from disk per block in streaming mode
+READ_BLOCK_SIZE = 1 << 20
+
+# Mapping from file extension to input format
+FORMAT_EXTENSIONS = {
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+
+# Formats whose readers require the optional pyarrow dependency
+ARROW_FORMATS = {'parquet', 'arrow'}
+
+# Maximum ratio of distinct values to rows for a string column to become categorical
+DEFAULT_CATEGORY_THRESHOLD = 0.5
+
+# Primary key column of each table
+PRIMARY_KEYS = {'dmdSec': 'dmd_id', 'file': 'file_id', 'structMap': 'struct_id'}
+
+
+def _iter_json_array(file_path: Path, block_size: int = READ_BLOCK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Incrementally parse a file containing a top-level JSON array of objects.
+
+    Only the current read block and the record being decoded are held in memory,
+    so arbitrarily large exports can be processed.
+
+    Args:
+        file_path: Path to the JSON file.
+        block_size: Number of characters to read per block.
+
+    Yields:
+        One dictionary per array element.
+
+    Raises:
+        json.JSONDecodeError: If the file is not a JSON array of objects.
+    """
+    decoder = json.JSONDecoder()
+    whitespace = ' \t\n\r'
+
+    with open(file_path, 'r') as f:
+        buf = ''
+        pos = 0
+        eof = False
+        started = False
+        expect_value = True
+        after_comma = False
+
+        while True:
+            # Skip whitespace, refilling the buffer when it runs out
+            while pos < len(buf) and buf[pos] in whitespace:
+                pos += 1
+            if pos >= len(buf):
+                if eof:
+                    raise json.JSONDecodeError("Unexpected end of JSON array", buf, pos)
+                buf = f.read(block_size)
+                pos = 0
+                eof = not buf
+                continue
+
+            if not started:
+                if buf[pos] != '[':
+                    raise json.JSONDecodeError("Expected top-level JSON array", buf, pos)
+                started = True
+                pos += 1
+                continue
+
+            char = buf[pos]
+            if char == ']':
+                if after_comma:
+                    raise json.JSONDecodeError("Trailing ',' in JSON array", buf, pos)
+                return
+            if char == ',':
+                if expect_value:
+                    raise json.JSONDecodeError("Unexpected ',' in JSON array", buf, pos)
+                expect_value = True
+                after_comma = True
+                pos += 1
+                continue
+            if not expect_value:
+                raise json.JSONDecodeError("Expected ',' or ']' in JSON array", buf, pos)
+
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The record straddles the block boundary: drop consumed input and read more
+                chunk = f.read(block_size)
+                eof = not chunk
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+            if not isinstance(record, dict):
+                raise json.JSONDecodeError("Expected JSON object as array element", buf, pos)
+
+            yield record
+            pos = end
+            expect_value = False
+            after_comma = False
+
+
+def _iter_ndjson(file_path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Parse a newline-delimited JSON file one record at a time.
+
+    Args:
+        file_path: Path to the NDJSON file.
+
+    Yields:
+        One dictionary per non-empty line.
+
+    Raises:
+        json.JSONDecodeError: If a line is not a JSON object.
+    """
+    with open(file_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise json.JSONDecodeError("Expected JSON object per line", line, 0)
+            yield record
+
+
+def _read_shard(config: Dict[str, Any], file_path: Path) -> Tuple[pd.DataFrame, float]:
+    """
+    Read one shard of a table in a worker process.
+
+    Args:
+        config: Configuration dictionary of the calling DataLoader.
+        file_path: Path to the shard.
+
+    Returns:
+        Tuple of the parsed DataFrame and the time taken in seconds.
+    """
+    start_time = time.perf_counter()
+    df = DataLoader(config)._read_file(file_path)
+    return df, time.perf_counter() - start_time
+
+
+class _ColumnBuffer:
+    """
+    Accumulates records in per-column lists and converts them to typed chunks.
+
+    The buffered lists are turned into a DataFrame every ``chunk_size`` records,
+    so peak memory is bounded by the chunk size rather than by the input size.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            chunk_size: Number of records buffered before a chunk is materialized.
+        """
+        self.chunk_size = chunk_size
+        self.chunks: List[pd.DataFrame] = []
+        self.columns: Dict[str, List[Any]] = {}
+        self.buffered = 0
+
+    @property
+    def num_chunks(self) -> int:
+        """Number of chunks materialized so far, including a pending partial chunk."""
+        return len(self.chunks) + (1 if self.buffered else 0)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Append one record to the column buffers.
+
+        Args:
+            record: Dictionary mapping column names to values.
+        """
+        # Columns first seen mid-chunk are back-filled with missing values
+        for key in record:
+            if key not in self.columns:
+                self.columns[key] = [None] * self.buffered
+        for key, values in self.columns.items():
+            values.append(record.get(key))
+        self.buffered += 1
+
+        if self.buffered >= self.chunk_size:
+            self._flush()
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Concatenate all buffered chunks into a single DataFrame.
+
+        Returns:
+            pandas DataFrame containing every appended record.
+        """
+        if self.buffered or not self.chunks:
+            self._flush()
+
+        if len(self.chunks) == 1:
+            return self.chunks[0]
+        return pd.concat(self.chunks, ignore_index=True)
+
+    def _flush(self) -> None:
+        """Materialize the buffered column lists as a DataFrame chunk."""
+        self.chunks.append(pd.DataFrame(self.columns))
+        self.columns = {}
+        self.buffered = 0
+
 
 class DataLoader:
     """
-    Class for loading and validating input JSON data.
+    Class for loading and validating input data.
     """
 
     def __init__(self, config: Dict[str, Any]):
@@ -28,35 +253,166 @@ class DataLoader:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
+        self.memory_report: Dict[str, Dict[str, int]] = {}
+        self.integrity_report: Dict[str, Dict[str, int]] = {}
+        self.shard_report: Dict[str, List[Dict[str, Any]]] = {}
+
+    @property
+    def references_clean(self) -> bool:
+        """Whether the last loaded tables passed the referential integrity check."""
+        return bool(self.integrity_report) and ReferentialIntegrityChecker.is_clean(self.integrity_report)
 
     def load_data(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
         """
         Load the three JSON files and convert them to pandas DataFrames.
 
+        If the parsed-table cache is enabled (``cache.enabled``), tables loaded from
+        identical inputs with an identical ``input`` configuration are read back
+        from the cache instead of being parsed again. The references between the
+        tables are then checked and handled according to ``input.integrity``; the
+        orphan counts are kept in ``integrity_report``.
+
         Returns:
             Tuple of three pandas DataFrames (dmdSec, file, structMap).
         """
+        tables = self._load_cached_tables()
+
+        checker = ReferentialIntegrityChecker(self.config)
+        tables, self.integrity_report = checker.check(tables)
+
+        return tables["dmdSec"], tables["file"], tables["structMap"]
+
+    def _load_cached_tables(self) -> Dict[str, pd.DataFrame]:
+        """
+        Load the three tables, going through the parsed-table cache if it is enabled.
+
+        Returns:
+            Dictionary mapping table names to DataFrames.
+        """
+        cache = self._open_cache()
+        if cache is None:
+            return dict(zip(("dmdSec", "file", "structMap"), self._load_tables()))
+
+        start_time = time.perf_counter()
+        cache_key = cache.make_key(self._input_files(), self.config["input"])
+        cached = cache.get(cache_key)
+        if cached is not None:
+            elapsed = time.perf_counter() - start_time
+            self.logger.info(f"Loaded input tables from cache entry {cache_key} in {elapsed:.2f}s")
+            return cached
+
+        self.logger.debug(f"Cache miss for input tables ({cache_key})")
+        tables = dict(zip(("dmdSec", "file", "structMap"), self._load_tables()))
+        if cache.put(cache_key, tables):
+            self.logger.info(f"Stored input tables in cache entry {cache_key}")
+        return tables
+
+    def _load_tables(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Load the three tables from the configured inputs, bypassing the cache.
+
+        Returns:
+            Tuple of three pandas DataFrames (dmdSec, file, structMap).
+        """
+        if self.config["input"].get("mets_dir"):
+            return self._load_mets_corpus(Path(self.config["input"]["mets_dir"]))
+
         self.logger.info("Loading input JSON files...")
         
-        # Get file paths from config
-        dmdsec_path = Path(self.config["input"]["dmdsec_path"])
-        file_path = Path(self.config["input"]["file_path"])
-        structmap_path = Path(self.config["input"]["structmap_path"])
+        # Get file paths from config; each may also be a directory or glob pattern of shards
+        dmdsec_path = self.config["input"]["dmdsec_path"]
+        file_path = self.config["input"]["file_path"]
+        structmap_path = self.config["input"]["structmap_path"]
         
-        # Load JSON files
-        dmdsec_df = self._load_and_validate_json(dmdsec_path, "dmdSec")
-        file_df = self._load_and_validate_json(file_path, "file")
-        structmap_df = self._load_and_validate_json(structmap_path, "structMap")
+        # Load input files
+        dmdsec_df = self._load_and_validate_table(dmdsec_path, "dmdSec")
+        file_df = self._load_and_validate_table(file_path, "file")
+        structmap_df = self._load_and_validate_table(structmap_path, "structMap")
         
         self.logger.info("Successfully loaded all input JSON files.")
         return dmdsec_df, file_df, structmap_df
 
-    def _load_and_validate_json(self, file_path: Path, table_name: str) -> pd.DataFrame:
+    def _open_cache(self) -> Optional[TableCache]:
+        """
+        Create the parsed-table cache if it is enabled and usable.
+
+        Returns:
+            A TableCache instance, or None if caching is disabled or pyarrow is missing.
+        """
+        cache_config = self.config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            self.logger.warning("Parsed-table cache requires pyarrow; loading without cache")
+            return None
+
+        max_size_bytes = int(float(cache_config.get("max_size_mb", 2048)) * 1024 * 1024)
+        return TableCache(Path(cache_config.get("dir", "data/cache")) / "tables", max_size_bytes)
+
+    def _input_files(self) -> List[Path]:
+        """
+        List the files whose contents determine the loaded tables.
+
+        Returns:
+            List of input file paths in a stable order.
+
+        Raises:
+            FileNotFoundError: If an input file does not exist.
+        """
+        input_config = self.config["input"]
+        if input_config.get("mets_dir"):
+            mets_dir = Path(input_config["mets_dir"])
+            return sorted(mets_dir.glob(input_config.get("mets_pattern", "**/*.xml")))
+
+        return [
+            path
+            for key in ("dmdsec_path", "file_path", "structmap_path")
+            for path in self._resolve_shards(input_config[key])
+        ]
+
+    def _resolve_shards(self, path_spec: str) -> List[Path]:
+        """
+        Expand a configured input path into the list of files it refers to.
+
+        Args:
+            path_spec: A file path, a directory containing shard files with a known
+                       extension, or a glob pattern such as ``dmdSec/part-*.json``.
+
+        Returns:
+            Sorted list of shard paths.
+
+        Raises:
+            FileNotFoundError: If the path does not exist or matches no files.
         """
-        Load a JSON file and validate its structure.
+        path = Path(path_spec)
+        if path.is_dir():
+            paths = sorted(p for p in path.iterdir() if p.is_file() and p.suffix.lower() in FORMAT_EXTENSIONS)
+        elif any(char in str(path_spec) for char in "*?["):
+            paths = sorted(Path(p) for p in glob.glob(str(path_spec), recursive=True) if Path(p).is_file())
+        else:
+            paths = [path] if path.exists() else []
+
+        if not paths:
+            error_msg = f"File not found: {path_spec}"
+            self.logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+        return paths
+
+    def _load_and_validate_table(self, path_spec: str, table_name: str) -> pd.DataFrame:
+        """
+        Load an input table and validate its structure.
+
+        The table may be split into several shard files, given as a directory or a
+        glob pattern; shards are parsed concurrently in a process pool of
+        ``input.workers`` processes and concatenated once. The reader is chosen
+        from ``input.format`` if set, otherwise from each file's extension. Dtypes
+        declared under ``input.dtypes.<table_name>`` are applied before validation.
 
         Args:
-            file_path: Path to the JSON file.
+            path_spec: Path, directory or glob pattern of the input file(s).
             table_name: Name of the table (for logging and validation).
 
         Returns:
@@ -66,34 +422,387 @@ class DataLoader:
             FileNotFoundError: If the file does not exist.
             ValueError: If the file structure is invalid.
         """
-        self.logger.debug(f"Loading {table_name} from {file_path}")
-        
-        if not file_path.exists():
-            error_msg = f"File not found: {file_path}"
-            self.logger.error(error_msg)
-            raise FileNotFoundError(error_msg)
+        self.logger.debug(f"Loading {table_name} from {path_spec}")
+        shard_paths = self._resolve_shards(path_spec)
         
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(data)
+            start_time = time.perf_counter()
+
+            if len(shard_paths) == 1:
+                df = self._read_file(shard_paths[0])
+                shard_lengths = [len(df)]
+            else:
+                df, shard_lengths = self._read_shards(shard_paths, table_name)
+
+            df = self._apply_dtypes(df, table_name)
             
+            elapsed = time.perf_counter() - start_time
+            rate = len(df) / elapsed if elapsed > 0 else float('inf')
+            self.logger.info(f"Loaded {len(df)} {table_name} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+
             # Basic validation
             self._validate_dataframe(df, table_name)
+            self._check_primary_key(df, table_name, shard_paths, shard_lengths)
+
+            if self.config["input"].get("compact", False):
+                df = self._compact(df, table_name)
             
             return df
         
+        except Exception as e:
+            error_msg = f"Error loading {table_name}: {str(e)}"
+            self.logger.error(error_msg)
+            raise
+
+    def _read_file(self, file_path: Path) -> pd.DataFrame:
+        """
+        Parse a single input file into a DataFrame.
+
+        Args:
+            file_path: Path to the input file.
+
+        Returns:
+            pandas DataFrame containing the data.
+
+        Raises:
+            ValueError: If the file is not valid JSON or has an unsupported format.
+        """
+        input_format = self._resolve_format(file_path)
+        try:
+            if input_format == "json":
+                if self.config["input"].get("streaming", False):
+                    return self._frame_from_records(_iter_json_array(file_path), file_path)
+
+                with open(file_path, 'r') as f:
+                    data = json.load(f)
+
+                # Convert to DataFrame
+                return pd.DataFrame(data)
+            if input_format == "ndjson":
+                return self._frame_from_records(_iter_ndjson(file_path), file_path)
+        
         except json.JSONDecodeError as e:
             error_msg = f"Invalid JSON in {file_path}: {str(e)}"
             self.logger.error(error_msg)
             raise ValueError(error_msg)
-        
-        except Exception as e:
-            error_msg = f"Error loading {table_name}: {str(e)}"
+
+        return self._read_arrow_format(file_path, input_format)
+
+    def _read_shards(self, shard_paths: List[Path], table_name: str) -> Tuple[pd.DataFrame, List[int]]:
+        """
+        Parse the shards of a table concurrently and concatenate them.
+
+        Per-shard row counts and timings are logged and kept in ``shard_report``.
+
+        Args:
+            shard_paths: Paths of the shard files, in concatenation order.
+            table_name: Name of the table (for reporting).
+
+        Returns:
+            Tuple of the concatenated DataFrame and the row count of each shard.
+        """
+        workers = min(int(self.config["input"].get("workers") or os.cpu_count() or 1), len(shard_paths))
+        self.logger.info(f"Loading {len(shard_paths)} {table_name} shards with {workers} workers")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_read_shard, [self.config] * len(shard_paths), shard_paths))
+
+        report = []
+        for shard_path, (shard_df, elapsed) in zip(shard_paths, results):
+            report.append({"path": str(shard_path), "rows": len(shard_df), "seconds": elapsed})
+            self.logger.debug(f"Shard {shard_path}: {len(shard_df)} rows in {elapsed:.3f}s")
+        self.shard_report[table_name] = report
+
+        timings = sorted(entry["seconds"] for entry in report)
+        self.logger.info(f"{table_name} shard times: min {timings[0]:.3f}s, "
+                         f"median {timings[len(timings) // 2]:.3f}s, max {timings[-1]:.3f}s")
+
+        # Concatenate once so the shard frames are copied a single time
+        frames = [shard_df for shard_df, _ in results]
+        del results
+        shard_lengths = [len(frame) for frame in frames]
+        return pd.concat(frames, ignore_index=True), shard_lengths
+
+    def _check_primary_key(self, df: pd.DataFrame, table_name: str,
+                           shard_paths: List[Path], shard_lengths: List[int]) -> None:
+        """
+        Ensure that the primary key of a table is unique, including across shards.
+
+        Args:
+            df: DataFrame to check.
+            table_name: Name of the table.
+            shard_paths: Paths of the shards the DataFrame was concatenated from.
+            shard_lengths: Row count of each shard.
+
+        Raises:
+            ValueError: If a primary key value occurs more than once.
+        """
+        primary_key = PRIMARY_KEYS[table_name]
+        duplicated = df[primary_key].duplicated(keep=False).to_numpy()
+        if not duplicated.any():
+            return
+
+        shard_index = np.repeat(np.arange(len(shard_paths)), shard_lengths)
+        offending = sorted({str(shard_paths[i]) for i in np.unique(shard_index[duplicated])})
+        examples = df.loc[duplicated, primary_key].drop_duplicates().head(5).tolist()
+        error_msg = (f"{table_name} has {int(duplicated.sum())} rows with duplicate {primary_key} values "
+                     f"(e.g. {examples}) in: {', '.join(offending)}")
+        self.logger.error(error_msg)
+        raise ValueError(error_msg)
+
+    def _load_mets_corpus(self, mets_dir: Path) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Extract the three tables from a directory of METS XML documents.
+
+        Documents matching ``input.mets_pattern`` (default ``**/*.xml``) are parsed
+        in a process pool of ``input.workers`` processes. IDs are prefixed with the
+        document's path relative to the directory, without its extension and with
+        dots between the path components, unless ``input.qualify_ids`` is false, so
+        that IDs stay unique across the corpus even when packages use the same
+        file name. Documents that are not well-formed are skipped.
+
+        Args:
+            mets_dir: Directory containing the METS documents.
+
+        Returns:
+            Tuple of three pandas DataFrames (dmdSec, file, structMap).
+
+        Raises:
+            FileNotFoundError: If the directory does not exist or contains no documents.
+        """
+        # Imported here so that lxml is only required for the METS backend
+        from src.data_archive_ml_synthesizer.mets_reader import extract_corpus_member
+
+        self.logger.info(f"Extracting input tables from METS corpus in {mets_dir}...")
+        input_config = self.config["input"]
+
+        if not mets_dir.is_dir():
+            error_msg = f"METS directory not found: {mets_dir}"
             self.logger.error(error_msg)
-            raise
+            raise FileNotFoundError(error_msg)
+
+        xml_paths = sorted(str(path) for path in mets_dir.glob(input_config.get("mets_pattern", "**/*.xml")))
+        if not xml_paths:
+            error_msg = f"No METS documents found in {mets_dir}"
+            self.logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+
+        workers = int(input_config.get("workers") or os.cpu_count() or 1)
+        if input_config.get("qualify_ids", True):
+            id_prefixes = [".".join(Path(xml_path).relative_to(mets_dir).with_suffix("").parts) + "_"
+                           for xml_path in xml_paths]
+        else:
+            id_prefixes = [""] * len(xml_paths)
+        chunk_size = int(input_config.get("chunk_size", DEFAULT_CHUNK_SIZE))
+        buffers = {name: _ColumnBuffer(chunk_size) for name in ("dmdSec", "file", "structMap")}
+
+        start_time = time.perf_counter()
+        skipped = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            batch = max(1, len(xml_paths) // (workers * 16))
+            results = executor.map(extract_corpus_member, xml_paths, id_prefixes, chunksize=batch)
+            for xml_path, records, error in results:
+                if records is None:
+                    skipped += 1
+                    self.logger.warning(f"Skipping malformed METS document {xml_path}: {error}")
+                    continue
+                for buffer, table_records in zip(buffers.values(), records):
+                    for record in table_records:
+                        buffer.append(record)
+
+        elapsed = time.perf_counter() - start_time
+        parsed = len(xml_paths) - skipped
+        rate = parsed / elapsed if elapsed > 0 else float('inf')
+        self.logger.info(f"Parsed {parsed} METS documents with {workers} workers in {elapsed:.2f}s "
+                         f"({rate:,.0f} documents/s, {skipped} skipped)")
+
+        tables = []
+        for table_name, buffer in buffers.items():
+            df = self._apply_dtypes(buffer.to_frame(), table_name)
+            self._validate_dataframe(df, table_name)
+            self._check_primary_key(df, table_name, [mets_dir], [len(df)])
+            if input_config.get("compact", False):
+                df = self._compact(df, table_name)
+            self.logger.info(f"Extracted {len(df)} {table_name} rows")
+            tables.append(df)
+
+        return tables[0], tables[1], tables[2]
+
+    def _resolve_format(self, file_path: Path) -> str:
+        """
+        Determine the input format of a file.
+
+        Args:
+            file_path: Path to the input file.
+
+        Returns:
+            One of 'json', 'ndjson', 'parquet' or 'arrow'.
+
+        Raises:
+            ValueError: If the format is unknown.
+        """
+        input_format = self.config["input"].get("format")
+        if input_format is None:
+            input_format = FORMAT_EXTENSIONS.get(file_path.suffix.lower(), "json")
+
+        if input_format not in set(FORMAT_EXTENSIONS.values()):
+            error_msg = f"Unsupported input format '{input_format}' for {file_path}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        return input_format
+
+    def _read_arrow_format(self, file_path: Path, input_format: str) -> pd.DataFrame:
+        """
+        Read a Parquet or Arrow IPC file into a DataFrame.
+
+        Args:
+            file_path: Path to the input file.
+            input_format: Either 'parquet' or 'arrow'.
+
+        Returns:
+            pandas DataFrame containing the data.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            error_msg = f"Reading {input_format} input requires pyarrow (pip install pyarrow)"
+            self.logger.error(error_msg)
+            raise ImportError(error_msg)
+
+        if input_format == "parquet":
+            return pd.read_parquet(file_path, engine="pyarrow")
+        return pd.read_feather(file_path)
+
+    def _apply_dtypes(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Cast columns to the dtypes declared in the configuration.
+
+        Datetime dtypes are parsed with ``pd.to_datetime`` (timezone-aware values
+        are normalized to UTC) so that ISO-8601 strings convert cleanly.
+
+        Args:
+            df: DataFrame to cast.
+            table_name: Name of the table whose dtypes are applied.
+
+        Returns:
+            DataFrame with the declared dtypes.
+
+        Raises:
+            ValueError: If a declared column is missing or a cast fails.
+        """
+        dtypes = self.config["input"].get("dtypes", {}).get(table_name, {})
+        if not dtypes:
+            return df
+
+        missing_columns = [col for col in dtypes if col not in df.columns]
+        if missing_columns:
+            error_msg = f"dtypes declared for unknown {table_name} columns: {', '.join(missing_columns)}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        for column, dtype in dtypes.items():
+            try:
+                if str(dtype).startswith("datetime64"):
+                    values = pd.to_datetime(df[column], utc=True).dt.tz_convert(None)
+                    df[column] = values if dtype == "datetime64" else values.astype(dtype)
+                else:
+                    df[column] = df[column].astype(dtype)
+            except (TypeError, ValueError) as e:
+                error_msg = f"Cannot cast {table_name}.{column} to {dtype}: {str(e)}"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+
+        self.logger.debug(f"Applied dtypes to {table_name}: {dtypes}")
+        return df
+
+    def _compact(self, df: pd.DataFrame, table_name: str) -> pd.DataFrame:
+        """
+        Convert a loaded table to a memory-compact representation.
+
+        ID columns (``*_id``) are stored as Arrow-backed strings when pyarrow is
+        available, string columns whose ratio of distinct values to rows is at most
+        ``input.category_threshold`` become categoricals, integers are downcast to
+        the smallest type holding their range and floats are downcast to float32
+        when this is lossless. Columns with dtypes declared in ``input.dtypes`` are
+        left untouched. The memory usage before and after is recorded in
+        ``memory_report``.
+
+        Args:
+            df: DataFrame to compact.
+            table_name: Name of the table (for declared dtypes and reporting).
+
+        Returns:
+            The compacted DataFrame.
+        """
+        threshold = float(self.config["input"].get("category_threshold", DEFAULT_CATEGORY_THRESHOLD))
+        declared = self.config["input"].get("dtypes", {}).get(table_name, {})
+
+        try:
+            import pyarrow  # noqa: F401
+            id_dtype = "string[pyarrow]"
+        except ImportError:
+            id_dtype = None
+
+        bytes_before = int(df.memory_usage(deep=True).sum())
+        num_rows = max(len(df), 1)
+
+        for column in df.columns:
+            if column in declared:
+                continue
+            series = df[column]
+
+            if pd.api.types.is_object_dtype(series.dtype):
+                if column.endswith("_id"):
+                    if id_dtype is not None:
+                        df[column] = series.astype(id_dtype)
+                    continue
+                try:
+                    distinct = series.nunique(dropna=True)
+                except TypeError:
+                    # Unhashable values such as nested lists cannot be categorized
+                    continue
+                if distinct / num_rows <= threshold:
+                    df[column] = series.astype("category")
+            elif pd.api.types.is_integer_dtype(series.dtype):
+                df[column] = pd.to_numeric(series, downcast="integer")
+            elif pd.api.types.is_float_dtype(series.dtype) and series.dtype != "float32":
+                downcast = series.astype("float32")
+                if downcast.astype(series.dtype).equals(series):
+                    df[column] = downcast
+
+        bytes_after = int(df.memory_usage(deep=True).sum())
+        self.memory_report[table_name] = {
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+        }
+        saved_pct = 100.0 * (bytes_before - bytes_after) / bytes_before if bytes_before else 0.0
+        self.logger.info(f"Compacted {table_name}: {bytes_before / 1e6:.2f} MB -> {bytes_after / 1e6:.2f} MB "
+                         f"({bytes_before - bytes_after:,} bytes saved, {saved_pct:.0f}%)")
+        self.logger.debug(f"Compacted {table_name} dtypes: {df.dtypes.astype(str).to_dict()}")
+        return df
+
+    def _frame_from_records(self, records: Iterator[Dict[str, Any]], file_path: Path) -> pd.DataFrame:
+        """
+        Build a DataFrame from a record iterator without materializing the records.
+
+        Args:
+            records: Iterator over record dictionaries.
+            file_path: Path the records are read from (for logging).
+
+        Returns:
+            pandas DataFrame containing the data.
+        """
+        buffer = _ColumnBuffer(int(self.config["input"].get("chunk_size", DEFAULT_CHUNK_SIZE)))
+        for record in records:
+            buffer.append(record)
+
+        self.logger.debug(f"Parsed {file_path} into {buffer.num_chunks} chunk(s)")
+        return buffer.to_frame()
 
     def _validate_dataframe(self, df: pd.DataFrame, table_name: str) -> None:
         """
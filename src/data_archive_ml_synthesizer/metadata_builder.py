@@ -7,16 +7,172 @@ defining the relationships between the three tables:
 - file: Primary key file_id and a foreign key dmd_id referencing dmdSec
 - structMap: Primary key struct_id with a foreign key dmd_id referencing dmdSec
   and a self-referencing key parent_id (for hierarchical structure)
+
+Free-form string columns are profiled on a sample of rows before they are
+declared: columns with few distinct values stay categorical, while columns that
+are (nearly) unique per row, such as checksums, hrefs or titles, are declared
+as id columns with a regex derived from their shape, or as text columns, so
+their values are generated instead of being modeled category by category.
+
+Built metadata is cached under a fingerprint of the table schemas (column
+names and dtypes) and the profiling decisions, both in-process and next to the saved metadata file, so
+identical schemas are neither rebuilt nor re-validated. The SDV Metadata
+object for a metadata dictionary is likewise constructed only once per
+process via load_sdv_metadata.
 """
 
+import copy
+import hashlib
+import json
 import logging
+import re
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
 import pandas as pd
 import yaml
 
-from sdv.metadata import Metadata
+if TYPE_CHECKING:
+    from sdv.metadata import Metadata
+
+
+# Bumped whenever the metadata derived from a schema changes
+METADATA_BUILDER_VERSION = 2
+
+# Default profiling settings, overridable in the ``metadata`` config section
+DEFAULT_PROFILE_ROWS = 10000
+DEFAULT_UNIQUE_THRESHOLD = 0.5
+DEFAULT_MIN_PROFILE_ROWS = 100
+
+# Maximum number of alphanumeric runs in a value for a shape regex to be derived
+MAX_SHAPE_TOKENS = 12
+
+# Alphanumeric runs and the single separator characters between them
+_TOKEN_PATTERN = re.compile(r'[A-Za-z0-9]+|[^A-Za-z0-9]')
+
+_ALPHANUMERIC = set('0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+
+# Character classes tried in order, narrowest first
+_CHARACTER_CLASSES = [
+    ('[0-9]', set('0123456789')),
+    ('[0-9a-f]', set('0123456789abcdef')),
+    ('[0-9A-F]', set('0123456789ABCDEF')),
+    ('[a-z]', set('abcdefghijklmnopqrstuvwxyz')),
+    ('[A-Z]', set('ABCDEFGHIJKLMNOPQRSTUVWXYZ')),
+    ('[A-Za-z]', set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')),
+    ('[A-Za-z0-9]', _ALPHANUMERIC),
+]
+
+# Metadata dictionaries built in this process, keyed by schema fingerprint
+_metadata_cache: Dict[str, Dict[str, Any]] = {}
+
+# SDV Metadata objects constructed in this process, keyed by metadata digest
+_sdv_metadata_cache: Dict[str, 'Metadata'] = {}
+
+
+def schema_fingerprint(tables: Dict[str, pd.DataFrame],
+                       column_specs: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None) -> str:
+    """
+    Compute a fingerprint of the table schemas.
+
+    Args:
+        tables: Dictionary mapping table names to DataFrames.
+        column_specs: Inferred column specifications per table, as returned by
+                      MetadataBuilder.infer_column_specs.
+
+    Returns:
+        Hex digest over table names, column names, dtypes and column specifications.
+    """
+    schema = {
+        'version': METADATA_BUILDER_VERSION,
+        'tables': {
+            table_name: [[str(column), str(dtype)] for column, dtype in df.dtypes.items()]
+            for table_name, df in tables.items()
+        },
+        'columns': column_specs or {},
+    }
+    return hashlib.blake2b(json.dumps(schema, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def shape_regex(values: List[str]) -> Optional[str]:
+    """
+    Derive a regex matching the common shape of a set of strings.
+
+    Values are split into alphanumeric runs and the separator characters between
+    them. If all values share the same separators, each run is described by the
+    narrowest character class covering it and its observed length range, e.g.
+    '[0-9a-f]{40}' for SHA-1 checksums or 'files/[a-z]{3,8}_[0-9]{4}\\.xml' for hrefs.
+
+    Args:
+        values: Sample of string values.
+
+    Returns:
+        The regex, or None if the values do not share a shape.
+    """
+    structure = None
+    runs: List[List[str]] = []
+    for value in values:
+        tokens = _TOKEN_PATTERN.findall(value)
+        value_structure = tuple(None if token[0] in _ALPHANUMERIC else token for token in tokens)
+        if structure is None:
+            structure = value_structure
+            runs = [[] for token in structure if token is None]
+            if not runs or len(runs) > MAX_SHAPE_TOKENS:
+                return None
+        elif value_structure != structure:
+            return None
+        for run_values, token in zip(runs, (token for token in tokens if token[0] in _ALPHANUMERIC)):
+            run_values.append(token)
+
+    if structure is None:
+        return None
+
+    parts = []
+    run_iter = iter(runs)
+    for separator in structure:
+        if separator is not None:
+            parts.append(re.escape(separator))
+            continue
+        run_values = next(run_iter)
+        characters = set(''.join(run_values))
+        character_class = next(name for name, allowed in _CHARACTER_CLASSES if characters <= allowed)
+        lengths = [len(token) for token in run_values]
+        if min(lengths) == max(lengths):
+            parts.append(f"{character_class}{{{min(lengths)}}}")
+        else:
+            parts.append(f"{character_class}{{{min(lengths)},{max(lengths)}}}")
+    return ''.join(parts)
+
+
+def metadata_digest(metadata: Dict[str, Any]) -> str:
+    """
+    Compute a digest of a metadata dictionary.
+
+    Args:
+        metadata: SDV-compatible metadata as a dictionary.
+
+    Returns:
+        Hex digest of the canonical JSON form of the metadata.
+    """
+    return hashlib.blake2b(json.dumps(metadata, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def load_sdv_metadata(metadata: Dict[str, Any]) -> 'Metadata':
+    """
+    Return the SDV Metadata object for a metadata dictionary, constructing it once.
+
+    Args:
+        metadata: SDV-compatible metadata as a dictionary.
+
+    Returns:
+        The cached or newly constructed Metadata object.
+    """
+    from sdv.metadata import Metadata
+
+    digest = metadata_digest(metadata)
+    if digest not in _sdv_metadata_cache:
+        _sdv_metadata_cache[digest] = Metadata.load_from_dict(metadata)
+    return _sdv_metadata_cache[digest]
 
 
 class MetadataBuilder:
@@ -34,6 +190,12 @@ class MetadataBuilder:
         self.config = config
         self.logger = logging.getLogger(__name__)
 
+        metadata_config = config.get('metadata', {})
+        self.profile_rows = metadata_config.get('profile_rows', DEFAULT_PROFILE_ROWS)
+        self.unique_threshold = metadata_config.get('unique_threshold', DEFAULT_UNIQUE_THRESHOLD)
+        self.min_profile_rows = metadata_config.get('min_profile_rows', DEFAULT_MIN_PROFILE_ROWS)
+        self.seed = config.get('model', {}).get('random_seed')
+
     def build_metadata(self, dmdsec_df: pd.DataFrame, file_df: pd.DataFrame, 
                       structmap_df: pd.DataFrame) -> Dict[str, Any]:
         """
@@ -60,7 +222,28 @@ class MetadataBuilder:
         for table_name, df in tables.items():
             self.logger.debug(f"Table '{table_name}' data: {len(df)} rows, columns={list(df.columns)}")
 
+        metadata_path = self.config['output'].get('metadata_path')
+        metadata_path = Path(metadata_path) if metadata_path else None
+
+        column_specs = self.infer_column_specs(tables)
+
+        # Reuse metadata built for an identical schema in this process or a previous run
+        fingerprint = schema_fingerprint(tables, column_specs)
+        if fingerprint in _metadata_cache:
+            self.logger.info(f"Reusing metadata for schema {fingerprint} built earlier in this run.")
+            if metadata_path and not self._is_saved(metadata_path, fingerprint):
+                self._save_metadata(_metadata_cache[fingerprint], metadata_path)
+                self._fingerprint_path(metadata_path).write_text(fingerprint)
+            return copy.deepcopy(_metadata_cache[fingerprint])
+
+        cached_metadata = self._load_cached_metadata(metadata_path, fingerprint) if metadata_path else None
+        if cached_metadata is not None:
+            self.logger.info(f"Reusing metadata for schema {fingerprint} from {metadata_path}.")
+            _metadata_cache[fingerprint] = cached_metadata
+            return copy.deepcopy(cached_metadata)
+
         # First, create metadata with just the tables and their columns
+        from sdv.metadata import Metadata
         metadata_obj = Metadata()
 
         # Add tables and set primary keys
@@ -68,15 +251,8 @@ class MetadataBuilder:
             metadata_obj.add_table(table_name)
 
             # Add columns with appropriate types
-            for column in df.columns:
-                if column.endswith('_id'):
-                    metadata_obj.add_column(column, table_name, sdtype='id')
-                elif 'date' in column.lower():
-                    metadata_obj.add_column(column, table_name, sdtype='datetime')
-                elif pd.api.types.is_numeric_dtype(df[column].dtype):
-                    metadata_obj.add_column(column, table_name, sdtype='numerical')
-                else:
-                    metadata_obj.add_column(column, table_name, sdtype='categorical')
+            for column, spec in column_specs[table_name].items():
+                metadata_obj.add_column(column, table_name, **spec)
 
             # Set primary keys
             if table_name == 'dmdSec':
@@ -106,21 +282,137 @@ class MetadataBuilder:
         # Note: We're not adding the structMap self-referencing relationship
         # because it creates a circular dependency that SDV can't handle.
         # The parent_id column is still in the data and will be preserved,
-        # but it won't be treated as a foreign key in the metadata.
+        # but it won't be treated as a foreign key in the metadata. The
+        # hierarchy is generated by the StructMapTreeModel instead.
 
         # Validate the metadata
         metadata_obj.validate()
 
         # Convert to dictionary
         metadata_dict = metadata_obj.to_dict()
+        _metadata_cache[fingerprint] = metadata_dict
+        _sdv_metadata_cache[metadata_digest(metadata_dict)] = metadata_obj
 
         # Save metadata to file if specified in config
-        if 'metadata_path' in self.config['output']:
-            metadata_path = Path(self.config['output']['metadata_path'])
+        if metadata_path:
             self._save_metadata(metadata_dict, metadata_path)
+            self._fingerprint_path(metadata_path).write_text(fingerprint)
 
         self.logger.info("Metadata built successfully.")
-        return metadata_dict
+        return copy.deepcopy(metadata_dict)
+
+    def infer_column_specs(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Infer the sdtype and generator settings of every column.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+
+        Returns:
+            Dictionary mapping table names to column names to add_column keyword
+            arguments (sdtype and, for generated ids, regex_format).
+        """
+        column_specs = {}
+        for table_name, df in tables.items():
+            column_specs[table_name] = {}
+            for column in df.columns:
+                if column.endswith('_id'):
+                    spec = {'sdtype': 'id'}
+                elif 'date' in column.lower():
+                    spec = {'sdtype': 'datetime'}
+                elif pd.api.types.is_numeric_dtype(df[column].dtype):
+                    spec = {'sdtype': 'numerical'}
+                else:
+                    spec = self._profile_column(table_name, column, df[column])
+                column_specs[table_name][column] = spec
+        return column_specs
+
+    def _profile_column(self, table_name: str, column: str, series: pd.Series) -> Dict[str, Any]:
+        """
+        Choose the sdtype of a string column from a profile of a sample of its values.
+
+        Columns whose distinct-to-row ratio stays below the unique threshold are
+        modeled as categorical. Unique-ish columns whose values share a shape
+        become id columns generated from a regex; other unique-ish columns are
+        treated as free text.
+
+        Args:
+            table_name: Name of the table, used for logging.
+            column: Name of the column.
+            series: Column values.
+
+        Returns:
+            add_column keyword arguments for the column.
+        """
+        values = series.dropna()
+        if len(values) < self.min_profile_rows:
+            return {'sdtype': 'categorical'}
+
+        if len(values) > self.profile_rows:
+            values = values.sample(n=self.profile_rows, random_state=self.seed)
+        values = values.astype(str)
+
+        unique_ratio = values.nunique() / len(values)
+        lengths = values.str.len()
+        profile = (f"unique ratio {unique_ratio:.2f}, "
+                   f"length {int(lengths.min())}-{int(lengths.max())} (median {lengths.median():.0f})")
+
+        if unique_ratio < self.unique_threshold:
+            self.logger.debug(f"{table_name}.{column}: {profile} -> categorical")
+            return {'sdtype': 'categorical'}
+
+        regex = shape_regex(values.tolist())
+        if regex is not None:
+            self.logger.info(f"{table_name}.{column}: {profile} -> id generated from '{regex}'")
+            return {'sdtype': 'id', 'regex_format': regex}
+
+        self.logger.info(f"{table_name}.{column}: {profile}, no common shape -> text")
+        return {'sdtype': 'text'}
+
+    @staticmethod
+    def _fingerprint_path(metadata_path: Path) -> Path:
+        """Return the path of the schema fingerprint stored next to a metadata file."""
+        return metadata_path.with_name(metadata_path.name + '.fingerprint')
+
+    def _is_saved(self, metadata_path: Path, fingerprint: str) -> bool:
+        """
+        Check whether the metadata file was saved for the given schema fingerprint.
+
+        Args:
+            metadata_path: Path of the saved metadata file.
+            fingerprint: Schema fingerprint of the current tables.
+
+        Returns:
+            True if the file and a matching fingerprint exist.
+        """
+        fingerprint_path = self._fingerprint_path(metadata_path)
+        if not metadata_path.exists() or not fingerprint_path.exists():
+            return False
+        if fingerprint_path.read_text().strip() != fingerprint:
+            self.logger.debug(f"Saved metadata in {metadata_path} was built for a different schema")
+            return False
+        return True
+
+    def _load_cached_metadata(self, metadata_path: Path, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Load previously saved metadata if it was built for the same schema.
+
+        Args:
+            metadata_path: Path of the saved metadata file.
+            fingerprint: Schema fingerprint of the current tables.
+
+        Returns:
+            The saved metadata dictionary, or None if it is missing or stale.
+        """
+        if not self._is_saved(metadata_path, fingerprint):
+            return None
+
+        try:
+            with open(metadata_path, 'r') as f:
+                return yaml.safe_load(f)
+        except (OSError, yaml.YAMLError) as e:
+            self.logger.warning(f"Ignoring unreadable metadata file {metadata_path}: {str(e)}")
+            return None
 
     def _save_metadata(self, metadata: Dict[str, Any], file_path: Path) -> None:
         """
@@ -0,0 +1,176 @@
+"""
+Module for extracting training tables directly from METS XML files.
+
+This module is the inverse of the XMLReassembler: it streams METS documents with
+lxml's iterparse and extracts the dmdSec Dublin Core fields, the fileSec
+file/FLocat attributes and the structMap div hierarchy into flat records that
+match the columns of the dmdSec.json, file.json and structMap.json inputs.
+Elements are cleared as soon as they have been processed, so memory usage does
+not grow with the size of a document.
+"""
+
+from typing import Dict, Any, List, Optional, Tuple
+
+from lxml import etree
+
+from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+
+
+METS_NS = f"{{{XMLReassembler.NAMESPACES['mets']}}}"
+XLINK_NS = f"{{{XMLReassembler.NAMESPACES['xlink']}}}"
+DC_NS = f"{{{XMLReassembler.NAMESPACES['dc']}}}"
+
+# Mapping from METS file attributes to file table columns
+FILE_ATTRIBUTES = {
+    'MIMETYPE': 'mimetype',
+    'SIZE': 'size',
+    'CHECKSUM': 'checksum',
+    'CHECKSUMTYPE': 'checksumtype',
+    'CREATED': 'created_date',
+}
+
+# Mapping from METS div attributes to structMap table columns
+DIV_ATTRIBUTES = {
+    'LABEL': 'label',
+    'ORDER': 'order',
+    'TYPE': 'type',
+}
+
+# Columns holding integer values in the extracted records
+INTEGER_COLUMNS = {'size', 'order'}
+
+# Records extracted from one METS file: (dmdSec, file, structMap)
+MetsRecords = Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def _coerce(column: str, value: Optional[str]) -> Any:
+    """
+    Convert an attribute value to the type used in the input tables.
+
+    Args:
+        column: Target column name.
+        value: Raw attribute value.
+
+    Returns:
+        The value as int for integer columns, otherwise unchanged.
+    """
+    if value is not None and column in INTEGER_COLUMNS:
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _release(elem: etree._Element) -> None:
+    """
+    Free a processed element and the already processed siblings before it.
+
+    Args:
+        elem: Element whose end event has been handled.
+    """
+    elem.clear(keep_tail=False)
+    parent = elem.getparent()
+    if parent is not None:
+        while elem.getprevious() is not None:
+            del parent[0]
+
+
+def extract_mets_file(xml_path: str, id_prefix: str = '') -> MetsRecords:
+    """
+    Extract dmdSec, file and structMap records from a single METS document.
+
+    Args:
+        xml_path: Path to the METS XML file.
+        id_prefix: Prefix added to every ID and ID reference, used to keep IDs
+                   unique when many documents are combined into one corpus.
+
+    Returns:
+        Tuple of record lists (dmdSec, file, structMap).
+
+    Raises:
+        etree.XMLSyntaxError: If the document is not well-formed.
+    """
+    def qualify(value: Optional[str]) -> Optional[str]:
+        return f"{id_prefix}{value}" if value else None
+
+    dmdsec_records: List[Dict[str, Any]] = []
+    file_records: List[Dict[str, Any]] = []
+    structmap_records: List[Dict[str, Any]] = []
+
+    # Stack of open div records; fptr and child divs attach to the innermost one
+    div_stack: List[Dict[str, Any]] = []
+
+    tags = (f"{METS_NS}dmdSec", f"{METS_NS}file", f"{METS_NS}div", f"{METS_NS}fptr")
+    for event, elem in etree.iterparse(xml_path, events=('start', 'end'), tag=tags):
+        tag = etree.QName(elem).localname
+
+        if event == 'start':
+            # Attributes are available on start events; content is not yet parsed
+            if tag == 'div':
+                record = {
+                    'struct_id': qualify(elem.get('ID')),
+                    'dmd_id': qualify(elem.get('DMDID')),
+                    'parent_id': div_stack[-1]['struct_id'] if div_stack else None,
+                }
+                for attribute, column in DIV_ATTRIBUTES.items():
+                    if elem.get(attribute) is not None:
+                        record[column] = _coerce(column, elem.get(attribute))
+                record['file_id'] = None
+                div_stack.append(record)
+                structmap_records.append(record)
+            elif tag == 'fptr' and div_stack and div_stack[-1]['file_id'] is None:
+                div_stack[-1]['file_id'] = qualify(elem.get('FILEID'))
+            continue
+
+        if tag == 'dmdSec':
+            record = {'dmd_id': qualify(elem.get('ID'))}
+            for field in elem.iter(f"{DC_NS}*"):
+                name = etree.QName(field).localname
+                if len(field) or field.text is None:
+                    continue
+                column = f"dc_{name}"
+                value = field.text.strip()
+                # Repeated Dublin Core elements are joined into one value
+                record[column] = f"{record[column]}; {value}" if column in record else value
+            dmdsec_records.append(record)
+        elif tag == 'file':
+            record = {
+                'file_id': qualify(elem.get('ID')),
+                'dmd_id': qualify(elem.get('DMDID')),
+            }
+            for attribute, column in FILE_ATTRIBUTES.items():
+                if elem.get(attribute) is not None:
+                    record[column] = _coerce(column, elem.get(attribute))
+            flocat = elem.find(f"{METS_NS}FLocat")
+            record['href'] = flocat.get(f"{XLINK_NS}href") if flocat is not None else None
+            record['loctype'] = flocat.get('LOCTYPE') if flocat is not None else None
+            file_records.append(record)
+        elif tag == 'div':
+            div_stack.pop()
+        else:
+            # fptr elements are handled on their start event
+            continue
+
+        _release(elem)
+
+    return dmdsec_records, file_records, structmap_records
+
+
+def extract_corpus_member(xml_path: str, id_prefix: str = '') -> Tuple[str, Optional[MetsRecords], Optional[str]]:
+    """
+    Extract one document of a METS corpus, capturing parse errors.
+
+    This is the unit of work dispatched to the process pool by the DataLoader.
+
+    Args:
+        xml_path: Path to the METS XML file.
+        id_prefix: Prefix prepended to every ID of the document.
+
+    Returns:
+        Tuple (xml_path, records, error_message); records is None on failure.
+    """
+    try:
+        return xml_path, extract_mets_file(xml_path, id_prefix), None
+    except (etree.XMLSyntaxError, OSError) as e:
+        return xml_path, None, str(e)
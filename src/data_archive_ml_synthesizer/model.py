@@ -1,54 +1,166 @@
 """
 Module for training generative models using SDV.
 
-This module implements a factory pattern to create and train an HMA synthesizer.
-The HMA synthesizer uses a hierarchical machine learning algorithm to generate synthetic data.
+This module implements a factory pattern to create and train a synthesizer.
+By default this is the HMA synthesizer, which uses a hierarchical machine
+learning algorithm to generate synthetic data; ``model.type`` selects another
+backend from the registry in the backends module, such as the NumPy
+FastSynthesizer.
+
+Saved models are accompanied by a manifest holding a fingerprint of the cleaned
+training tables, the metadata and the model configuration. When the cache is
+enabled and the fingerprint of a new training run matches, the saved model is
+loaded instead of being fitted again.
+
+Sampling asks the synthesizer for exactly the requested number of dmdSec rows by scaling
+against the training size. Child tables follow their parents and are trimmed
+to their requested sizes afterwards, clearing references to trimmed rows.
+
+``model.random_seed`` seeds fitting and sampling. Before every seeded sample the
+synthesizer's sampling state, including its ID generators, is reset to that
+seed, so the same seed gives the same tables whether the model was just fitted
+or loaded, and different seeds give different tables.
+
+HMA cannot model the structMap self-reference, so unless ``model.structmap_tree``
+is false, the division hierarchy is learned by a StructMapTreeModel whose
+parameters are stored in the manifest, and the sampled structMap rows are
+arranged into generated trees.
+
+SDV is imported by the functions that fit or load its synthesizers, so that
+commands which never touch a model start quickly.
 """
 
+import hashlib
+import json
 import logging
+import random
+import time
+from importlib.metadata import version
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+import numpy as np
 import pandas as pd
 
-from sdv.metadata import Metadata
-from sdv.multi_table.hma import HMASynthesizer
-from sdv.utils import drop_unknown_references
+from src.data_archive_ml_synthesizer.backends import create_backend, load_backend, reset_sampling, resolve_backend
+from src.data_archive_ml_synthesizer.metadata_builder import load_sdv_metadata, metadata_digest
+from src.data_archive_ml_synthesizer.structmap_tree import StructMapTreeModel
+
+
+# Root table whose requested row count determines the sampling scale
+ROOT_TABLE = 'dmdSec'
+
+# Rows sampled per table when neither the caller nor ``sampling.num_rows`` sets them
+DEFAULT_TABLE_ROWS = 100
+
+# Child table columns referencing other child tables: (table, column, referenced table, referenced key)
+CHILD_REFERENCES = [
+    ('structMap', 'file_id', 'file', 'file_id'),
+    ('structMap', 'parent_id', 'structMap', 'struct_id'),
+]
+
+
+# Bumped whenever the way models are trained changes incompatibly
+MODEL_CACHE_VERSION = 2
+
+
+def training_fingerprint(tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any],
+                         model_config: Dict[str, Any]) -> str:
+    """
+    Compute a fingerprint of everything that determines a trained model.
+
+    Args:
+        tables: Dictionary mapping table names to the cleaned training DataFrames.
+        metadata: SDV-compatible metadata as a dictionary.
+        model_config: The ``model`` section of the configuration.
+
+    Returns:
+        Hex digest over the table contents, the metadata, the model configuration
+        and the SDV version.
+    """
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(f"v{MODEL_CACHE_VERSION} sdv{version('sdv')}".encode())
+    hasher.update(metadata_digest(metadata).encode())
+    hasher.update(json.dumps(model_config, sort_keys=True, default=str).encode())
+    for table_name in sorted(tables):
+        df = tables[table_name]
+        hasher.update(table_name.encode())
+        hasher.update(json.dumps([[str(column), str(dtype)] for column, dtype in df.dtypes.items()]).encode())
+        hasher.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def seed_random_state(seed: Optional[int]) -> None:
+    """
+    Seed the global random generators used by SDV and its copulas.
+
+    Args:
+        seed: Seed to apply; nothing is seeded if None.
+    """
+    if seed is None:
+        return
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
 
 
 class ModelFactory:
     """
-    Factory class for creating and training an HMA synthesizer model.
+    Factory class for creating and loading the synthesizer backend selected by ``model.type``.
     """
 
     @staticmethod
-    def create_model(metadata: Dict[str, Any], config: Dict[str, Any]) -> HMASynthesizer:
+    def model_type(config: Dict[str, Any]) -> str:
+        """
+        Return the configured backend.
+
+        Args:
+            config: Configuration dictionary.
+
+        Returns:
+            The registered name of the backend, ``hma`` if not configured.
+
+        Raises:
+            ValueError: If the backend is not registered.
+        """
+        return resolve_backend(config.get('model', {}).get('type') or 'hma')
+
+    @staticmethod
+    def create_model(metadata: Dict[str, Any], config: Dict[str, Any]) -> Any:
         """
-        Create an HMA synthesizer model.
+        Create the configured synthesizer.
 
         Args:
             metadata: SDV-compatible metadata as a dictionary.
             config: Configuration dictionary.
 
         Returns:
-            An instance of HMASynthesizer.
+            An unfitted synthesizer of the configured backend.
         """
         logger = logging.getLogger(__name__)
-        logger.info("Creating HMA model...")
+        model_type = ModelFactory.model_type(config)
+        logger.info(f"Creating {model_type} model...")
+        model = create_backend(model_type, metadata, config)
+        logger.info(f"Created {model_type} model successfully.")
+        return model
 
-        # Convert dictionary metadata to Metadata object
-        sdv_metadata = Metadata.load_from_dict(metadata)
+    @staticmethod
+    def load_model(model_path: Path, model_type: str) -> Any:
+        """
+        Load a synthesizer saved by GenerativeModel.
 
-        # Instantiate the HMASynthesizer with the prepared metadata
-        model = HMASynthesizer(metadata=sdv_metadata)
-        logger.info("Created HMA model successfully.")
+        Args:
+            model_path: Path of the saved model.
+            model_type: Backend of the saved model.
 
-        return model
+        Returns:
+            The loaded synthesizer.
+        """
+        return load_backend(model_type, model_path)
 
 
 class GenerativeModel:
     """
-    Class for training and sampling from the HMA synthesizer model.
+    Class for training and sampling from the configured synthesizer model.
     """
 
     def __init__(self, config: Dict[str, Any]):
@@ -62,16 +174,29 @@ class GenerativeModel:
         self.logger = logging.getLogger(__name__)
         self.model = None
         self.metadata = None
-
-    def train(self, tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any]) -> None:
+        self.reused = False
+        # Number of training rows per table, used to compute the sampling scale
+        self.table_sizes: Dict[str, int] = {}
+        # Model of the structMap hierarchy, None if disabled or not trained
+        self.tree_model: Optional[StructMapTreeModel] = None
+
+    def train(self, tables: Dict[str, pd.DataFrame], metadata: Dict[str, Any],
+              references_validated: bool = False) -> None:
         """
-        Train the HMA synthesizer model on the input data.
+        Train the configured synthesizer model on the input data.
+
+        If the model cache is enabled and the model saved at ``output.model_path``
+        was trained on the same tables, metadata and model configuration, it is
+        loaded instead.
 
         Args:
             tables: Dictionary mapping table names to DataFrames.
             metadata: SDV-compatible metadata as a dictionary.
+            references_validated: Whether the foreign keys are already known to be
+                                  valid (e.g. checked by the DataLoader), in which case
+                                  SDV's reference cleanup is skipped.
         """
-        self.logger.info("Training HMA synthesizer model...")
+        self.logger.info("Training synthesizer model...")
         self.metadata = metadata
 
         # Log table details
@@ -79,32 +204,72 @@ class GenerativeModel:
             self.logger.debug(f"Table '{table_name}' data: {len(df)} rows, columns={list(df.columns)}")
 
         # Clean data to ensure foreign keys reference valid primary keys
-        cleaned_tables = drop_unknown_references(
-            data=tables, 
-            metadata=Metadata.load_from_dict(metadata)
-        )
-        self.logger.info("Cleaned tables to enforce referential integrity.")
-
-        # Create the HMA model using the factory
+        if references_validated:
+            cleaned_tables = tables
+            self.logger.info("Foreign keys already validated, skipping reference cleanup.")
+        else:
+            from sdv.utils import drop_unknown_references
+            cleaned_tables = drop_unknown_references(
+                data=tables, 
+                metadata=load_sdv_metadata(metadata)
+            )
+            self.logger.info("Cleaned tables to enforce referential integrity.")
+
+        # Reuse a saved model trained on identical inputs
+        model_path = self.config.get('output', {}).get('model_path')
+        model_path = Path(model_path) if model_path else None
+        cache_config = self.config.get('cache', {})
+        fingerprint = None
+        self.reused = False
+        if model_path and cache_config.get('enabled', False) and cache_config.get('models', True):
+            fingerprint = training_fingerprint(cleaned_tables, metadata, self.config.get('model', {}))
+            if self._load_cached_model(model_path, fingerprint):
+                self.reused = True
+                self.logger.info(f"Reusing trained model from {model_path}, skipping training.")
+                return
+
+        # Create the synthesizer using the factory
         self.model = ModelFactory.create_model(metadata, self.config)
 
         # Train the synthesizer
+        seed_random_state(self.config.get('model', {}).get('random_seed'))
         self.model.fit(cleaned_tables)
         self.logger.debug("model.fit completed successfully.")
 
+        self.table_sizes = {table_name: len(df) for table_name, df in cleaned_tables.items()}
+        if self.config.get('model', {}).get('structmap_tree', True) and 'structMap' in cleaned_tables:
+            self.tree_model = StructMapTreeModel().fit(cleaned_tables['structMap'])
+
         # Save the model if a model path is specified
-        if 'model_path' in self.config.get('output', {}):
-            self._save_model(Path(self.config['output']['model_path']))
+        if model_path:
+            self._save_model(model_path, fingerprint)
 
         self.logger.info("Model training completed successfully.")
 
-    def sample(self, num_rows: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
+    def load(self, model_path: Path, metadata: Dict[str, Any]) -> None:
         """
-        Generate synthetic data using the trained HMA synthesizer model.
+        Load a model saved by a previous training run.
+
+        Args:
+            model_path: Path of the saved model.
+            metadata: SDV-compatible metadata the model was trained with.
+        """
+        self.logger.info(f"Loading trained model from {model_path}")
+        manifest = self._read_manifest(model_path)
+        model_type = manifest.get('model_type') or ModelFactory.model_type(self.config)
+        self.model = ModelFactory.load_model(model_path, model_type)
+        self.metadata = metadata
+        self._apply_manifest(manifest)
+
+    def sample(self, num_rows: Optional[Dict[str, int]] = None, seed: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Generate synthetic data using the trained synthesizer model.
 
         Args:
             num_rows: Optional dictionary specifying the number of rows to generate for each table.
                       Defaults to using values from the configuration or 100 rows per table if not provided.
+            seed: Seed for this sample. Defaults to ``model.random_seed``; if neither is set,
+                  the sampling state is not reset and samples continue from the previous one.
 
         Returns:
             Dictionary mapping table names to DataFrames containing synthetic data.
@@ -119,29 +284,186 @@ class GenerativeModel:
         if num_rows is None:
             num_rows = self.config.get('sampling', {}).get('num_rows', {})
             if not num_rows:
-                num_rows = {table: 100 for table in self.metadata.get('tables', {}).keys()}
-
-        # In SDV 1.20.0, the sample method doesn't accept num_rows parameter
-        # Instead, we need to call sample() without parameters and then filter the results
-        synthetic_data = self.model.sample()
-
-        # Limit the number of rows in each table based on num_rows
-        for table_name, count in num_rows.items():
-            if table_name in synthetic_data and len(synthetic_data[table_name]) > count:
-                synthetic_data[table_name] = synthetic_data[table_name].head(count)
+                num_rows = {table: DEFAULT_TABLE_ROWS for table in self.metadata.get('tables', {}).keys()}
+
+        # The synthesizers sample round(training rows * scale) root rows and sizes the child tables accordingly
+        scale = 1.0
+        training_rows = self.table_sizes.get(ROOT_TABLE)
+        if num_rows.get(ROOT_TABLE) and training_rows:
+            scale = num_rows[ROOT_TABLE] / training_rows
+        else:
+            self.logger.warning(f"Training size of {ROOT_TABLE} unknown, sampling at scale 1.0")
+        self.logger.debug(f"Sampling at scale {scale:.4f}")
+
+        if seed is None:
+            seed = self.config.get('model', {}).get('random_seed')
+        if seed is not None:
+            seed_random_state(seed)
+            reset_sampling(self.model, seed)
+
+        synthetic_data = self.model.sample(scale=scale)
+        synthetic_data = self._trim(synthetic_data, num_rows, seed)
+
+        if self.tree_model is not None and 'structMap' in synthetic_data:
+            synthetic_data['structMap'] = self.tree_model.sample(
+                synthetic_data['structMap'], synthetic_data.get('file'), np.random.default_rng(seed))
 
         self.logger.info(f"Generated synthetic data for {len(synthetic_data)} tables.")
         return synthetic_data
 
-    def _save_model(self, file_path: Path) -> None:
+    def _trim(self, synthetic_data: Dict[str, pd.DataFrame], num_rows: Dict[str, int],
+              seed: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
-        Save the trained model to a file.
+        Trim the sampled tables to the requested sizes without breaking references.
+
+        Root rows beyond the requested count are dropped together with their
+        children. Child tables are thinned by a seeded random selection, which
+        keeps rows of every parent rather than whole families at the front, and
+        references to trimmed rows are cleared.
+
+        Args:
+            synthetic_data: Dictionary mapping table names to sampled DataFrames.
+            num_rows: Requested number of rows per table.
+            seed: Seed of the row selection.
+
+        Returns:
+            Dictionary with the trimmed DataFrames.
+        """
+        rng = np.random.default_rng(seed)
+        trimmed = dict(synthetic_data)
+        removed: Dict[str, pd.Index] = {}
+
+        root_df = trimmed.get(ROOT_TABLE)
+        if root_df is not None and num_rows.get(ROOT_TABLE) is not None and len(root_df) > num_rows[ROOT_TABLE]:
+            trimmed[ROOT_TABLE] = root_df.head(num_rows[ROOT_TABLE])
+            kept_ids = pd.Index(trimmed[ROOT_TABLE]['dmd_id'])
+            for table_name, df in trimmed.items():
+                if table_name != ROOT_TABLE and 'dmd_id' in df.columns:
+                    trimmed[table_name] = df.loc[kept_ids.get_indexer(df['dmd_id']) >= 0]
+
+        for table_name, df in trimmed.items():
+            count = num_rows.get(table_name)
+            if table_name == ROOT_TABLE or count is None:
+                continue
+            if len(df) > count:
+                keep = np.zeros(len(df), dtype=bool)
+                keep[rng.choice(len(df), size=count, replace=False)] = True
+                trimmed[table_name] = df.loc[keep]
+            elif len(df) < count:
+                self.logger.info(f"Sampled {len(df)} {table_name} rows for the requested {count}")
+
+        for table_name, df in trimmed.items():
+            key = self.metadata.get('tables', {}).get(table_name, {}).get('primary_key') if self.metadata else None
+            if key and key in df.columns:
+                original_keys = pd.Index(synthetic_data[table_name][key])
+                removed[table_name] = original_keys[pd.Index(df[key]).get_indexer(original_keys) < 0]
+
+        for table_name, column, referenced_table, _ in CHILD_REFERENCES:
+            df = trimmed.get(table_name)
+            if df is None or column not in df.columns or not len(removed.get(referenced_table, [])):
+                continue
+            cleared = removed[referenced_table].get_indexer(df[column]) >= 0
+            if cleared.any():
+                df = df.copy()
+                df.loc[cleared, column] = None
+                trimmed[table_name] = df
+                self.logger.debug(f"Cleared {int(cleared.sum())} {table_name}.{column} references to trimmed rows")
+
+        return {table_name: df.reset_index(drop=True) for table_name, df in trimmed.items()}
+
+    @staticmethod
+    def _manifest_path(model_path: Path) -> Path:
+        """Return the path of the manifest stored next to a saved model."""
+        return model_path.with_name(model_path.name + '.manifest.json')
+
+    def _load_cached_model(self, model_path: Path, fingerprint: str) -> bool:
+        """
+        Load a saved model if its manifest matches the training fingerprint.
+
+        Args:
+            model_path: Path of the saved model.
+            fingerprint: Fingerprint of the current training inputs.
+
+        Returns:
+            True if the saved model was loaded, False if it is missing or stale.
+        """
+        if not model_path.exists():
+            return False
+
+        manifest = self._read_manifest(model_path)
+        if manifest.get('fingerprint') != fingerprint:
+            self.logger.info(f"Saved model in {model_path} is stale, retraining.")
+            return False
+
+        try:
+            self.model = ModelFactory.load_model(model_path, ModelFactory.model_type(self.config))
+        except Exception as e:
+            self.logger.warning(f"Could not load saved model {model_path}, retraining: {str(e)}")
+            return False
+        self._apply_manifest(manifest)
+        return True
+
+    def _apply_manifest(self, manifest: Dict[str, Any]) -> None:
+        """
+        Restore the training row counts and the structMap tree model from a manifest.
+
+        Args:
+            manifest: Manifest of a saved model.
+        """
+        self.table_sizes = manifest.get('rows', {})
+        tree = manifest.get('structmap_tree')
+        self.tree_model = StructMapTreeModel.from_dict(tree) if tree else None
+
+    def _read_manifest(self, model_path: Path) -> Dict[str, Any]:
+        """
+        Read the manifest stored next to a saved model.
+
+        Args:
+            model_path: Path of the saved model.
+
+        Returns:
+            The manifest, or an empty dictionary if it is missing or unreadable.
+        """
+        manifest_path = self._manifest_path(model_path)
+        if not manifest_path.exists():
+            return {}
+
+        try:
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable model manifest {manifest_path}: {str(e)}")
+            return {}
+
+    def _save_model(self, file_path: Path, fingerprint: Optional[str] = None) -> None:
+        """
+        Save the trained model to a file, together with its manifest.
+
+        The manifest of a previous model is removed before the new model is
+        written and the new manifest is written last, so an interrupted save
+        never leaves a manifest pointing at a different model.
 
         Args:
             file_path: Path where the model is to be saved.
+            fingerprint: Fingerprint of the training inputs, if the model cache is enabled.
         """
         self.logger.debug(f"Saving model to {file_path}")
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
+        manifest_path = self._manifest_path(file_path)
+        manifest_path.unlink(missing_ok=True)
         self.model.save(file_path)
+
+        # The training row counts are needed to sample from the saved model later
+        manifest = {
+            'fingerprint': fingerprint,
+            'sdv_version': version('sdv'),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'model_type': ModelFactory.model_type(self.config),
+            'rows': self.table_sizes,
+            'structmap_tree': self.tree_model.to_dict() if self.tree_model else None,
+        }
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
         self.logger.info(f"Model saved to {file_path}")
@@ -4,24 +4,38 @@ Module for orchestrating the entire METS XML synthesis pipeline.
 This module serves as the CLI entry point that orchestrates the entire process:
 data loading, metadata building, model training, synthetic sampling, XML reassembly,
 and XML validation. It loads configuration from a separate config.yaml file and
-logs progress and errors using the built-in logging module.
+logs progress and errors using the built-in logging module. Each stage is also
+available as a CLI subcommand (train, sample, reassemble, validate); the stages
+exchange the model, metadata, synthetic tables and XML through the output paths
+in the configuration. With ``sampling.batch_size`` set, tables are sampled,
+written and reassembled batch by batch. Runs record their seed, sampling
+settings and the SHA-256 hashes of their outputs in ``output.run_manifest_path``.
+With ``privacy.enabled``, sampled tables are checked for values copied from the
+training data, and the findings are added to the run manifest.
 """
 
 import argparse
+import hashlib
+import json
 import os
 import logging
 import sys
 import time
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
 
+import pandas as pd
 import yaml
+from lxml import etree
 
+from src.data_archive_ml_synthesizer.leakage import LeakageDetector
 from src.data_archive_ml_synthesizer.loader import DataLoader
 from src.data_archive_ml_synthesizer.metadata_builder import MetadataBuilder
 from src.data_archive_ml_synthesizer.model import GenerativeModel
 from src.data_archive_ml_synthesizer.sampler import Sampler
+from src.data_archive_ml_synthesizer.subsampler import Subsampler
 from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
-from src.data_archive_ml_synthesizer.validator import XMLValidator
+from src.data_archive_ml_synthesizer.writers import read_table
 
 
 def setup_logging(config: Dict[str, Any]) -> None:
@@ -97,6 +111,9 @@ class Pipeline:
         """
         self.config = config
         self.logger = logging.getLogger(__name__)
+        # Training tables of the last train call, indexed by the leakage detector
+        self.training_tables: Optional[Dict[str, pd.DataFrame]] = None
+        self.detector: Optional[LeakageDetector] = None
 
     def run(self) -> None:
         """
@@ -106,46 +123,35 @@ class Pipeline:
         self.logger.info("Starting METS XML synthesis pipeline")
 
         try:
-            # Step 1: Load data
-            data_loader = DataLoader(self.config)
-            dmdsec_df, file_df, structmap_df = data_loader.load_data()
+            # Steps 1-3: Load data, build metadata and train the model
+            model = self.train()
 
-            # Step 2: Build metadata
-            metadata_builder = MetadataBuilder(self.config)
-            metadata = metadata_builder.build_metadata(dmdsec_df, file_df, structmap_df)
-
-            # Step 3: Train model
-            model = GenerativeModel(self.config)
-            tables = {
-                'dmdSec': dmdsec_df,
-                'file': file_df,
-                'structMap': structmap_df
-            }
-            model.train(tables, metadata)
-
-            # Step 4: Sample synthetic data
-            sampler = Sampler(self.config, model)
-            synthetic_data = sampler.sample()
-
-            # Step 5: Reassemble XML
-            reassembler = XMLReassembler(self.config)
+            sampling_config = self.config.get('sampling', {})
             xml_output_path = self.config.get('output', {}).get('xml_output_path')
-            xml_root = reassembler.reassemble(synthetic_data, xml_output_path)
+            if sampling_config.get('batch_size') and not sampling_config.get('conditions'):
+                # Steps 4-5: Sample and reassemble batch by batch, the XML is only kept on disk
+                if xml_output_path:
+                    self.reassemble_batches(self.sample_batches(model))
+                else:
+                    self.logger.warning("No output.xml_output_path configured, batches are not reassembled")
+                    for _ in self.sample_batches(model):
+                        pass
+                xml_root = None
+            else:
+                # Step 4: Sample synthetic data
+                synthetic_data = self.sample(model)
+
+                # Step 5: Reassemble XML
+                xml_root = self.reassemble(synthetic_data)
 
             # Step 6: Validate XML
             if self.config.get('validation', {}).get('enabled', True):
-                validator = XMLValidator(self.config)
-                if xml_output_path:
-                    is_valid, error_messages = validator.validate(xml_output_path, detailed_output=True)
+                if xml_root is not None or xml_output_path:
+                    self.validate(xml_root=xml_root)
                 else:
-                    is_valid, error_messages = validator.validate_element(xml_root, detailed_output=True)
+                    self.logger.warning("Skipping validation, no XML document was written")
 
-                if not is_valid:
-                    self.logger.warning("XML validation failed with the following errors:")
-                    for error in error_messages:
-                        self.logger.warning(f"  - {error}")
-                else:
-                    self.logger.info("XML validation succeeded")
+            self.write_run_manifest()
 
             elapsed_time = time.time() - start_time
             self.logger.info(f"Pipeline completed successfully in {elapsed_time:.2f} seconds")
@@ -155,18 +161,298 @@ class Pipeline:
             self.logger.error(f"Pipeline failed after {elapsed_time:.2f} seconds: {str(e)}", exc_info=True)
             raise
 
+    def train(self) -> GenerativeModel:
+        """
+        Load the input data, build the metadata and train the model.
+
+        The metadata and the model are saved to ``output.metadata_path`` and
+        ``output.model_path``, from where the sample command loads them.
+
+        Returns:
+            The trained GenerativeModel.
+        """
+        # Step 1: Load data
+        data_loader = DataLoader(self.config)
+        dmdsec_df, file_df, structmap_df = data_loader.load_data()
+
+        # Optionally reduce the training data to a representative subsample
+        if self.config.get('subsample', {}).get('enabled', False):
+            subsample = Subsampler(self.config).subsample({
+                'dmdSec': dmdsec_df,
+                'file': file_df,
+                'structMap': structmap_df
+            })
+            dmdsec_df, file_df, structmap_df = subsample['dmdSec'], subsample['file'], subsample['structMap']
+
+        # Step 2: Build metadata
+        metadata_builder = MetadataBuilder(self.config)
+        metadata = metadata_builder.build_metadata(dmdsec_df, file_df, structmap_df)
+
+        # Step 3: Train model
+        model = GenerativeModel(self.config)
+        tables = {
+            'dmdSec': dmdsec_df,
+            'file': file_df,
+            'structMap': structmap_df
+        }
+        model.train(tables, metadata, references_validated=data_loader.references_clean)
+        self.training_tables = tables
+        return model
+
+    def leakage_detector(self) -> Optional[LeakageDetector]:
+        """
+        Build the detector of training data copies if ``privacy.enabled`` is set.
+
+        The detector indexes the tables of the last train call, or loads the input
+        data when sampling from a saved model.
+
+        Returns:
+            The fitted LeakageDetector, or None if the check is disabled.
+        """
+        if not self.config.get('privacy', {}).get('enabled', False):
+            return None
+        tables = self.training_tables
+        if tables is None:
+            dmdsec_df, file_df, structmap_df = DataLoader(self.config).load_data()
+            tables = {'dmdSec': dmdsec_df, 'file': file_df, 'structMap': structmap_df}
+        self.detector = LeakageDetector(self.config).fit(tables)
+        return self.detector
+
+    def load_model(self) -> GenerativeModel:
+        """
+        Load the model and metadata saved by a previous train command.
+
+        Returns:
+            The loaded GenerativeModel.
+
+        Raises:
+            ValueError: If the saved model or metadata is missing.
+        """
+        output_config = self.config.get('output', {})
+        model_path = output_config.get('model_path')
+        metadata_path = output_config.get('metadata_path')
+
+        for description, path in (('model', model_path), ('metadata', metadata_path)):
+            if not path or not os.path.exists(path):
+                error_msg = f"No saved {description} found at {path}, run the train command first"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+
+        with open(metadata_path, 'r') as f:
+            metadata = yaml.safe_load(f)
+
+        model = GenerativeModel(self.config)
+        model.load(Path(model_path), metadata)
+        return model
+
+    def sample(self, model: Optional[GenerativeModel] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Sample synthetic tables and save them to ``output.synthetic_data_paths``.
+
+        With ``sampling.conditions`` configured, only the rows matching the conditions are sampled.
+
+        Args:
+            model: Trained model; the saved model is loaded if omitted.
+
+        Returns:
+            Dictionary mapping table names to synthetic DataFrames.
+        """
+        if model is None:
+            model = self.load_model()
+
+        sampler = Sampler(self.config, model, self.leakage_detector())
+        if self.config.get('sampling', {}).get('conditions'):
+            return sampler.conditional_sample()
+        return sampler.sample()
+
+    def sample_batches(self, model: Optional[GenerativeModel] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Sample synthetic tables in batches, appending each to ``output.synthetic_data_paths``.
+
+        Args:
+            model: Trained model; the saved model is loaded if omitted.
+
+        Returns:
+            Iterator over dictionaries mapping table names to one batch of synthetic DataFrames.
+        """
+        if model is None:
+            model = self.load_model()
+
+        sampler = Sampler(self.config, model, self.leakage_detector())
+        return sampler.iter_batches()
+
+    def load_synthetic_data(self) -> Dict[str, pd.DataFrame]:
+        """
+        Load the synthetic tables saved by a previous sample command.
+
+        Returns:
+            Dictionary mapping table names to synthetic DataFrames.
+
+        Raises:
+            ValueError: If a synthetic table file is missing.
+        """
+        synthetic_data = {}
+        for table_name, file_path in self.config.get('output', {}).get('synthetic_data_paths', {}).items():
+            if not file_path or not os.path.exists(file_path):
+                error_msg = f"No synthetic {table_name} table found at {file_path}, run the sample command first"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+
+            # Values are read back as written by the Sampler, without type or date inference
+            synthetic_data[table_name] = read_table(file_path, self.config.get('output', {}).get('compression'))
+            self.logger.info(f"Loaded {len(synthetic_data[table_name])} synthetic {table_name} rows from {file_path}")
+        return synthetic_data
+
+    def reassemble(self, synthetic_data: Optional[Dict[str, pd.DataFrame]] = None) -> etree._Element:
+        """
+        Reassemble synthetic tables into a METS XML document.
+
+        Args:
+            synthetic_data: Synthetic tables; the saved tables are loaded if omitted.
+
+        Returns:
+            The root element of the METS document, also saved to ``output.xml_output_path``.
+        """
+        if synthetic_data is None:
+            synthetic_data = self.load_synthetic_data()
+
+        reassembler = XMLReassembler(self.config)
+        xml_output_path = self.config.get('output', {}).get('xml_output_path')
+        return reassembler.reassemble(synthetic_data, xml_output_path)
+
+    def reassemble_batches(self, batches: Iterator[Dict[str, pd.DataFrame]]) -> int:
+        """
+        Reassemble batches of synthetic tables into a METS XML document written incrementally.
+
+        Args:
+            batches: Iterator over batches of synthetic tables.
+
+        Returns:
+            Number of dmdSec elements written to ``output.xml_output_path``.
+        """
+        reassembler = XMLReassembler(self.config)
+        xml_output_path = self.config.get('output', {}).get('xml_output_path')
+        return reassembler.reassemble_batches(batches, xml_output_path)
+
+    def validate(self, xml_paths: Optional[List[str]] = None, xml_root: Optional[etree._Element] = None) -> bool:
+        """
+        Validate METS XML documents against the XSD schemas.
+
+        Args:
+            xml_paths: Paths of the documents to validate; defaults to ``output.xml_output_path``.
+            xml_root: In-memory document, validated when no path is configured.
+
+        Returns:
+            True if all documents are valid.
+
+        Raises:
+            ValueError: If there is no document to validate.
+        """
+        if xml_paths is None:
+            xml_output_path = self.config.get('output', {}).get('xml_output_path')
+            xml_paths = [xml_output_path] if xml_output_path else []
+
+        if not xml_paths and xml_root is None:
+            error_msg = "No XML document to validate"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        # xmlschema is only loaded by the runs that validate
+        from src.data_archive_ml_synthesizer.validator import XMLValidator
+        validator = XMLValidator(self.config)
+        if xml_paths:
+            results = [validator.validate(xml_path, detailed_output=True) for xml_path in xml_paths]
+        else:
+            results = [validator.validate_element(xml_root, detailed_output=True)]
+
+        all_valid = True
+        for is_valid, error_messages in results:
+            if not is_valid:
+                all_valid = False
+                self.logger.warning("XML validation failed with the following errors:")
+                for error in error_messages:
+                    self.logger.warning(f"  - {error}")
+            else:
+                self.logger.info("XML validation succeeded")
+        return all_valid
+
+    def write_run_manifest(self) -> Optional[str]:
+        """
+        Record the seed, the sampling settings and the hashes of the outputs.
+
+        Runs with the same seed and settings produce identical outputs, so the
+        hashes can be compared between runs or used as cache keys.
+
+        Returns:
+            Path of the manifest, or None if ``output.run_manifest_path`` is not set.
+        """
+        output_config = self.config.get('output', {})
+        manifest_path = output_config.get('run_manifest_path')
+        if not manifest_path:
+            return None
+
+        output_paths = dict(output_config.get('synthetic_data_paths', {}))
+        output_paths['xml'] = output_config.get('xml_output_path')
+        outputs = {}
+        for name, file_path in output_paths.items():
+            if file_path and os.path.exists(file_path):
+                hasher = hashlib.sha256()
+                with open(file_path, 'rb') as f:
+                    for block in iter(lambda: f.read(1 << 20), b''):
+                        hasher.update(block)
+                outputs[name] = {'path': file_path, 'sha256': hasher.hexdigest()}
+
+        manifest = {
+            'random_seed': self.config.get('model', {}).get('random_seed'),
+            'sampling': self.config.get('sampling', {}),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'outputs': outputs,
+        }
+        if self.detector is not None:
+            manifest['privacy'] = self.detector.report
+        Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        self.logger.info(f"Run manifest saved to {manifest_path}")
+        return manifest_path
+
 
 def main():
     """
     Main entry point for the CLI.
+
+    Without a command the whole pipeline is run. The train, sample, reassemble
+    and validate commands run single stages that exchange artifacts through the
+    output paths in the configuration, so one trained model can serve many
+    sampling runs.
     """
     parser = argparse.ArgumentParser(description='METS XML Synthesis Pipeline')
     parser.add_argument('--config', '-c', type=str, default='config.yaml',
                         help='Path to configuration file (default: config.yaml)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the parsed-table and model caches for this run')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.add_parser('run', help='Run the whole pipeline (default)')
+    subparsers.add_parser('train', help='Load the input data and train and save the model')
+    sample_parser = subparsers.add_parser('sample', help='Sample synthetic tables from the saved model')
+    sample_parser.add_argument('--model', type=str, help='Path to the saved model (default: output.model_path)')
+    reassemble_parser = subparsers.add_parser('reassemble', help='Reassemble the saved synthetic tables into METS XML')
+    reassemble_parser.add_argument('--output', '-o', type=str,
+                                   help='Path of the XML document (default: output.xml_output_path)')
+    validate_parser = subparsers.add_parser('validate', help='Validate METS XML documents')
+    validate_parser.add_argument('xml_paths', nargs='*', metavar='XML',
+                                 help='Documents to validate (default: output.xml_output_path)')
     args = parser.parse_args()
 
     # Load configuration
     config = load_config(args.config)
+    if args.no_cache:
+        config.setdefault('cache', {})['enabled'] = False
+    if getattr(args, 'model', None):
+        config.setdefault('output', {})['model_path'] = args.model
+    if getattr(args, 'output', None):
+        config.setdefault('output', {})['xml_output_path'] = args.output
 
     # Set up logging
     setup_logging(config)
@@ -174,11 +460,27 @@ def main():
     # Create and run pipeline
     try:
         pipeline = Pipeline(config)
-        pipeline.run()
+        if args.command == 'train':
+            pipeline.train()
+        elif args.command == 'sample':
+            sampling_config = config.get('sampling', {})
+            if sampling_config.get('batch_size') and not sampling_config.get('conditions'):
+                for _ in pipeline.sample_batches():
+                    pass
+            else:
+                pipeline.sample()
+            pipeline.write_run_manifest()
+        elif args.command == 'reassemble':
+            pipeline.reassemble()
+            pipeline.write_run_manifest()
+        elif args.command == 'validate':
+            if not pipeline.validate(args.xml_paths or None):
+                sys.exit(1)
+        else:
+            pipeline.run()
     except Exception as e:
         logging.error(f"Pipeline execution failed: {str(e)}")
         sys.exit(1)
 
-
 if __name__ == '__main__':
     main()
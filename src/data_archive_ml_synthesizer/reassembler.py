@@ -5,11 +5,19 @@ This module provides functionality to convert synthetic JSON data back into
 a valid METS XML document using lxml. It implements the XML structure with
 correct tags and namespaces, including dmdSec, amdSec, fileSec, and structMap
 sections.
+
+Batches of synthetic tables can also be written incrementally. The dmdSec
+elements of each batch are streamed to the document right away, while the
+file and structMap rows are spooled to a temporary directory until all
+dmdSec elements are written, since METS places the fileSec and structMap
+sections after them.
 """
 
 import logging
+import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 
 import pandas as pd
 from lxml import etree
@@ -52,14 +60,7 @@ class XMLReassembler:
         self.logger.info("Reassembling synthetic data into METS XML...")
 
         # Extract DataFrames
-        dmdsec_df = synthetic_data.get('dmdSec')
-        file_df = synthetic_data.get('file')
-        structmap_df = synthetic_data.get('structMap')
-
-        if dmdsec_df is None or file_df is None or structmap_df is None:
-            error_msg = "Missing required synthetic data tables."
-            self.logger.error(error_msg)
-            raise ValueError(error_msg)
+        dmdsec_df, file_df, structmap_df = self._split_tables(synthetic_data)
 
         # Create root METS element
         root = self._create_mets_root()
@@ -89,6 +90,103 @@ class XMLReassembler:
         self.logger.info("METS XML reassembly completed successfully.")
         return root
 
+    def reassemble_batches(self, batches: Iterable[Dict[str, pd.DataFrame]],
+                           output_path: Optional[str] = None) -> int:
+        """
+        Reassemble batches of synthetic data into a METS XML document written incrementally.
+
+        Only one batch is held in memory at a time. The batches must be
+        referentially self-contained, as yielded by ``Sampler.iter_batches``.
+
+        Args:
+            batches: Iterable of dictionaries mapping table names to DataFrames.
+            output_path: Path of the XML document. If not provided, uses the path from config.
+
+        Returns:
+            Number of dmdSec elements written.
+
+        Raises:
+            ValueError: If no output path is available or a batch misses a table.
+        """
+        if output_path is None:
+            output_path = self.config.get('output', {}).get('xml_output_path')
+        if not output_path:
+            error_msg = "Batched reassembly needs an output path."
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        self.logger.info(f"Reassembling synthetic data batches into {output_path}...")
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        mets = self._create_mets_root()
+        dmdsec_count = 0
+
+        with tempfile.TemporaryDirectory(prefix='mets-spool-') as spool_dir:
+            part_paths = []
+            with etree.xmlfile(output_path, encoding='utf-8') as xf:
+                xf.write_declaration()
+                with xf.element(mets.tag, nsmap=self.NAMESPACES):
+                    for header in mets:
+                        xf.write(header, pretty_print=True)
+
+                    for index, batch in enumerate(batches):
+                        dmdsec_df, file_df, structmap_df = self._split_tables(batch)
+                        holder = etree.Element('batch')
+                        self._create_dmdsec_elements(holder, dmdsec_df)
+                        for dmdsec in holder:
+                            xf.write(dmdsec, pretty_print=True)
+                        dmdsec_count += len(dmdsec_df)
+
+                        part_path = os.path.join(spool_dir, f"part-{index}.pkl")
+                        pd.to_pickle((file_df, structmap_df), part_path)
+                        part_paths.append(part_path)
+
+                    holder = etree.Element('batch')
+                    self._create_amdsec_elements(holder)
+                    xf.write(holder[0], pretty_print=True)
+
+                    with xf.element(f"{{{self.NAMESPACES['mets']}}}fileSec"):
+                        with xf.element(f"{{{self.NAMESPACES['mets']}}}fileGrp", USE="CONTENT"):
+                            for part_path in part_paths:
+                                file_df, _ = pd.read_pickle(part_path)
+                                holder = etree.Element('batch')
+                                self._create_filesec_elements(holder, file_df)
+                                for file_elem in holder[0][0]:
+                                    xf.write(file_elem, pretty_print=True)
+
+                    with xf.element(f"{{{self.NAMESPACES['mets']}}}structMap", TYPE="LOGICAL"):
+                        for part_path in part_paths:
+                            file_df, structmap_df = pd.read_pickle(part_path)
+                            holder = etree.Element('batch')
+                            self._create_structmap_elements(holder, structmap_df, self._build_file_id_mapping(file_df))
+                            for div in holder[0]:
+                                xf.write(div, pretty_print=True)
+
+        self.logger.info(f"Wrote {dmdsec_count} dmdSec elements in {len(part_paths)} batches to {output_path}")
+        return dmdsec_count
+
+    def _split_tables(self, synthetic_data: Dict[str, pd.DataFrame]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """
+        Extract the dmdSec, file and structMap DataFrames.
+
+        Args:
+            synthetic_data: Dictionary mapping table names to DataFrames.
+
+        Returns:
+            Tuple of the dmdSec, file and structMap DataFrames.
+
+        Raises:
+            ValueError: If a table is missing.
+        """
+        dmdsec_df = synthetic_data.get('dmdSec')
+        file_df = synthetic_data.get('file')
+        structmap_df = synthetic_data.get('structMap')
+
+        if dmdsec_df is None or file_df is None or structmap_df is None:
+            error_msg = "Missing required synthetic data tables."
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+        return dmdsec_df, file_df, structmap_df
+
     def _create_mets_root(self) -> etree._Element:
         """
         Create the root METS element with appropriate namespaces.
@@ -291,6 +389,7 @@ class XMLReassembler:
 
         # Second pass: build the hierarchy
         root_divs = []
+        orphans = 0
         for _, row in structmap_df.iterrows():
             struct_id = row['struct_id']
             parent_id = row['parent_id']
@@ -302,6 +401,11 @@ class XMLReassembler:
                 # This is a child division
                 if parent_id in divisions:
                     divisions[parent_id].append(divisions[struct_id])
+                else:
+                    orphans += 1
+
+        if orphans:
+            self.logger.warning(f"Dropped {orphans} structMap divisions whose parent_id refers to no division")
 
         # Add root divisions to structMap
         for div in root_divs:
@@ -2,17 +2,95 @@
 Module for sampling synthetic data.
 
 This module provides functionality for sampling synthetic data from
-trained generative models. While it currently wraps the synthetic data
-sampling function from the model, it's designed to be easily extended
-for conditional sampling in the future.
+trained generative models. It wraps the synthetic data sampling function
+from the model and adds conditional sampling of targeted slices.
+
+Large corpora can be sampled in batches of dmdSec records with their files and
+structMap divs. Each batch is referentially self-contained, its IDs are made
+unique across batches, and it is appended to the output files by writer
+threads while the next batch is generated, so memory use does not grow with
+the corpus size. The output formats and compression are handled by the
+writers module.
+
+Sampling can also be spread over a process pool. Every worker loads the saved
+model once and samples shards with seeds derived from ``model.random_seed``;
+shard IDs are prefixed with the shard number and the shards are merged in
+order, so the same seed and shard count give the same output.
+
+Conditional sampling generates rows of one table that match fixed column
+values, together with their dmdSec records and the children of those records.
+SDV's multi-table synthesizers do not support conditions, so candidates are
+drawn from the model in batches sized by the observed acceptance rate and
+filtered, with a cap on the rejected rows per condition. Identical conditions
+are merged into one request.
 """
 
+import json
 import logging
-from typing import Dict, Any, Optional
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from src.data_archive_ml_synthesizer.model import GenerativeModel
+from src.data_archive_ml_synthesizer.constraints import ConstraintEngine
+from src.data_archive_ml_synthesizer.leakage import LeakageDetector
+from src.data_archive_ml_synthesizer.model import GenerativeModel, CHILD_REFERENCES, DEFAULT_TABLE_ROWS, ROOT_TABLE
+from src.data_archive_ml_synthesizer.writers import TableWriterPool, write_tables
+
+
+# Default number of dmdSec records per batch
+DEFAULT_BATCH_SIZE = 10_000
+
+# Default number of rejected candidate rows allowed per requested row of a condition
+DEFAULT_REJECTION_BUDGET = 100
+
+# Columns holding primary keys or references, qualified per batch to keep IDs unique
+ID_COLUMNS = {
+    'dmdSec': ['dmd_id'],
+    'file': ['file_id', 'dmd_id'],
+    'structMap': ['struct_id', 'dmd_id', 'file_id', 'parent_id'],
+}
+
+
+# Model loaded by each parallel sampling worker
+_worker_model: Optional[GenerativeModel] = None
+
+
+def _init_shard_worker(config: Dict[str, Any], metadata: Dict[str, Any]) -> None:
+    """
+    Load the saved model once in a parallel sampling worker.
+
+    Args:
+        config: Configuration dictionary of the calling Sampler.
+        metadata: SDV-compatible metadata the model was trained with.
+    """
+    global _worker_model
+    _worker_model = GenerativeModel(config)
+    _worker_model.load(Path(config['output']['model_path']), metadata)
+
+
+def _sample_shard(index: int, num_rows: Dict[str, int], seed: int) -> Dict[str, pd.DataFrame]:
+    """
+    Sample one shard in a parallel sampling worker.
+
+    The model's sampling state is reset and the random generators are seeded
+    with the shard's seed, so the shard does not depend on which worker samples
+    it or on the shards sampled before.
+
+    Args:
+        index: Shard number, used as ID prefix.
+        num_rows: Number of rows per table in this shard.
+        seed: Seed of this shard.
+
+    Returns:
+        Dictionary mapping table names to the shard's DataFrames.
+    """
+    shard = _worker_model.sample(num_rows=num_rows, seed=seed)
+    return Sampler._qualify_ids(shard, f"s{index}_")
 
 
 class Sampler:
@@ -20,17 +98,23 @@ class Sampler:
     Class for sampling synthetic data from trained generative models.
     """
 
-    def __init__(self, config: Dict[str, Any], model: GenerativeModel):
+    def __init__(self, config: Dict[str, Any], model: GenerativeModel,
+                 leakage_detector: Optional[LeakageDetector] = None):
         """
         Initialize the Sampler with configuration and a trained model.
 
         Args:
             config: Dictionary containing configuration parameters.
             model: Trained GenerativeModel instance.
+            leakage_detector: Detector fitted on the training tables, scanning every sampled table for copies.
         """
         self.config = config
         self.model = model
+        self.leakage_detector = leakage_detector
         self.logger = logging.getLogger(__name__)
+        # Acceptance statistics of the last conditional sample, one entry per condition
+        self.condition_report: List[Dict[str, Any]] = []
+        self.constraints = ConstraintEngine(config.get('constraints') or [], model.metadata)
 
     def sample(self, num_rows: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
         """
@@ -45,8 +129,11 @@ class Sampler:
         """
         self.logger.info("Sampling synthetic data...")
         
-        # Sample from the model
-        synthetic_data = self.model.sample(num_rows=num_rows)
+        # Sample from the model, in a process pool if several workers are configured
+        if int(self.config.get('sampling', {}).get('workers') or 1) > 1:
+            synthetic_data = self.parallel_sample(num_rows=num_rows)
+        else:
+            synthetic_data = self.model.sample(num_rows=num_rows)
         
         # Apply any post-processing if needed
         synthetic_data = self._post_process(synthetic_data)
@@ -55,79 +142,426 @@ class Sampler:
         if 'synthetic_data_paths' in self.config.get('output', {}):
             self._save_synthetic_data(synthetic_data)
         
+        if self.leakage_detector is not None:
+            self.leakage_detector.log_report()
         self.logger.info("Sampling completed successfully.")
         return synthetic_data
 
-    def conditional_sample(self, conditions: Dict[str, Dict[str, Any]], 
-                          num_rows: Optional[Dict[str, int]] = None) -> Dict[str, pd.DataFrame]:
+    def parallel_sample(self, num_rows: Optional[Dict[str, int]] = None, workers: Optional[int] = None,
+                        shards: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
-        Generate synthetic data with conditions.
-        
-        This is a placeholder for future extension to support conditional sampling.
+        Generate synthetic data in shards sampled by a process pool.
+
+        The requested rows are split evenly over the shards. Each worker loads the
+        model saved at ``output.model_path`` once; shard ``i`` is sampled with the
+        ``i``-th seed spawned from ``model.random_seed`` and its IDs are prefixed
+        with ``s{i}_``. The shards are concatenated in order.
 
         Args:
-            conditions: Dictionary mapping table names to dictionaries of column-value conditions.
             num_rows: Optional dictionary specifying the number of rows to generate for each table.
+                      If not provided, uses the values from the configuration.
+            workers: Number of worker processes. Defaults to ``sampling.workers`` or the number of CPUs.
+            shards: Number of shards. Defaults to ``sampling.shards`` or the number of workers.
 
         Returns:
             Dictionary mapping table names to DataFrames containing synthetic data.
 
         Raises:
-            NotImplementedError: This feature is not yet implemented.
+            ValueError: If the model has not been saved.
+        """
+        sampling_config = self.config.get('sampling', {})
+        model_path = self.config.get('output', {}).get('model_path')
+        if not model_path or not os.path.exists(model_path):
+            error_msg = f"Parallel sampling needs the model saved at output.model_path, found none at {model_path}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        # Defaults are resolved before splitting, so the total does not grow with the shard count
+        num_rows = num_rows or sampling_config.get('num_rows') or {
+            table_name: DEFAULT_TABLE_ROWS for table_name in self.model.metadata.get('tables', {})}
+        workers = int(workers or sampling_config.get('workers') or os.cpu_count() or 1)
+        shards = int(shards or sampling_config.get('shards') or workers)
+        shard_rows = self._split_rows(num_rows, shards)
+
+        # Shard seeds depend only on the configured seed and the shard count
+        seeds = self._spawn_seeds(shards)
+
+        self.logger.info(f"Sampling {shards} shards with {workers} workers...")
+        with ProcessPoolExecutor(max_workers=min(workers, shards), initializer=_init_shard_worker,
+                                 initargs=(self.config, self.model.metadata)) as executor:
+            results = list(executor.map(_sample_shard, range(shards), shard_rows, seeds))
+
+        return {
+            table_name: pd.concat([shard[table_name] for shard in results], ignore_index=True)
+            for table_name in results[0]
+        }
+
+    def _spawn_seeds(self, count: int) -> List[int]:
+        """
+        Derive independent seeds from ``model.random_seed``.
+
+        Args:
+            count: Number of seeds.
+
+        Returns:
+            List of seeds, random if no seed is configured.
+        """
+        seed_sequence = np.random.SeedSequence(self.config.get('model', {}).get('random_seed'))
+        return [int(child.generate_state(1)[0]) for child in seed_sequence.spawn(count)]
+
+    @staticmethod
+    def _split_rows(num_rows: Dict[str, int], shards: int) -> List[Dict[str, int]]:
+        """
+        Split the requested rows evenly over the shards.
+
+        Args:
+            num_rows: Number of rows per table.
+            shards: Number of shards.
+
+        Returns:
+            List with the number of rows per table for each shard.
+        """
+        return [
+            {table_name: count // shards + (1 if index < count % shards else 0)
+             for table_name, count in num_rows.items()}
+            for index in range(shards)
+        ]
+
+    def iter_batches(self, batch_size: Optional[int] = None,
+                     num_rows: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, pd.DataFrame]]:
+        """
+        Generate synthetic data in referentially self-contained batches.
+
+        Each batch holds up to ``batch_size`` dmdSec rows together with their files
+        and structMap divs. Child tables get their share of the requested rows in
+        proportion to the batch's dmdSec rows. IDs are prefixed with the batch
+        number, so they are unique across batches, and batch ``i`` is sampled with
+        the ``i``-th seed spawned from ``model.random_seed``. If output paths are configured,
+        every batch is appended to the output files on a thread pool, and the files
+        are moved into place once all batches are written.
+
+        Args:
+            batch_size: Number of dmdSec rows per batch. Defaults to ``sampling.batch_size``.
+            num_rows: Optional dictionary specifying the total number of rows for each table.
+                      If not provided, uses the values from the configuration.
+
+        Yields:
+            Dictionaries mapping table names to DataFrames containing one batch.
+
+        Raises:
+            ValueError: If the batch size or the number of dmdSec rows is not positive.
         """
-        self.logger.warning("Conditional sampling is not yet implemented.")
-        raise NotImplementedError("Conditional sampling is not yet implemented.")
+        sampling_config = self.config.get('sampling', {})
+        batch_size = batch_size or sampling_config.get('batch_size') or DEFAULT_BATCH_SIZE
+        num_rows = num_rows or sampling_config.get('num_rows', {})
+        total = num_rows.get(ROOT_TABLE, 0)
+        if batch_size <= 0 or total <= 0:
+            error_msg = f"Batched sampling needs a positive batch size and {ROOT_TABLE} row count"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        num_batches = -(-total // batch_size)
+        self.logger.info(f"Sampling {total} {ROOT_TABLE} rows in {num_batches} batches of up to {batch_size}...")
+
+        output_config = self.config.get('output', {})
+        writers = TableWriterPool(output_config.get('synthetic_data_paths', {}), output_config.get('compression'),
+                                  output_config.get('write_workers'))
+        emitted = {table_name: 0 for table_name in num_rows}
+        seeds = self._spawn_seeds(num_batches)
+        try:
+            for index in range(num_batches):
+                # The last batch takes the remainder, so the totals match the request exactly
+                batch_roots = min(batch_size, total - emitted[ROOT_TABLE])
+                batch_rows = {}
+                for table_name, count in num_rows.items():
+                    if index == num_batches - 1:
+                        batch_rows[table_name] = count - emitted[table_name]
+                    else:
+                        batch_rows[table_name] = round(count * (emitted[ROOT_TABLE] + batch_roots) / total) \
+                            - emitted[table_name]
+
+                batch = self.model.sample(num_rows=batch_rows, seed=seeds[index])
+                batch = self._post_process(batch, seeds[index])
+                batch = self._qualify_ids(batch, f"b{index}_")
+                for table_name, count in batch_rows.items():
+                    emitted[table_name] += count
+
+                writers.write(batch)
+                self.logger.debug(f"Sampled batch {index + 1}/{num_batches}")
+                yield batch
+        except BaseException:
+            # Interrupted runs leave the previous outputs in place
+            writers.abort()
+            raise
+        writers.close()
 
-    def _post_process(self, synthetic_data: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        if self.leakage_detector is not None:
+            self.leakage_detector.log_report()
+        self.logger.info("Batched sampling completed successfully.")
+
+    @staticmethod
+    def _qualify_ids(batch: Dict[str, pd.DataFrame], prefix: str) -> Dict[str, pd.DataFrame]:
+        """
+        Prefix the primary keys and references of a batch.
+
+        Args:
+            batch: Dictionary mapping table names to DataFrames.
+            prefix: Prefix prepended to every non-null ID.
+
+        Returns:
+            Dictionary with the qualified DataFrames.
+        """
+        qualified = {}
+        for table_name, df in batch.items():
+            columns = [column for column in ID_COLUMNS.get(table_name, []) if column in df.columns]
+            if columns:
+                df = df.copy()
+                for column in columns:
+                    values = df[column].astype(object)
+                    df[column] = values.where(values.isna(), prefix + values.astype(str))
+            qualified[table_name] = df
+        return qualified
+
+    def conditional_sample(self, conditions: Optional[List[Dict[str, Any]]] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Generate synthetic data matching conditions.
+
+        Each condition asks for ``num_rows`` rows of ``table`` whose columns equal
+        ``column_values``. The matching rows come with their dmdSec records and
+        the other child rows of those records; references to rows that were not
+        selected are cleared. Conditions on the same table and values are merged.
+
+        Candidates are sampled in batches of dmdSec records, with the size of each
+        batch derived from the acceptance rate observed so far, and IDs are
+        prefixed with ``g{condition}_{batch}_``. A condition stops once its rejected
+        candidate rows exceed ``sampling.rejection_budget`` times its requested rows,
+        returning the rows found so far. The acceptance statistics are kept in
+        ``condition_report``.
+
+        Args:
+            conditions: List of dictionaries with ``table``, ``column_values`` and ``num_rows``.
+                        If not provided, uses ``sampling.conditions`` from the configuration.
+
+        Returns:
+            Dictionary mapping table names to DataFrames containing synthetic data.
+
+        Raises:
+            ValueError: If a condition names an unknown table or column, or no row matches any condition.
+        """
+        sampling_config = self.config.get('sampling', {})
+        groups = self._group_conditions(conditions or sampling_config.get('conditions') or [])
+        budget = float(sampling_config.get('rejection_budget') or DEFAULT_REJECTION_BUDGET)
+        batch_size = int(sampling_config.get('batch_size') or DEFAULT_BATCH_SIZE)
+        seed_sequences = np.random.SeedSequence(self.config.get('model', {}).get('random_seed')).spawn(len(groups))
+
+        self.logger.info(f"Sampling {len(groups)} conditions...")
+        self.condition_report = []
+        selections = []
+        for index, (table_name, column_values, requested) in enumerate(groups):
+            selection, stats = self._sample_condition(index, table_name, column_values, requested,
+                                                      budget, batch_size, seed_sequences[index])
+            selections.extend(selection)
+            self.condition_report.append(stats)
+
+        if not selections:
+            error_msg = "Unable to sample any rows for the given conditions"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        synthetic_data = {
+            table_name: pd.concat([selection[table_name] for selection in selections], ignore_index=True)
+            for table_name in selections[0]
+        }
+        synthetic_data = self._post_process(synthetic_data)
+        if 'synthetic_data_paths' in self.config.get('output', {}):
+            self._save_synthetic_data(synthetic_data)
+
+        if self.leakage_detector is not None:
+            self.leakage_detector.log_report()
+        self.logger.info("Conditional sampling completed successfully.")
+        return synthetic_data
+
+    def _group_conditions(self, conditions: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any], int]]:
+        """
+        Validate the conditions and merge those on the same table and values.
+
+        Args:
+            conditions: List of dictionaries with ``table``, ``column_values`` and ``num_rows``.
+
+        Returns:
+            List of (table name, column values, number of rows) in order of first appearance.
+
+        Raises:
+            ValueError: If a condition names an unknown table or column.
+        """
+        tables = self.model.metadata.get('tables', {}) if self.model.metadata else {}
+        groups: Dict[str, list] = {}
+        for condition in conditions:
+            table_name = condition.get('table')
+            column_values = dict(condition.get('column_values') or {})
+            columns = tables.get(table_name, {}).get('columns', {})
+            unknown = [column for column in column_values if column not in columns]
+            if table_name not in tables or unknown:
+                error_msg = f"Invalid condition on {table_name}: unknown table or columns {unknown}"
+                self.logger.error(error_msg)
+                raise ValueError(error_msg)
+            key = json.dumps([table_name, column_values], sort_keys=True, default=str)
+            if key in groups:
+                groups[key][2] += int(condition.get('num_rows', 0))
+            else:
+                groups[key] = [table_name, column_values, int(condition.get('num_rows', 0))]
+        return [tuple(group) for group in groups.values() if group[2] > 0]
+
+    def _sample_condition(self, index: int, table_name: str, column_values: Dict[str, Any], requested: int,
+                          budget: float, batch_size: int,
+                          seed_sequence: np.random.SeedSequence
+                          ) -> Tuple[List[Dict[str, pd.DataFrame]], Dict[str, Any]]:
+        """
+        Sample the rows of one condition by batched rejection.
+
+        Args:
+            index: Condition number, used in the ID prefixes.
+            table_name: Table the condition applies to.
+            column_values: Required column values.
+            requested: Number of matching rows to sample.
+            budget: Rejected candidate rows allowed per requested row.
+            batch_size: Maximum number of dmdSec records sampled per batch.
+            seed_sequence: Seed sequence from which the batch seeds are spawned.
+
+        Returns:
+            Tuple of the list of selected batches and the acceptance statistics.
+        """
+        # Candidate rows of the table per sampled dmdSec record, from the training sizes
+        sizes = self.model.table_sizes
+        rows_per_root = sizes.get(table_name, 1) / sizes[ROOT_TABLE] if sizes.get(ROOT_TABLE) else 1.0
+        max_rejected = budget * requested
+
+        selections = []
+        accepted = candidates = batches = 0
+        while accepted < requested and candidates - accepted <= max_rejected:
+            # Aim at the missing rows at the observed acceptance rate, bounded by the budget's worst case
+            rate = max(accepted / candidates, 1 / budget) if candidates else 1.0
+            wanted = math.ceil((requested - accepted) / rate * 1.1)
+            roots = max(1, min(batch_size, math.ceil(wanted / max(rows_per_root, 1e-9))))
+            seed = int(seed_sequence.spawn(1)[0].generate_state(1)[0])
+            batch = self._qualify_ids(self.model.sample(num_rows={ROOT_TABLE: roots}, seed=seed),
+                                      f"g{index}_{batches}_")
+            batches += 1
+
+            df = batch.get(table_name)
+            if df is None or df.empty:
+                self.logger.warning(f"Batch {batches} of condition {index} holds no {table_name} rows")
+                break
+            mask = np.ones(len(df), dtype=bool)
+            for column, value in column_values.items():
+                mask &= df[column].eq(value).fillna(False).to_numpy(dtype=bool)
+            matched = int(mask.sum())
+            take = min(matched, requested - accepted)
+            candidates += len(df) if take == matched else int(np.flatnonzero(mask)[take - 1]) + 1
+            if take:
+                selections.append(self._select_matches(batch, table_name, df.loc[mask].head(take)))
+                accepted += take
+
+        stats = {
+            'table': table_name,
+            'column_values': column_values,
+            'requested': requested,
+            'sampled': accepted,
+            'candidates': candidates,
+            'rejection_rate': 1 - accepted / candidates if candidates else 0.0,
+            'batches': batches,
+        }
+        self.logger.info(f"Condition {table_name} {column_values}: {accepted}/{requested} rows from "
+                         f"{candidates} candidates in {batches} batches, "
+                         f"rejection rate {stats['rejection_rate']:.1%}")
+        if accepted < requested:
+            self.logger.warning(f"Rejection budget of condition {table_name} {column_values} exhausted, "
+                                f"sampled {accepted} of {requested} rows")
+        return selections, stats
+
+    @staticmethod
+    def _select_matches(batch: Dict[str, pd.DataFrame], table_name: str,
+                        matched: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Keep the matching rows, their dmdSec records and the other child rows of those records.
+
+        Args:
+            batch: Dictionary mapping table names to a sampled batch.
+            table_name: Table the condition applies to.
+            matched: Matching rows of that table.
+
+        Returns:
+            Dictionary with the selected rows, references to unselected rows cleared.
+        """
+        root_ids = pd.Index(matched['dmd_id'].dropna().unique()) if 'dmd_id' in matched.columns else pd.Index([])
+        selected = {}
+        for name, df in batch.items():
+            if name == table_name:
+                selected[name] = matched
+            elif 'dmd_id' in df.columns:
+                selected[name] = df.loc[root_ids.get_indexer(df['dmd_id']) >= 0]
+            else:
+                selected[name] = df.iloc[:0]
+
+        for name, column, referenced_table, referenced_key in CHILD_REFERENCES:
+            df = selected.get(name)
+            if df is None or column not in df.columns or referenced_table not in selected:
+                continue
+            dangling = df[column].notna() & ~df[column].isin(selected[referenced_table][referenced_key])
+            if dangling.any():
+                df = df.copy()
+                df.loc[dangling, column] = None
+                selected[name] = df
+        return {name: df.reset_index(drop=True) for name, df in selected.items()}
+
+    def _post_process(self, synthetic_data: Dict[str, pd.DataFrame],
+                      seed: Optional[int] = None) -> Dict[str, pd.DataFrame]:
         """
         Apply post-processing to the synthetic data.
 
-        This method can be extended to implement custom post-processing logic.
+        The constraints of the ``constraints`` configuration section are enforced;
+        their violations and timings are kept in ``constraints.report``. The
+        tables are then scanned for training data copies, if a leakage detector is set.
 
         Args:
             synthetic_data: Dictionary mapping table names to DataFrames.
+            seed: Seed of the random repairs. Defaults to ``model.random_seed``.
 
         Returns:
             Processed synthetic data.
         """
+        if self.constraints.constraints:
+            if seed is None:
+                seed = self.config.get('model', {}).get('random_seed')
+            synthetic_data = self.constraints.apply(synthetic_data, seed)
+        if self.leakage_detector is not None:
+            synthetic_data = self.leakage_detector.scan(synthetic_data)
+
         # Log the number of rows in each table
         for table_name, df in synthetic_data.items():
             self.logger.debug(f"Generated {len(df)} rows for table {table_name}")
-        
-        # Placeholder for future post-processing logic
-        # For example, ensuring specific constraints or relationships
-        
+
         return synthetic_data
 
     def _save_synthetic_data(self, synthetic_data: Dict[str, pd.DataFrame]) -> None:
         """
         Save synthetic data to files.
 
+        The tables are written concurrently in chunks, in the format and compression
+        given by their paths and ``output.compression``.
+
         Args:
             synthetic_data: Dictionary mapping table names to DataFrames.
         """
-        paths = self.config['output']['synthetic_data_paths']
-        
-        for table_name, df in synthetic_data.items():
-            if table_name in paths:
-                file_path = paths[table_name]
-                self.logger.debug(f"Saving synthetic data for {table_name} to {file_path}")
-                
-                try:
-                    # Determine file format based on extension
-                    if file_path.endswith('.csv'):
-                        df.to_csv(file_path, index=False)
-                    elif file_path.endswith('.json'):
-                        df.to_json(file_path, orient='records')
-                    else:
-                        # Default to JSON
-                        df.to_json(file_path, orient='records')
-                    
-                    self.logger.info(f"Saved synthetic data for {table_name} to {file_path}")
-                
-                except Exception as e:
-                    error_msg = f"Error saving synthetic data for {table_name} to {file_path}: {str(e)}"
-                    self.logger.error(error_msg)
-                    # Continue with other tables instead of raising exception
-            else:
-                self.logger.warning(f"No output path specified for table {table_name}, skipping save.")
\ No newline at end of file
+        output_config = self.config['output']
+        paths = output_config['synthetic_data_paths']
+
+        for table_name in synthetic_data:
+            if table_name not in paths:
+                self.logger.warning(f"No output path specified for table {table_name}, skipping save.")
+
+        # Tables that fail to save are logged, the others are still written
+        written = write_tables(synthetic_data, paths, output_config.get('compression'),
+                               output_config.get('write_workers'))
+        for table_name in written:
+            self.logger.info(f"Saved synthetic data for {table_name} to {paths[table_name]}")
@@ -0,0 +1,322 @@
+"""
+Module for modeling the structMap division hierarchy.
+
+HMA cannot model the structMap self-reference, so the synthesizer produces
+parent_id values that are mere copies of training IDs. This module learns the
+shape of the training hierarchy instead: the share of root divisions and, per
+depth level, the distribution of the number of children, the distribution of
+the div ``type`` and the probability that a div points at a file. Synthetic
+forests are generated level by level with NumPy in time linear in the number
+of divs, and their structure is written onto the sampled structMap rows, so
+every parent_id refers to an existing div and no div is lost. Every dmdSec
+gets its own forest over its divs, and file pointers are drawn from the files
+of the same dmdSec, so the reassembled documents stay consistent.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Deepest level followed when measuring depths, which also bounds cyclic parent chains
+MAX_TREE_DEPTH = 32
+
+
+def _group_ranks(groups: np.ndarray) -> np.ndarray:
+    """
+    Rank every element within its run of equal group codes.
+
+    Args:
+        groups: Group codes, each group's elements contiguous.
+
+    Returns:
+        Array with the position of each element within its group.
+    """
+    if not len(groups):
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+    return np.arange(len(groups)) - np.repeat(starts, np.diff(np.append(starts, len(groups))))
+
+
+class StructMapTreeModel:
+    """
+    Class for learning and generating structMap division trees.
+    """
+
+    def __init__(self, root_fraction: float = 1.0, levels: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the StructMapTreeModel with learned parameters.
+
+        Args:
+            root_fraction: Share of divisions without a parent.
+            levels: Per depth level, a dictionary with the child count probabilities
+                    (``branching``), the type probabilities (``types``) and the
+                    probability of pointing at a file (``file_probability``).
+        """
+        self.root_fraction = root_fraction
+        self.levels = levels or []
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def fitted(self) -> bool:
+        """Whether the model has learned a hierarchy."""
+        return bool(self.levels)
+
+    def fit(self, structmap_df: pd.DataFrame) -> 'StructMapTreeModel':
+        """
+        Learn the hierarchy of the training structMap table.
+
+        Divisions whose parent_id is missing or unknown count as roots.
+
+        Args:
+            structmap_df: DataFrame containing structMap data.
+
+        Returns:
+            The fitted model.
+        """
+        n = len(structmap_df)
+        if n == 0:
+            self.levels = []
+            return self
+
+        parent_positions = pd.Index(structmap_df['struct_id']).get_indexer(structmap_df['parent_id'])
+        depths = self._depths(parent_positions)
+        children = np.bincount(parent_positions[parent_positions >= 0], minlength=n)
+        has_file = structmap_df['file_id'].notna().to_numpy() if 'file_id' in structmap_df.columns \
+            else np.zeros(n, dtype=bool)
+
+        self.root_fraction = float(np.mean(parent_positions < 0))
+        self.levels = []
+        for depth in range(int(depths.max()) + 1):
+            at_level = depths == depth
+            if not at_level.any():
+                break
+            branching = np.bincount(children[at_level])
+            types = {}
+            if 'type' in structmap_df.columns:
+                counts = structmap_df.loc[at_level, 'type'].dropna().astype(str).value_counts(normalize=True)
+                types = {str(value): float(p) for value, p in counts.items()}
+            self.levels.append({
+                'branching': (branching / branching.sum()).tolist(),
+                'types': types,
+                'file_probability': float(has_file[at_level].mean()),
+            })
+
+        self.logger.info(f"Learned structMap hierarchy with {len(self.levels)} levels, "
+                         f"{self.root_fraction:.1%} root divisions")
+        return self
+
+    def sample(self, structmap_df: pd.DataFrame, file_df: Optional[pd.DataFrame],
+               rng: np.random.Generator) -> pd.DataFrame:
+        """
+        Write a generated hierarchy onto sampled structMap rows.
+
+        The rows are grouped by dmd_id and the rows of each group are taken as
+        the nodes of a forest in breadth-first order. parent_id, order and type
+        are replaced by the generated structure, and file_id is kept or drawn
+        from the files of the same dmdSec where the div points at a file and
+        cleared elsewhere.
+
+        Args:
+            structmap_df: Sampled structMap rows.
+            file_df: Sampled file rows, whose IDs are drawn for file pointers.
+            rng: Random generator.
+
+        Returns:
+            DataFrame with the generated hierarchy, ordered by dmdSec group.
+        """
+        n = len(structmap_df)
+        if not self.fitted or n == 0:
+            return structmap_df
+
+        # Rows without a dmd_id form one last group
+        uniques = None
+        if 'dmd_id' in structmap_df.columns:
+            codes, uniques = pd.factorize(structmap_df['dmd_id'])
+            codes = np.where(codes < 0, len(uniques), codes)
+        else:
+            codes = np.zeros(n, dtype=np.int64)
+        row_order = np.argsort(codes, kind='stable')
+        codes = codes[row_order]
+        df = structmap_df.iloc[row_order].reset_index(drop=True).copy()
+
+        parent_positions, depths, orders = self._generate_forest(np.bincount(codes), rng)
+
+        struct_ids = df['struct_id'].to_numpy(dtype=object)
+        df['parent_id'] = np.where(parent_positions >= 0, struct_ids[np.maximum(parent_positions, 0)], None)
+        if 'order' in df.columns:
+            df['order'] = orders
+
+        if 'type' in df.columns:
+            types = df['type'].to_numpy(dtype=object)
+            for depth, level in enumerate(self.levels):
+                at_level = depths == depth
+                if at_level.any() and level['types']:
+                    values = list(level['types'])
+                    probabilities = np.array(list(level['types'].values()))
+                    types[at_level] = rng.choice(values, size=int(at_level.sum()),
+                                                 p=probabilities / probabilities.sum())
+            df['type'] = types
+
+        if 'file_id' in df.columns:
+            df['file_id'] = self._attach_files(df['file_id'], depths, codes, uniques, file_df, rng)
+
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the learned parameters as a JSON-serializable dictionary."""
+        return {'root_fraction': self.root_fraction, 'levels': self.levels}
+
+    @classmethod
+    def from_dict(cls, params: Dict[str, Any]) -> 'StructMapTreeModel':
+        """
+        Create a model from parameters returned by ``to_dict``.
+
+        Args:
+            params: Learned parameters.
+
+        Returns:
+            The restored model.
+        """
+        return cls(params.get('root_fraction', 1.0), params.get('levels', []))
+
+    @staticmethod
+    def _depths(parent_positions: np.ndarray) -> np.ndarray:
+        """
+        Compute the depth of every division by walking all parent chains at once.
+
+        Args:
+            parent_positions: Position of each division's parent, negative for roots.
+
+        Returns:
+            Array with the depth of each division, capped at MAX_TREE_DEPTH.
+        """
+        depths = np.zeros(len(parent_positions), dtype=np.int64)
+        current = parent_positions.copy()
+        for _ in range(MAX_TREE_DEPTH):
+            active = current >= 0
+            if not active.any():
+                break
+            depths[active] += 1
+            current[active] = parent_positions[current[active]]
+        return depths
+
+    def _generate_forest(self, sizes: np.ndarray,
+                         rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Generate one forest per group with exactly the group's number of nodes.
+
+        Each round starts as many roots in every group as the root fraction calls
+        for among its missing nodes and expands all groups together level by
+        level, drawing every node's child count from its level's distribution.
+        Rounds are repeated until every group is complete; each level is cut off
+        at the nodes a group still misses, which keeps parents before their
+        children.
+
+        Args:
+            sizes: Number of nodes per group.
+            rng: Random generator.
+
+        Returns:
+            Tuple of the parent position (-1 for roots), depth and sibling order of each
+            node, with the nodes ordered by group and breadth-first within a group.
+        """
+        sizes = np.asarray(sizes, dtype=np.int64)
+        filled = np.zeros(len(sizes), dtype=np.int64)
+        root_counts = np.zeros(len(sizes), dtype=np.int64)
+        group_parts, parent_parts, depth_parts, order_parts = [], [], [], []
+        # Nodes are numbered in the order they are created, parents refer to these numbers
+        total = 0
+        while (filled < sizes).any():
+            active = np.flatnonzero(filled < sizes)
+            roots = np.maximum(1, np.round((sizes[active] - filled[active]) * self.root_fraction).astype(np.int64))
+            level_groups = np.repeat(active, roots)
+            level_parents = np.full(len(level_groups), -1, dtype=np.int64)
+            level_orders = np.repeat(root_counts[active], roots) + _group_ranks(level_groups) + 1
+            root_counts[active] += roots
+
+            depth = 0
+            while len(level_groups):
+                keep = _group_ranks(level_groups) < (sizes - filled)[level_groups]
+                level_groups, level_parents = level_groups[keep], level_parents[keep]
+                level_orders = level_orders[keep]
+                take = len(level_groups)
+                if not take:
+                    break
+                group_parts.append(level_groups)
+                parent_parts.append(level_parents)
+                order_parts.append(level_orders)
+                depth_parts.append(np.full(take, depth, dtype=np.int64))
+                nodes = np.arange(total, total + take)
+                total += take
+                filled += np.bincount(level_groups, minlength=len(sizes))
+                if depth + 1 >= len(self.levels):
+                    break
+
+                branching = np.asarray(self.levels[depth]['branching'])
+                counts = rng.choice(len(branching), size=take, p=branching / branching.sum())
+                level_groups = np.repeat(level_groups, counts)
+                level_parents = np.repeat(nodes, counts)
+                starts = np.cumsum(counts) - counts
+                level_orders = np.arange(len(level_parents)) - np.repeat(starts, counts) + 1
+                depth += 1
+
+        groups = np.concatenate(group_parts)
+        parents = np.concatenate(parent_parts)
+        # Order the nodes by group, keeping their creation order within a group
+        node_order = np.argsort(groups, kind='stable')
+        positions = np.empty(total, dtype=np.int64)
+        positions[node_order] = np.arange(total)
+        parent_positions = np.where(parents >= 0, positions[np.maximum(parents, 0)], -1)
+        return (parent_positions[node_order], np.concatenate(depth_parts)[node_order],
+                np.concatenate(order_parts)[node_order])
+
+    def _attach_files(self, file_ids: pd.Series, depths: np.ndarray, codes: np.ndarray,
+                      dmd_ids: Optional[pd.Index], file_df: Optional[pd.DataFrame],
+                      rng: np.random.Generator) -> np.ndarray:
+        """
+        Decide which divisions point at a file and which file of their dmdSec they point at.
+
+        Args:
+            file_ids: Sampled file_id column.
+            depths: Depth of each division.
+            codes: dmdSec group of each division.
+            dmd_ids: dmd_id of each group, None if the divisions have no dmd_id.
+            file_df: Sampled file rows.
+            rng: Random generator.
+
+        Returns:
+            Array with the new file_id of each division.
+        """
+        probabilities = np.array([level['file_probability'] for level in self.levels])
+        attach = rng.random(len(depths)) < probabilities[np.minimum(depths, len(self.levels) - 1)]
+
+        known = None if file_df is None else file_df[file_df['file_id'].notna()]
+        if known is None or known.empty:
+            return np.full(len(depths), None, dtype=object)
+
+        if dmd_ids is not None and 'dmd_id' in known.columns:
+            # Files of unknown dmdSecs fall into the group of the divisions without a dmd_id
+            file_codes = pd.Index(dmd_ids).get_indexer(known['dmd_id'])
+            file_codes = np.where(file_codes < 0, len(dmd_ids), file_codes)
+        else:
+            # Without dmd_ids on both sides, any file can be pointed at
+            codes = np.zeros(len(depths), dtype=np.int64)
+            file_codes = np.zeros(len(known), dtype=np.int64)
+        known_ids = known['file_id'].to_numpy(dtype=object)
+
+        # The files of group g are file_order[starts[g]:starts[g] + counts[g]]
+        file_order = np.argsort(file_codes, kind='stable')
+        counts = np.bincount(file_codes, minlength=int(max(codes.max(), file_codes.max())) + 1)
+        starts = np.cumsum(counts) - counts
+
+        values = file_ids.to_numpy(dtype=object).copy()
+        positions = pd.Index(known_ids).get_indexer(values)
+        valid = (positions >= 0) & (file_codes[np.maximum(positions, 0)] == codes)
+        draw = attach & ~valid & (counts[codes] > 0)
+        picks = starts[codes[draw]] + (rng.random(int(draw.sum())) * counts[codes[draw]]).astype(np.int64)
+        values[draw] = known_ids[file_order[picks]]
+        values[~(valid | draw) | ~attach] = None
+        return values
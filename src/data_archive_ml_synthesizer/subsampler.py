@@ -0,0 +1,180 @@
+"""
+Module for drawing representative training subsamples from large corpora.
+
+HMA fitting time grows steeply with the number of rows, while the column
+distributions of a large archive can be learned from a fraction of it. This
+module selects a subset of dmdSec records, either uniformly at random or
+stratified by descriptive columns such as dc_type and dc_format, and keeps
+each selected record's complete subtree: its files and its structMap divs.
+References that point outside the subsample are cleared, so the result passes
+the referential integrity check.
+"""
+
+import logging
+import math
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from src.data_archive_ml_synthesizer.integrity import find_dangling
+
+
+# Supported subsampling methods
+SUBSAMPLE_METHODS = ('random', 'stratified')
+
+
+class Subsampler:
+    """
+    Class for drawing relationship-preserving subsamples of the input tables.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """
+        Initialize the Subsampler with configuration.
+
+        Args:
+            config: Dictionary containing configuration parameters. Settings are read
+                    from the ``subsample`` section and the seed from ``model.random_seed``.
+
+        Raises:
+            ValueError: If the configured method is unknown.
+        """
+        self.config = config
+        self.logger = logging.getLogger(__name__)
+
+        subsample_config = config.get('subsample', {})
+        self.method = subsample_config.get('method', 'stratified')
+        self.stratify_by: List[str] = subsample_config.get('stratify_by', ['dc_type', 'dc_format'])
+        self.max_rows = subsample_config.get('max_rows')
+        self.max_memory_mb = subsample_config.get('max_memory_mb')
+        self.seed = config.get('model', {}).get('random_seed')
+
+        if self.method not in SUBSAMPLE_METHODS:
+            error_msg = f"Unknown subsample method '{self.method}', expected one of: {', '.join(SUBSAMPLE_METHODS)}"
+            self.logger.error(error_msg)
+            raise ValueError(error_msg)
+
+    def subsample(self, tables: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+        """
+        Reduce the tables to the configured row count or memory budget.
+
+        Args:
+            tables: Dictionary with the 'dmdSec', 'file' and 'structMap' DataFrames.
+
+        Returns:
+            Dictionary with the subsampled DataFrames, or the input tables if they
+            already fit the target.
+        """
+        fraction = self._target_fraction(tables)
+        if fraction >= 1.0:
+            self.logger.info("Input tables fit the subsample target, training on all rows.")
+            return tables
+
+        dmdsec_df = tables['dmdSec']
+        num_selected = max(1, math.ceil(fraction * len(dmdsec_df)))
+        rng = np.random.default_rng(self.seed)
+
+        if self.method == 'stratified':
+            selected = self._stratified_selection(dmdsec_df, num_selected, rng)
+        else:
+            selected = np.zeros(len(dmdsec_df), dtype=bool)
+            selected[rng.choice(len(dmdsec_df), size=num_selected, replace=False)] = True
+
+        sample = self._take_subtrees(tables, dmdsec_df.loc[selected].reset_index(drop=True))
+
+        for table_name, df in sample.items():
+            self.logger.info(f"Subsampled {table_name}: {len(tables[table_name])} -> {len(df)} rows")
+        return sample
+
+    def _target_fraction(self, tables: Dict[str, pd.DataFrame]) -> float:
+        """
+        Compute the share of records to keep from the configured targets.
+
+        Args:
+            tables: Dictionary mapping table names to DataFrames.
+
+        Returns:
+            Fraction of dmdSec records to select; 1.0 or more means no subsampling.
+        """
+        fraction = 1.0
+
+        if self.max_rows:
+            total_rows = sum(len(df) for df in tables.values())
+            fraction = min(fraction, float(self.max_rows) / max(total_rows, 1))
+
+        if self.max_memory_mb:
+            total_bytes = sum(int(df.memory_usage(deep=True).sum()) for df in tables.values())
+            fraction = min(fraction, float(self.max_memory_mb) * 1024 * 1024 / max(total_bytes, 1))
+
+        return fraction
+
+    def _stratified_selection(self, dmdsec_df: pd.DataFrame, num_selected: int,
+                              rng: np.random.Generator) -> np.ndarray:
+        """
+        Select records proportionally from each stratum.
+
+        Every stratum keeps at least one record so that rare combinations of the
+        stratification columns remain represented.
+
+        Args:
+            dmdsec_df: dmdSec DataFrame.
+            num_selected: Approximate number of records to select.
+            rng: Random generator.
+
+        Returns:
+            Boolean array marking the selected records.
+        """
+        columns = [column for column in self.stratify_by if column in dmdsec_df.columns]
+        if not columns:
+            self.logger.warning(f"None of the stratification columns {self.stratify_by} exist, sampling uniformly.")
+            selected = np.zeros(len(dmdsec_df), dtype=bool)
+            selected[rng.choice(len(dmdsec_df), size=num_selected, replace=False)] = True
+            return selected
+
+        strata = dmdsec_df.groupby(columns, dropna=False, observed=True, sort=False).ngroup().to_numpy()
+        stratum_sizes = np.bincount(strata)
+        quotas = np.maximum(1, np.round(stratum_sizes * num_selected / len(dmdsec_df))).astype(np.int64)
+
+        # Rank rows randomly within their stratum and keep the first `quota` of each
+        order = np.lexsort((rng.random(len(dmdsec_df)), strata))
+        starts = np.concatenate([[0], np.cumsum(stratum_sizes)[:-1]])
+        rank = np.empty(len(dmdsec_df), dtype=np.int64)
+        rank[order] = np.arange(len(dmdsec_df)) - starts[strata[order]]
+
+        self.logger.debug(f"Stratified over {columns}: {len(stratum_sizes)} strata")
+        return rank < quotas[strata]
+
+    def _take_subtrees(self, tables: Dict[str, pd.DataFrame], dmdsec_sample: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """
+        Collect the files and structMap divs belonging to the selected records.
+
+        Divs whose parent or file pointer refers to a record outside the sample
+        have that reference cleared, which turns them into root divs.
+
+        Args:
+            tables: Dictionary with the full DataFrames.
+            dmdsec_sample: Selected dmdSec rows.
+
+        Returns:
+            Dictionary with the subsampled DataFrames.
+        """
+        selected_ids = pd.Index(dmdsec_sample['dmd_id'])
+        file_df = tables['file']
+        structmap_df = tables['structMap']
+
+        file_sample = file_df.loc[selected_ids.get_indexer(file_df['dmd_id']) >= 0].reset_index(drop=True)
+        structmap_sample = structmap_df.loc[
+            selected_ids.get_indexer(structmap_df['dmd_id']) >= 0
+        ].reset_index(drop=True)
+
+        dangling_parents = find_dangling(structmap_sample['parent_id'], structmap_sample['struct_id'])
+        structmap_sample.loc[dangling_parents, 'parent_id'] = None
+        if 'file_id' in structmap_sample.columns:
+            dangling_files = find_dangling(structmap_sample['file_id'], file_sample['file_id'])
+            structmap_sample.loc[dangling_files, 'file_id'] = None
+
+        if dangling_parents.any():
+            self.logger.debug(f"Cleared {int(dangling_parents.sum())} parent_id references outside the subsample")
+
+        return {'dmdSec': dmdsec_sample, 'file': file_sample, 'structMap': structmap_sample}
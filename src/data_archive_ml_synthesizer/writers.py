@@ -0,0 +1,465 @@
+"""
+Module for writing synthetic tables incrementally.
+
+Writers append DataFrames to an output file as they arrive, serializing at
+most a chunk of rows at a time, so neither the whole table nor its serialized
+form has to be held in memory. The format follows the file extension:
+
+- ``.json``: a JSON array of records, as ``DataFrame.to_json(orient='records')``
+- ``.ndjson`` / ``.jsonl``: one JSON record per line
+- ``.csv``: CSV with a header row
+- ``.parquet`` / ``.pq``: one Parquet row group per write (requires pyarrow)
+
+Text formats are compressed when the path ends with ``.gz`` or ``.zst`` or a
+compression is given; zstd requires the zstandard package. Parquet files use
+the compression as their column codec instead. Gzip streams carry no
+timestamp, so identical tables give identical bytes.
+
+Output goes to a temporary file next to the target, which is renamed into
+place when the writer is closed, so readers never see a partial table.
+"""
+
+import gzip
+import io
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+# Number of rows serialized at a time
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Rows a Parquet writer holds back at most while columns are all null and their type is unknown
+SCHEMA_BUFFER_ROWS = 100_000
+
+# Mapping from file extension to output format
+FORMAT_EXTENSIONS = {
+    '.json': 'json',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+}
+
+# Mapping from file extension to compression
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+
+def table_format(file_path: str) -> Tuple[str, Optional[str]]:
+    """
+    Determine the format and compression of a table file from its extensions.
+
+    Args:
+        file_path: Path of the table file.
+
+    Returns:
+        Tuple of the format ('json' for unknown extensions) and the compression or None.
+    """
+    suffixes = [suffix.lower() for suffix in Path(file_path).suffixes]
+    compression = COMPRESSION_EXTENSIONS.get(suffixes[-1]) if suffixes else None
+    if compression:
+        suffixes = suffixes[:-1]
+    return FORMAT_EXTENSIONS.get(suffixes[-1] if suffixes else '', 'json'), compression
+
+
+def read_table(file_path: str, compression: Optional[str] = None) -> pd.DataFrame:
+    """
+    Read a table written by a TableWriter.
+
+    Values are read back as written, without type or date inference.
+
+    Args:
+        file_path: Path of the table file.
+        compression: Compression the table was written with; defaults to the compression extension of the path.
+
+    Returns:
+        DataFrame with the table.
+    """
+    output_format, path_compression = table_format(file_path)
+    compression = compression or path_compression
+    if output_format == 'parquet':
+        return pd.read_parquet(file_path, engine='pyarrow')
+    if output_format == 'csv':
+        return pd.read_csv(file_path, dtype=object, compression=compression)
+    return pd.read_json(file_path, orient='records', lines=output_format == 'ndjson', dtype=False,
+                        convert_dates=False, compression=compression)
+
+
+class TableWriter(ABC):
+    """
+    Base class of the writers appending DataFrames to a table file.
+    """
+
+    def __init__(self, file_path: str, compression: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Create the temporary output file.
+
+        Args:
+            file_path: Path of the output file.
+            compression: 'gzip', 'zstd' or None.
+            chunk_size: Number of rows serialized at a time.
+        """
+        self.file_path = file_path
+        self.compression = compression
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.logger = logging.getLogger(__name__)
+        Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+        fd, self.temp_path = tempfile.mkstemp(dir=Path(file_path).parent, prefix=f".{Path(file_path).name}.",
+                                              suffix='.tmp')
+        os.close(fd)
+        self.closed = False
+
+    def write(self, df: pd.DataFrame) -> None:
+        """
+        Append the rows of a DataFrame.
+
+        Args:
+            df: Rows to append.
+        """
+        for start in range(0, len(df), self.chunk_size):
+            self._write_chunk(df.iloc[start:start + self.chunk_size])
+            self.rows += min(self.chunk_size, len(df) - start)
+
+    def close(self) -> None:
+        """Terminate the output and rename it to its final path."""
+        if self.closed:
+            return
+        self._finish()
+        self.closed = True
+        # Temporary files are private, the table gets the usual permissions
+        os.chmod(self.temp_path, 0o644)
+        os.replace(self.temp_path, self.file_path)
+        self.logger.debug(f"Wrote {self.rows} rows to {self.file_path}")
+
+    def abort(self) -> None:
+        """Discard the output, leaving any previous file at the final path untouched."""
+        if self.closed:
+            return
+        try:
+            self._finish()
+        finally:
+            self.closed = True
+            Path(self.temp_path).unlink(missing_ok=True)
+
+    def __enter__(self) -> 'TableWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    @abstractmethod
+    def _write_chunk(self, df: pd.DataFrame) -> None:
+        """Serialize a chunk of rows to the temporary file."""
+
+    @abstractmethod
+    def _finish(self) -> None:
+        """Terminate the output and release the temporary file."""
+
+
+class _TextTableWriter(TableWriter):
+    """
+    Base class of the writers of text formats, optionally compressed.
+    """
+
+    # Newline translation of the text stream, '' for CSV
+    newline: Optional[str] = None
+
+    def __init__(self, file_path: str, compression: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(file_path, compression, chunk_size)
+        self.raw = open(self.temp_path, 'wb')
+        if compression == 'gzip':
+            self.stream = gzip.GzipFile(filename='', mode='wb', fileobj=self.raw, mtime=0)
+        elif compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                self.raw.close()
+                Path(self.temp_path).unlink(missing_ok=True)
+                error_msg = "Writing zstd output requires zstandard (pip install zstandard)"
+                self.logger.error(error_msg)
+                raise ImportError(error_msg)
+            self.stream = zstandard.ZstdCompressor().stream_writer(self.raw, closefd=False)
+        elif compression is None:
+            self.stream = None
+        else:
+            self.raw.close()
+            Path(self.temp_path).unlink(missing_ok=True)
+            raise ValueError(f"Unsupported compression '{compression}', expected gzip or zstd")
+        self.handle = io.TextIOWrapper(self.raw if self.stream is None else self.stream, encoding='utf-8',
+                                       newline=self.newline, write_through=True)
+        self._start()
+
+    def _start(self) -> None:
+        """Write the beginning of the output."""
+
+    def _end(self) -> None:
+        """Write the end of the output."""
+
+    def _finish(self) -> None:
+        self._end()
+        self.handle.flush()
+        self.handle.detach()
+        if self.stream is not None:
+            self.stream.close()
+        self.raw.close()
+
+
+class JSONArrayWriter(_TextTableWriter):
+    """
+    Writer of a JSON array of records.
+    """
+
+    def _start(self) -> None:
+        self.handle.write('[')
+
+    def _write_chunk(self, df: pd.DataFrame) -> None:
+        if self.rows:
+            self.handle.write(',')
+        self.handle.write(df.to_json(orient='records')[1:-1])
+
+    def _end(self) -> None:
+        self.handle.write(']')
+
+
+class NDJSONWriter(_TextTableWriter):
+    """
+    Writer of one JSON record per line.
+    """
+
+    def _write_chunk(self, df: pd.DataFrame) -> None:
+        text = df.to_json(orient='records', lines=True)
+        self.handle.write(text if text.endswith('\n') else text + '\n')
+
+
+class CSVWriter(_TextTableWriter):
+    """
+    Writer of CSV with a header row.
+    """
+
+    newline = ''
+
+    def _write_chunk(self, df: pd.DataFrame) -> None:
+        df.to_csv(self.handle, index=False, header=not self.rows)
+
+
+class ParquetWriter(TableWriter):
+    """
+    Writer of a Parquet file with one row group per chunk.
+
+    The file schema has to be fixed before the first row group is written, while
+    a column that is null in the first chunks has no type yet. Chunks are
+    therefore held back until every column has a type, or SCHEMA_BUFFER_ROWS
+    rows are held, and the schema is unified over them, promoting nulls and
+    integers to the later types. Columns still all null are stored as strings,
+    and later chunks are cast to the file schema.
+    """
+
+    def __init__(self, file_path: str, compression: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            error_msg = "Writing Parquet output requires pyarrow (pip install pyarrow)"
+            logging.getLogger(__name__).error(error_msg)
+            raise ImportError(error_msg)
+        super().__init__(file_path, compression, chunk_size)
+        self.writer = None
+        self.schema = None
+        # Chunks held back until the schema is known
+        self.pending: List['pa.Table'] = []
+        self.pending_rows = 0
+
+    def _write_chunk(self, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is not None:
+            self._write_table(table)
+            return
+        self.pending.append(table)
+        self.pending_rows += len(table)
+        schema = self._pending_schema()
+        if self.pending_rows >= SCHEMA_BUFFER_ROWS or not any(pa.types.is_null(field.type) for field in schema):
+            self._open(schema)
+
+    def _pending_schema(self) -> 'pa.Schema':
+        """Unify the schemas of the chunks held back."""
+        import pyarrow as pa
+
+        return pa.unify_schemas([table.schema for table in self.pending], promote_options='permissive')
+
+    def _open(self, schema: 'pa.Schema') -> None:
+        """Fix the file schema and write the chunks held back."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                                 for field in schema], metadata=schema.metadata)
+        self.writer = pq.ParquetWriter(self.temp_path, self.schema, compression=self.compression or 'snappy')
+        for table in self.pending:
+            self._write_table(table)
+        self.pending = []
+
+    def _write_table(self, table: 'pa.Table') -> None:
+        """Write one row group, cast to the file schema."""
+        if not table.schema.equals(self.schema):
+            table = table.cast(self.schema)
+        self.writer.write_table(table)
+
+    def _finish(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None and self.pending:
+            self._open(self._pending_schema())
+        if self.writer is None:
+            pq.write_table(pa.table({}), self.temp_path)
+        else:
+            self.writer.close()
+
+
+# Writer class per output format
+WRITERS = {
+    'json': JSONArrayWriter,
+    'ndjson': NDJSONWriter,
+    'csv': CSVWriter,
+    'parquet': ParquetWriter,
+}
+
+
+def open_table_writer(file_path: str, compression: Optional[str] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> TableWriter:
+    """
+    Open a writer for a table file, choosing the format from its extension.
+
+    Args:
+        file_path: Path of the output file.
+        compression: 'gzip' or 'zstd'; defaults to the compression extension of the path, if any.
+        chunk_size: Number of rows serialized at a time.
+
+    Returns:
+        The writer.
+    """
+    output_format, path_compression = table_format(file_path)
+    return WRITERS[output_format](file_path, compression or path_compression, chunk_size)
+
+
+class TableWriterPool:
+    """
+    Writers of several tables, appending each table on a thread pool.
+
+    Writing a batch waits only for the previous write of the same table, so
+    serialization overlaps with whatever the caller does next and the rows of
+    every table stay in order.
+    """
+
+    def __init__(self, paths: Dict[str, str], compression: Optional[str] = None, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Open a writer per table.
+
+        Args:
+            paths: Dictionary mapping table names to output paths.
+            compression: 'gzip', 'zstd' or None to follow the path extensions.
+            workers: Number of writer threads. Defaults to one per table.
+            chunk_size: Number of rows serialized at a time.
+        """
+        self.writers: Dict[str, TableWriter] = {}
+        try:
+            for table_name, file_path in paths.items():
+                self.writers[table_name] = open_table_writer(file_path, compression, chunk_size)
+        except Exception:
+            for writer in self.writers.values():
+                writer.abort()
+            raise
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers or len(paths)))
+        self.pending: Dict[str, Future] = {}
+
+    def write(self, tables: Dict[str, pd.DataFrame]) -> None:
+        """
+        Append DataFrames to the writers of their tables.
+
+        Args:
+            tables: Dictionary mapping table names to the rows to append; tables without a writer are skipped.
+        """
+        for table_name, df in tables.items():
+            writer = self.writers.get(table_name)
+            if writer is None:
+                continue
+            if table_name in self.pending:
+                self.pending.pop(table_name).result()
+            self.pending[table_name] = self.executor.submit(writer.write, df)
+
+    def close(self) -> None:
+        """Wait for the pending writes and move every table to its final path."""
+        try:
+            for future in self.pending.values():
+                future.result()
+            for writer in self.writers.values():
+                writer.close()
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self.executor.shutdown()
+
+    def abort(self) -> None:
+        """Wait for the pending writes and discard all outputs."""
+        for future in self.pending.values():
+            future.exception()
+        self.pending.clear()
+        for writer in self.writers.values():
+            writer.abort()
+        self.executor.shutdown()
+
+
+def write_tables(tables: Dict[str, pd.DataFrame], paths: Dict[str, str], compression: Optional[str] = None,
+                 workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[str]:
+    """
+    Write whole tables concurrently, one thread per table.
+
+    A table that fails to write leaves its previous file untouched and does not stop the others.
+
+    Args:
+        tables: Dictionary mapping table names to DataFrames.
+        paths: Dictionary mapping table names to output paths.
+        compression: 'gzip', 'zstd' or None to follow the path extensions.
+        workers: Number of writer threads. Defaults to one per table.
+        chunk_size: Number of rows serialized at a time.
+
+    Returns:
+        Names of the tables that were written.
+    """
+    logger = logging.getLogger(__name__)
+
+    def write(table_name: str) -> None:
+        with open_table_writer(paths[table_name], compression, chunk_size) as writer:
+            writer.write(tables[table_name])
+
+    names = [table_name for table_name in tables if table_name in paths]
+    written = []
+    with ThreadPoolExecutor(max_workers=max(1, workers or len(names) or 1)) as executor:
+        futures = {table_name: executor.submit(write, table_name) for table_name in names}
+        for table_name, future in futures.items():
+            try:
+                future.result()
+                written.append(table_name)
+            except Exception as e:
+                logger.error(f"Error saving synthetic data for {table_name} to {paths[table_name]}: {str(e)}")
+    return written
@@ -0,0 +1,52 @@
+"""
+Tests for the synthesizer backend registry and the benchmark harness.
+"""
+
+import copy
+
+import pytest
+
+from src.data_archive_ml_synthesizer.backends import backend_names, register_backend, resolve_backend
+from src.data_archive_ml_synthesizer.benchmark import cheapest_backend, scale_tables
+from src.data_archive_ml_synthesizer.fast_synthesizer import FastSynthesizer
+from src.data_archive_ml_synthesizer.model import GenerativeModel
+
+
+class RecordingSynthesizer(FastSynthesizer):
+    """FastSynthesizer remembering that it was fitted."""
+
+    def fit(self, tables):
+        super().fit(tables)
+        self.fitted_tables = sorted(tables)
+
+
+def test_registry_selects_backends(config, tables, metadata):
+    """Registered backends are selected by model.type and unknown types are rejected."""
+    assert {'hma', 'fast', 'gaussian_copula', 'ctgan'} <= set(backend_names())
+    assert resolve_backend('multi_table') == 'hma'
+    with pytest.raises(ValueError, match="Unsupported model type"):
+        resolve_backend('unknown')
+
+    register_backend('recording', lambda metadata, config: RecordingSynthesizer(metadata), RecordingSynthesizer.load)
+    config = copy.deepcopy(config)
+    config['model']['type'] = 'recording'
+    config['output']['model_path'] = None
+    model = GenerativeModel(config)
+    model.train(tables, metadata)
+    assert model.model.fitted_tables == sorted(tables)
+
+
+def test_harness_helpers(tables):
+    """Scaled copies keep unique keys and the cheapest run above the fidelity bar is picked."""
+    scaled = scale_tables(tables, 3)
+    assert len(scaled['dmdSec']) == 3 * len(tables['dmdSec'])
+    assert scaled['dmdSec']['dmd_id'].is_unique
+    assert scaled['file']['dmd_id'].isin(scaled['dmdSec']['dmd_id']).all()
+
+    results = [
+        {'model_type': 'hma', 'fit_seconds': 10.0, 'sample_seconds': 1.0, 'fidelity': {'overall': 0.9}},
+        {'model_type': 'fast', 'fit_seconds': 0.5, 'sample_seconds': 0.1, 'fidelity': {'overall': 0.85}},
+        {'model_type': 'ctgan', 'fit_seconds': 0.1, 'sample_seconds': 0.1, 'fidelity': {'overall': 0.5}},
+    ]
+    assert cheapest_backend(results, 0.8)['model_type'] == 'fast'
+    assert cheapest_backend(results, 0.95) is None
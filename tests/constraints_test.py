@@ -0,0 +1,125 @@
+"""
+Tests for the post-sampling constraint engine.
+"""
+
+import pandas as pd
+import pytest
+
+from src.data_archive_ml_synthesizer.constraints import Constraint, ConstraintEngine
+from src.data_archive_ml_synthesizer.sampler import Sampler
+
+
+METADATA = {
+    'tables': {
+        'dmdSec': {'primary_key': 'dmd_id', 'columns': {}},
+        'file': {'primary_key': 'file_id', 'columns': {}},
+        'structMap': {'primary_key': 'struct_id', 'columns': {}},
+    },
+    'relationships': [
+        {'parent_table_name': 'dmdSec', 'parent_primary_key': 'dmd_id',
+         'child_table_name': 'file', 'child_foreign_key': 'dmd_id'},
+        {'parent_table_name': 'dmdSec', 'parent_primary_key': 'dmd_id',
+         'child_table_name': 'structMap', 'child_foreign_key': 'dmd_id'},
+    ],
+}
+
+
+@pytest.fixture
+def constraint_tables():
+    """Small synthetic tables breaking every rule once or twice."""
+    return {
+        'dmdSec': pd.DataFrame({'dmd_id': ['D1', 'D2'], 'dc_format': ['application/pdf', 'image/tiff']}),
+        'file': pd.DataFrame({
+            'file_id': ['F1', 'F2', 'F3'],
+            'dmd_id': ['D1', 'D2', 'D2'],
+            'mimetype': pd.Categorical(['application/pdf', 'image/jpeg', 'image/tiff']),
+            'size': [100, -5, 30],
+            'checksum': ['a' * 40, 'b' * 40, 'c' * 64],
+            'checksumtype': ['SHA-1', 'SHA-256', 'SHA-256'],
+            'created_date': ['2023-01-01T00:00:00Z', '2023-03-01T00:00:00Z', '2023-01-01T00:00:00Z'],
+            'modified_date': ['2023-02-01T00:00:00Z', '2023-02-01T00:00:00Z', None],
+        }),
+        'structMap': pd.DataFrame({'struct_id': ['S1', 'S2'], 'dmd_id': ['D1', 'D2'], 'file_id': ['F1', 'F2'],
+                                   'parent_id': [None, 'S1']}),
+    }
+
+
+def test_repairs(constraint_tables):
+    """Every constraint type fixes its violations and reports them."""
+    engine = ConstraintEngine([
+        {'type': 'order', 'table': 'file', 'low': 'created_date', 'high': 'modified_date'},
+        {'type': 'range', 'table': 'file', 'column': 'size', 'min': 0},
+        {'type': 'length', 'table': 'file', 'column': 'checksum', 'by': 'checksumtype',
+         'lengths': {'SHA-1': 40, 'SHA-256': 64}},
+        {'name': 'mimetype', 'type': 'parent_match', 'table': 'file', 'column': 'mimetype',
+         'parent_table': 'dmdSec', 'parent_column': 'dc_format'},
+    ], METADATA)
+
+    repaired = engine.apply(constraint_tables, seed=0)['file']
+    assert [entry['violations'] for entry in engine.report] == [1, 1, 1, 1]
+    assert engine.report[3]['name'] == 'mimetype'
+    assert list(repaired['created_date']) == ['2023-01-01T00:00:00Z', '2023-02-01T00:00:00Z', '2023-01-01T00:00:00Z']
+    assert list(repaired['modified_date']) == ['2023-02-01T00:00:00Z', '2023-03-01T00:00:00Z', None]
+    assert list(repaired['size']) == [100, 0, 30]
+    assert repaired['checksum'].str.len().tolist() == [40, 64, 64]
+    assert set(repaired['checksum'][1]) <= set('0123456789abcdef')
+    assert list(repaired['mimetype']) == ['application/pdf', 'image/tiff', 'image/tiff']
+
+    assert engine.apply(constraint_tables, seed=0)['file']['checksum'][1] == repaired['checksum'][1]
+
+
+def test_reject_drops_children_and_clears_references(constraint_tables):
+    """Rejected parent rows take their children along, other references to them are cleared."""
+    engine = ConstraintEngine([{'type': 'range', 'table': 'file', 'column': 'size', 'min': 0, 'action': 'reject'}],
+                              METADATA)
+    result = engine.apply(constraint_tables)
+    assert list(result['file']['file_id']) == ['F1', 'F3']
+    assert list(result['structMap']['file_id']) == ['F1', None]
+
+    root_engine = ConstraintEngine([{'type': 'length', 'table': 'dmdSec', 'column': 'dc_format', 'by': 'dmd_id',
+                                     'lengths': {'D2': 3}, 'action': 'reject'}], METADATA)
+    result = root_engine.apply(constraint_tables)
+    assert list(result['dmdSec']['dmd_id']) == ['D1']
+    assert list(result['file']['file_id']) == ['F1']
+    assert list(result['structMap']['struct_id']) == ['S1']
+
+
+def test_report_keeps_tables(constraint_tables):
+    """Report-only constraints count violations without changing the tables."""
+    engine = ConstraintEngine([{'type': 'range', 'table': 'file', 'column': 'size', 'min': 0, 'action': 'report'}],
+                              METADATA)
+    result = engine.apply(constraint_tables)
+    assert engine.report[0]['violations'] == 1
+    assert result['file'] is constraint_tables['file']
+
+
+def test_unknown_constraints_are_refused():
+    """Unsupported types and actions fail when the engine is created."""
+    with pytest.raises(ValueError, match="Unsupported constraint type"):
+        ConstraintEngine([{'type': 'unique', 'table': 'file', 'column': 'href'}])
+    with pytest.raises(ValueError, match="Unsupported constraint action"):
+        ConstraintEngine([{'type': 'range', 'table': 'file', 'column': 'size', 'action': 'ignore'}])
+
+
+def test_incomplete_constraint_cannot_be_created():
+    """Subclasses missing a check or repair fail when they are created."""
+    class SizeConstraint(Constraint):
+        @staticmethod
+        def columns(spec):
+            return [spec['column']]
+
+        def required(self):
+            return {self.table: [self.column]}
+
+    with pytest.raises(TypeError):
+        SizeConstraint({'type': 'size', 'table': 'file', 'column': 'size'})
+
+
+def test_sampler_applies_constraints(config, model):
+    """Sampled tables satisfy the configured constraints."""
+    config = dict(config, constraints=[{'type': 'range', 'table': 'file', 'column': 'size', 'min': 0, 'max': 10}])
+    config['output'] = {key: value for key, value in config['output'].items() if key != 'synthetic_data_paths'}
+    sampler = Sampler(config, model)
+    synthetic_data = sampler.sample()
+    assert pd.to_numeric(synthetic_data['file']['size']).between(0, 10).all()
+    assert sampler.constraints.report[0]['rows'] == len(synthetic_data['file'])
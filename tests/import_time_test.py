@@ -0,0 +1,49 @@
+"""
+Tests for the import time of the CLI entry points.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Entry point module -> (cumulative import time budget in seconds, modules it must not load)
+ENTRY_POINTS = {
+    'src.data_archive_ml_synthesizer': (0.2, ['pandas', 'sdv', 'xmlschema', 'lxml']),
+    'src.data_archive_ml_synthesizer.pipeline': (3.0, ['sdv', 'xmlschema']),
+    'src.data_archive_ml_synthesizer.benchmark': (3.0, ['sdv', 'xmlschema']),
+}
+
+
+def _import_in_fresh_process(module_name, forbidden):
+    """
+    Import a module in a new interpreter with ``-X importtime``.
+
+    Returns:
+        Tuple of the module's cumulative import time in seconds and the forbidden modules that were loaded.
+    """
+    script = (f"import sys, {module_name}\n"
+              f"print(','.join(name for name in {forbidden!r} if name in sys.modules))")
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', script], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    cumulative = None
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == module_name:
+            cumulative = int(fields[1]) / 1e6
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+
+@pytest.mark.parametrize('module_name', list(ENTRY_POINTS))
+def test_entry_point_import_time(module_name):
+    """Entry points load neither SDV nor xmlschema and import within their budget."""
+    budget, forbidden = ENTRY_POINTS[module_name]
+    cumulative, loaded = _import_in_fresh_process(module_name, forbidden)
+    assert loaded == []
+    assert cumulative is not None
+    assert cumulative <= budget, f"{module_name} imported in {cumulative:.3f}s, budget {budget}s"
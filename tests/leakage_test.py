@@ -0,0 +1,91 @@
+"""
+Tests for the detection of training data copied into synthetic tables.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_archive_ml_synthesizer.leakage import LeakageDetector, MinHashLSH
+
+
+PRIVACY = {
+    'exact_columns': {'dmdSec': ['dc_title', 'dc_identifier']},
+    'near_duplicate_columns': {'dmdSec': ['dc_title']},
+    'chunk_size': 2,
+}
+
+
+@pytest.fixture
+def training_tables():
+    """Real dmdSec rows indexed by the detector."""
+    return {'dmdSec': pd.DataFrame({
+        'dmd_id': ['D1', 'D2', 'D3'],
+        'dc_title': ['Letters of the harbour master to the city council, 1887',
+                     'Photographs of the northern railway bridge construction',
+                     None],
+        'dc_identifier': ['ARCH-0001', 'ARCH-0002', 'ARCH-0003'],
+    })}
+
+
+@pytest.fixture
+def synthetic_tables():
+    """Synthetic rows with one exact copy, one near duplicate, one row copy and one new row."""
+    return {'dmdSec': pd.DataFrame({
+        'dmd_id': ['S1', 'S2', 'S3', 'S4'],
+        'dc_title': ['Letters of the harbour master to the city council, 1888',
+                     'Minutes of the parish school board meetings',
+                     'Photographs of the northern railway bridge construction',
+                     ''],
+        'dc_identifier': ['ARCH-9001', 'ARCH-0002', 'ARCH-0002', None],
+    })}
+
+
+def test_scan_reports_copies(training_tables, synthetic_tables):
+    """Exact copies, near duplicates and whole-row copies are counted per column over chunks."""
+    detector = LeakageDetector({'privacy': PRIVACY}).fit(training_tables)
+    scanned = detector.scan(synthetic_tables)
+
+    report = detector.report['dmdSec']
+    assert report['rows'] == 4
+    assert report['exact'] == {'dc_title': 1, 'dc_identifier': 2}
+    assert report['near_duplicates'] == {'dc_title': 2}
+    assert report['row_copies'] == 1
+    assert scanned['dmdSec'] is synthetic_tables['dmdSec']
+
+    detector.scan(synthetic_tables)
+    assert detector.report['dmdSec']['rows'] == 8
+
+
+def test_redact_nulls_copied_values(training_tables, synthetic_tables):
+    """In redact mode, copied values are replaced with nulls and everything else is kept."""
+    detector = LeakageDetector({'privacy': dict(PRIVACY, action='redact')}).fit(training_tables)
+    redacted = detector.scan(synthetic_tables)['dmdSec']
+
+    assert redacted['dc_title'].isna().tolist() == [True, False, True, False]
+    assert redacted['dc_identifier'].tolist() == ['ARCH-9001', None, None, None]
+    assert synthetic_tables['dmdSec']['dc_title'].notna().all()
+
+
+def test_minhash_similarity():
+    """Texts above the similarity threshold are found, unrelated texts are not."""
+    lsh = MinHashLSH(shingle_size=3, num_perm=64, bands=16, threshold=0.7)
+    lsh.index(['Annual report of the municipal archive for the year 1923'])
+    found = lsh.query(['Annual report of the municipal archive for the year 1924',
+                       'Correspondence with the ministry of agriculture'])
+    assert found.tolist() == [True, False]
+
+
+def test_minhash_checks_every_bucket_member():
+    """A near duplicate is found even when another indexed text comes first in the shared bucket."""
+    signatures = {'first': [1, 1, 2, 2], 'second': [1, 1, 3, 4], 'query': [1, 1, 5, 4]}
+    lsh = MinHashLSH(num_perm=4, bands=2, threshold=0.7)
+    lsh.signatures_of = lambda texts: np.array([signatures[text] for text in texts], dtype=np.uint32)
+    lsh.index(np.array(['first', 'second'], dtype=object))
+    assert lsh.query(np.array(['query'], dtype=object)).tolist() == [True]
+
+
+def test_unknown_action_is_refused():
+    """Unsupported actions fail when the detector is created."""
+    with pytest.raises(ValueError, match="Unsupported privacy action"):
+        LeakageDetector({'privacy': {'action': 'drop'}})
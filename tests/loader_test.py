@@ -0,0 +1,191 @@
+"""
+Tests for the DataLoader ingestion modes.
+"""
+
+import copy
+import json
+
+import pandas as pd
+import pytest
+
+from src.data_archive_ml_synthesizer.loader import DataLoader, _iter_json_array
+
+
+def test_iter_json_array_small_blocks(config):
+    """Records split across read blocks are decoded identically to json.load."""
+    path = config['input']['file_path']
+    with open(path, 'r') as f:
+        expected = json.load(f)
+
+    assert list(_iter_json_array(path, block_size=7)) == expected
+
+
+def test_streaming_matches_full_load(config):
+    """Streaming ingestion produces the same DataFrames as a full json.load."""
+    streaming_config = copy.deepcopy(config)
+    streaming_config['input']['streaming'] = True
+    streaming_config['input']['chunk_size'] = 3
+
+    full_config = copy.deepcopy(config)
+    full_config['input']['streaming'] = False
+
+    streamed = DataLoader(streaming_config).load_data()
+    loaded = DataLoader(full_config).load_data()
+
+    for streamed_df, loaded_df in zip(streamed, loaded):
+        pd.testing.assert_frame_equal(streamed_df, loaded_df)
+
+
+def test_columnar_formats_with_dtypes(config, tmp_path):
+    """NDJSON, Parquet and Arrow IPC inputs load with the declared dtypes."""
+    with open(config['input']['file_path'], 'r') as f:
+        source = pd.DataFrame(json.load(f))
+    source.to_json(tmp_path / 'file.ndjson', orient='records', lines=True)
+    source.to_parquet(tmp_path / 'file.parquet')
+    source.to_feather(tmp_path / 'file.arrow')
+
+    columnar_config = copy.deepcopy(config)
+    columnar_config['input']['dtypes'] = {
+        'file': {'mimetype': 'category', 'size': 'int32', 'created_date': 'datetime64[ns]'}
+    }
+    data_loader = DataLoader(columnar_config)
+
+    for extension in ('ndjson', 'parquet', 'arrow'):
+        df = data_loader._load_and_validate_table(tmp_path / f'file.{extension}', 'file')
+        assert len(df) == len(source)
+        assert isinstance(df['mimetype'].dtype, pd.CategoricalDtype)
+        assert df['size'].dtype == 'int32'
+        assert df['created_date'].dtype == 'datetime64[ns]'
+
+
+def test_mets_corpus_round_trip(config, tables, tmp_path):
+    """Tables extracted from reassembled METS documents match the original input."""
+    from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+
+    reassembler = XMLReassembler(config)
+    reassembler.reassemble(tables, str(tmp_path / 'package.xml'))
+
+    corpus_config = copy.deepcopy(config)
+    corpus_config['input'] = {'mets_dir': str(tmp_path), 'workers': 1, 'qualify_ids': False}
+    dmdsec_df, file_df, structmap_df = DataLoader(corpus_config).load_data()
+
+    pd.testing.assert_frame_equal(dmdsec_df, tables['dmdSec'][dmdsec_df.columns])
+    pd.testing.assert_frame_equal(file_df, tables['file'][file_df.columns])
+    pd.testing.assert_frame_equal(structmap_df, tables['structMap'][structmap_df.columns])
+
+
+def test_mets_corpus_same_file_names(config, tables, tmp_path):
+    """Documents with the same file name in different packages get distinct ID prefixes."""
+    from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+
+    reassembler = XMLReassembler(config)
+    for package in ('package1', 'package2'):
+        (tmp_path / package).mkdir()
+        reassembler.reassemble(tables, str(tmp_path / package / 'METS.xml'))
+
+    corpus_config = copy.deepcopy(config)
+    corpus_config['input'] = {'mets_dir': str(tmp_path), 'workers': 1}
+    dmdsec_df, file_df, _ = DataLoader(corpus_config).load_data()
+
+    assert len(dmdsec_df) == 2 * len(tables['dmdSec'])
+    assert dmdsec_df['dmd_id'].is_unique
+    assert dmdsec_df['dmd_id'].str.startswith('package1.METS_').sum() == len(tables['dmdSec'])
+    assert file_df['dmd_id'].isin(dmdsec_df['dmd_id']).all()
+
+
+def test_table_cache_hit_and_eviction(config, tmp_path):
+    """A second load is served from the cache and the size cap evicts old entries."""
+    cached_config = copy.deepcopy(config)
+    cached_config['cache'] = {'enabled': True, 'dir': str(tmp_path), 'max_size_mb': 64}
+
+    data_loader = DataLoader(cached_config)
+    loaded = data_loader.load_data()
+    cache = data_loader._open_cache()
+    key = cache.make_key(data_loader._input_files(), cached_config['input'])
+    assert cache.get(key) is not None
+
+    for cached_df, loaded_df in zip(data_loader.load_data(), loaded):
+        pd.testing.assert_frame_equal(cached_df, loaded_df)
+
+    # An entry for different loader settings pushes the cache over a tiny cap
+    cache.max_size_bytes = 1
+    cache.put('other', {'dmdSec': loaded[0]})
+    assert cache.get(key) is None
+
+
+def test_compaction_reduces_memory(config):
+    """Compaction converts repeated strings to categoricals and downcasts numerics."""
+    compact_config = copy.deepcopy(config)
+    compact_config['input']['compact'] = True
+
+    data_loader = DataLoader(compact_config)
+    _, file_df, structmap_df = data_loader.load_data()
+
+    assert isinstance(file_df['loctype'].dtype, pd.CategoricalDtype)
+    assert file_df['size'].dtype.itemsize < 8
+    assert structmap_df['order'].dtype.itemsize < 8
+    for report in data_loader.memory_report.values():
+        assert report['bytes_saved'] > 0
+
+
+def test_referential_integrity_modes():
+    """Dangling references and parent_id cycles are counted, repaired or dropped."""
+    from src.data_archive_ml_synthesizer.integrity import ReferentialIntegrityChecker
+
+    tables = {
+        'dmdSec': pd.DataFrame({'dmd_id': ['D1', 'D2']}),
+        'file': pd.DataFrame({'file_id': ['F1', 'F2'], 'dmd_id': ['D1', 'D9']}),
+        'structMap': pd.DataFrame({
+            'struct_id': ['S1', 'S2', 'S3', 'S4', 'S5'],
+            'dmd_id': ['D1', 'D1', 'D2', 'D2', 'D2'],
+            'parent_id': [None, 'S1', 'S4', 'S3', 'SX'],
+            'file_id': ['F1', 'F2', None, None, None],
+        }),
+    }
+
+    _, report = ReferentialIntegrityChecker({'input': {'integrity': 'warn'}}).check(tables)
+    assert report['file']['dmd_id'] == 1
+    assert report['structMap']['parent_id'] == 1
+    assert report['structMap']['parent_id_cycles'] == 2
+    assert not ReferentialIntegrityChecker.is_clean(report)
+
+    repaired, _ = ReferentialIntegrityChecker({'input': {'integrity': 'repair'}}).check(tables)
+    _, repaired_report = ReferentialIntegrityChecker({'input': {'integrity': 'warn'}}).check(repaired)
+    assert ReferentialIntegrityChecker.is_clean(repaired_report)
+    assert len(repaired['structMap']) == 5
+
+    dropped, _ = ReferentialIntegrityChecker({'input': {'integrity': 'drop'}}).check(tables)
+    assert list(dropped['structMap']['struct_id']) == ['S1']
+
+
+def test_input_data_is_referentially_clean(config):
+    """The sample input passes the integrity check, so SDV's cleanup can be skipped."""
+    data_loader = DataLoader(config)
+    data_loader.load_data()
+    assert data_loader.references_clean
+
+
+def test_sharded_inputs(config, tmp_path):
+    """Directory and glob inputs are loaded shard by shard and checked for duplicate keys."""
+    with open(config['input']['file_path'], 'r') as f:
+        records = json.load(f)
+
+    shard_dir = tmp_path / 'file'
+    shard_dir.mkdir()
+    for i in range(3):
+        with open(shard_dir / f'part-{i}.json', 'w') as shard:
+            json.dump(records[i::3], shard)
+
+    sharded_config = copy.deepcopy(config)
+    sharded_config['input']['workers'] = 2
+    data_loader = DataLoader(sharded_config)
+
+    for path_spec in (str(shard_dir), str(shard_dir / 'part-*.json')):
+        df = data_loader._load_and_validate_table(path_spec, 'file')
+        assert sorted(df['file_id']) == sorted(record['file_id'] for record in records)
+        assert len(data_loader.shard_report['file']) == 3
+
+    with open(shard_dir / 'part-3.json', 'w') as shard:
+        json.dump(records[:1], shard)
+    with pytest.raises(ValueError, match='duplicate file_id'):
+        data_loader._load_and_validate_table(str(shard_dir), 'file')
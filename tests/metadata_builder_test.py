@@ -0,0 +1,69 @@
+"""
+Tests for the MetadataBuilder schema cache and column profiling.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from src.data_archive_ml_synthesizer import metadata_builder
+from src.data_archive_ml_synthesizer.metadata_builder import MetadataBuilder, load_sdv_metadata, shape_regex
+
+
+def test_metadata_reused_for_identical_schema(config, tables, metadata):
+    """An identical schema is served from the in-process and on-disk caches."""
+    builder = MetadataBuilder(config)
+    assert builder.build_metadata(tables['dmdSec'], tables['file'], tables['structMap']) == metadata
+
+    # Simulate a new process: only the saved metadata file and its fingerprint remain
+    metadata_builder._metadata_cache.clear()
+    fingerprint = metadata_builder.schema_fingerprint(tables, builder.infer_column_specs(tables))
+    assert builder._load_cached_metadata(Path(config['output']['metadata_path']), fingerprint) == metadata
+    assert builder.build_metadata(tables['dmdSec'], tables['file'], tables['structMap']) == metadata
+
+
+def test_sdv_metadata_constructed_once(metadata):
+    """The SDV Metadata object for a metadata dictionary is shared."""
+    assert load_sdv_metadata(metadata) is load_sdv_metadata(dict(metadata))
+
+
+def test_shape_regex():
+    """Values sharing their separators get a regex; free text does not."""
+    assert shape_regex(['3f2a9c', '00b1e4']) == '[0-9a-f]{6}'
+    assert shape_regex(['files/page_1.xml', 'files/cover_12.xml']) == '[a-z]{5}/[a-z]{4,5}_[0-9]{1,2}\\.[a-z]{3}'
+    assert shape_regex(['A short title', 'Another, longer title']) is None
+
+
+def test_high_cardinality_columns_not_categorical(config):
+    """Unique-ish string columns are generated instead of modeled as categories."""
+    num_rows = 200
+    file_df = pd.DataFrame({
+        'file_id': [f"file_{i}" for i in range(num_rows)],
+        'dmd_id': [f"dmd_{i % 20}" for i in range(num_rows)],
+        'mimetype': ['image/tiff', 'application/pdf'] * (num_rows // 2),
+        'checksum': [f"{i * 7919:040x}" for i in range(num_rows)],
+        'href': [f"files/page_{i:04d}.xml" for i in range(num_rows)],
+    })
+    dmdsec_df = pd.DataFrame({
+        'dmd_id': [f"dmd_{i}" for i in range(20)],
+        'dc_title': [f"Title number {i}" for i in range(20)],
+    })
+    structmap_df = pd.DataFrame({
+        'struct_id': [f"div_{i}" for i in range(20)],
+        'dmd_id': [f"dmd_{i}" for i in range(20)],
+        'parent_id': [None] * 20,
+        'label': [' '.join(['word'] * (i % 5 + 1)) + f" {i}" for i in range(20)],
+    })
+
+    tables = {'dmdSec': dmdsec_df, 'file': file_df, 'structMap': structmap_df}
+
+    specs = MetadataBuilder(config).infer_column_specs(tables)
+    assert specs['file']['mimetype'] == {'sdtype': 'categorical'}
+    assert specs['file']['checksum'] == {'sdtype': 'id', 'regex_format': '[0-9a-f]{40}'}
+    assert specs['file']['href'] == {'sdtype': 'id', 'regex_format': '[a-z]{5}/[a-z]{4}_[0-9]{4}\\.[a-z]{3}'}
+    # Too few rows to profile reliably
+    assert specs['structMap']['label'] == {'sdtype': 'categorical'}
+
+    specs = MetadataBuilder({**config, 'metadata': {'min_profile_rows': 20}}).infer_column_specs(tables)
+    assert specs['dmdSec']['dc_title'] == {'sdtype': 'id', 'regex_format': '[A-Za-z]{5}\\ [a-z]{6}\\ [0-9]{1,2}'}
+    assert specs['structMap']['label'] == {'sdtype': 'text'}
@@ -0,0 +1,122 @@
+"""
+Tests for reusing saved models, sampling and the backends of GenerativeModel.
+"""
+
+import copy
+import os
+
+import pandas as pd
+import pytest
+
+from src.data_archive_ml_synthesizer.benchmark import fidelity_scores
+from src.data_archive_ml_synthesizer.fast_synthesizer import FastSynthesizer
+from src.data_archive_ml_synthesizer.model import GenerativeModel
+
+
+def test_saved_model_reused_until_inputs_change(config, tables, metadata, tmp_path):
+    """A saved model is loaded for identical inputs and retrained when the model config changes."""
+    config = copy.deepcopy(config)
+    config['cache'] = {'enabled': True}
+    config['output']['model_path'] = str(tmp_path / 'model.pkl')
+
+    first = GenerativeModel(config)
+    first.train(tables, metadata)
+    assert not first.reused
+    assert os.path.exists(tmp_path / 'model.pkl.manifest.json')
+
+    second = GenerativeModel(config)
+    second.train(tables, metadata)
+    assert second.reused
+    assert set(second.sample()) == set(tables)
+
+    config['model']['random_seed'] = 7
+    third = GenerativeModel(config)
+    third.train(tables, metadata)
+    assert not third.reused
+
+
+def test_sample_matches_requested_sizes(config, tables, metadata):
+    """Sampling scales dmdSec to the requested size and keeps child references consistent."""
+    model = GenerativeModel(config)
+    model.train(tables, metadata)
+
+    requested = len(tables['dmdSec']) * 2
+    synthetic = model.sample({'dmdSec': requested, 'file': 5})
+    assert len(synthetic['dmdSec']) == requested
+    assert len(synthetic['file']) <= 5
+    assert synthetic['file']['dmd_id'].isin(synthetic['dmdSec']['dmd_id']).all()
+
+
+def test_sample_is_reproducible(config, model):
+    """The same seed gives identical tables, also after other samples were drawn."""
+    first = model.sample({'dmdSec': 4}, seed=3)
+    model.sample({'dmdSec': 4}, seed=5)
+    second = model.sample({'dmdSec': 4}, seed=3)
+    for table_name in first:
+        assert first[table_name].equals(second[table_name])
+
+
+def test_seeds_give_different_samples(config, model):
+    """Different seeds give different tables, also with the HMA synthesizer which keeps its own seed."""
+    first = model.sample({'dmdSec': 4}, seed=3)
+    second = model.sample({'dmdSec': 4}, seed=5)
+    columns = [column for column in first['dmdSec'].columns if column != 'dmd_id']
+    assert not first['dmdSec'][columns].equals(second['dmdSec'][columns])
+
+
+def test_fast_backend(config, tables, metadata):
+    """The fast backend samples the requested dmdSec rows with valid references and can be benchmarked."""
+    config = copy.deepcopy(config)
+    config['model']['type'] = 'fast'
+    config['output']['model_path'] = None
+
+    model = GenerativeModel(config)
+    model.train(tables, metadata)
+    synthetic = model.sample({'dmdSec': 50})
+    assert len(synthetic['dmdSec']) == 50
+    assert synthetic['file']['dmd_id'].isin(synthetic['dmdSec']['dmd_id']).all()
+    assert synthetic['structMap']['dmd_id'].isin(synthetic['dmdSec']['dmd_id']).all()
+
+    scores = fidelity_scores(tables, synthetic, metadata)
+    assert 0 <= scores['overall'] <= 1
+    assert fidelity_scores(tables, tables, metadata)['overall'] == 1
+
+
+def test_fast_backend_fit_is_independent_of_workers(config, tables, metadata, monkeypatch):
+    """Fitting the tables concurrently gives the same model as fitting them one after another."""
+    monkeypatch.setattr('src.data_archive_ml_synthesizer.fast_synthesizer.CONCURRENT_FIT_ROWS', 0)
+    samples = []
+    for workers in (1, 3):
+        config = copy.deepcopy(config)
+        config['model'].update({'type': 'fast', 'fit_workers': workers})
+        config['output']['model_path'] = None
+        model = GenerativeModel(config)
+        model.train(tables, metadata)
+        samples.append(model.sample({'dmdSec': 20}, seed=1))
+    for table_name in samples[0]:
+        assert samples[0][table_name].equals(samples[1][table_name])
+
+
+def test_fast_backend_mixed_object_columns():
+    """Tables Arrow cannot share are fitted one after another instead of failing."""
+    pytest.importorskip('pyarrow')
+    metadata = {'tables': {'table': {'primary_key': 'id', 'columns': {'v': {'sdtype': 'categorical'}}}}}
+    df = pd.DataFrame({'id': ['A', 'B', 'C', 'D'], 'v': [1, 'two', 3.5, None]})
+
+    synthesizer = FastSynthesizer(metadata, random_seed=0, workers=2)
+    assert not synthesizer._fit_tables_concurrently({'table': df}, {'table': ({}, ['id'], 1)}, 2)
+    synthesizer.fit({'table': df})
+    assert len(synthesizer.sample()['table']) == 4
+
+
+def test_fast_backend_refuses_unresolvable_relationships():
+    """Self-referencing tables and parents without a model fail instead of sampling forever."""
+    metadata = {
+        'tables': {'structMap': {'primary_key': 'struct_id', 'columns': {}}},
+        'relationships': [{'parent_table_name': 'structMap', 'parent_primary_key': 'struct_id',
+                           'child_table_name': 'structMap', 'child_foreign_key': 'parent_id'}],
+    }
+    synthesizer = FastSynthesizer(metadata, random_seed=0)
+    synthesizer.fit({'structMap': pd.DataFrame({'struct_id': ['S1', 'S2', 'S3'], 'parent_id': [None, 'S1', 'S1']})})
+    with pytest.raises(ValueError, match="structMap.struct_id -> structMap.parent_id"):
+        synthesizer.sample()
@@ -0,0 +1,39 @@
+"""
+Tests for running the pipeline stages separately.
+"""
+
+import copy
+import os
+
+import pytest
+from lxml import etree
+
+from src.data_archive_ml_synthesizer.pipeline import Pipeline
+from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+
+
+def test_stages_exchange_artifacts(config, tmp_path):
+    """Each stage runs from the artifacts written by the previous one."""
+    config = copy.deepcopy(config)
+    config['output'] = {
+        'metadata_path': str(tmp_path / 'metadata.yaml'),
+        'model_path': str(tmp_path / 'model.pkl'),
+        'xml_output_path': str(tmp_path / 'synthetic_mets.xml'),
+        'synthetic_data_paths': {
+            table_name: str(tmp_path / f"synthetic_{table_name}.json")
+            for table_name in ('dmdSec', 'file', 'structMap')
+        },
+    }
+
+    with pytest.raises(ValueError, match="run the train command first"):
+        Pipeline(config).sample()
+
+    Pipeline(config).train()
+    synthetic_data = Pipeline(config).sample()
+    for file_path in config['output']['synthetic_data_paths'].values():
+        assert os.path.exists(file_path)
+
+    Pipeline(config).reassemble()
+    root = etree.parse(config['output']['xml_output_path']).getroot()
+    dmdsecs = root.findall('mets:dmdSec', XMLReassembler.NAMESPACES)
+    assert len(dmdsecs) == len(synthetic_data['dmdSec'])
@@ -0,0 +1,130 @@
+"""
+Tests for batched and parallel sampling in the Sampler.
+"""
+
+import copy
+import json
+
+import pytest
+from lxml import etree
+
+from src.data_archive_ml_synthesizer.model import DEFAULT_TABLE_ROWS
+from src.data_archive_ml_synthesizer.reassembler import XMLReassembler
+from src.data_archive_ml_synthesizer.sampler import Sampler
+
+
+def test_batches_are_self_contained(config, model, tmp_path):
+    """Batches keep their references, IDs are unique across batches and outputs are written incrementally."""
+    config = copy.deepcopy(config)
+    config['output']['synthetic_data_paths'] = {'dmdSec': str(tmp_path / 'dmdSec.json')}
+    num_rows = {'dmdSec': 5, 'file': 8}
+
+    batches = list(Sampler(config, model).iter_batches(batch_size=2, num_rows=num_rows))
+    assert [len(batch['dmdSec']) for batch in batches] == [2, 2, 1]
+
+    dmd_ids = [dmd_id for batch in batches for dmd_id in batch['dmdSec']['dmd_id']]
+    assert len(set(dmd_ids)) == len(dmd_ids)
+    for batch in batches:
+        assert batch['file']['dmd_id'].isin(batch['dmdSec']['dmd_id']).all()
+
+    with open(tmp_path / 'dmdSec.json') as f:
+        assert [record['dmd_id'] for record in json.load(f)] == dmd_ids
+
+
+def test_reassemble_batches(config, model, tmp_path):
+    """The incrementally written document holds the dmdSecs of every batch."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+    output_path = tmp_path / 'batched.xml'
+
+    batches = Sampler(config, model).iter_batches(batch_size=2, num_rows={'dmdSec': 3})
+    assert XMLReassembler(config).reassemble_batches(batches, str(output_path)) == 3
+
+    root = etree.parse(str(output_path)).getroot()
+    assert len(root.findall('mets:dmdSec', XMLReassembler.NAMESPACES)) == 3
+    assert len(root.findall('mets:structMap', XMLReassembler.NAMESPACES)) == 1
+
+
+def test_parallel_sample_is_reproducible(config, model):
+    """The same seed and shard count give identical merged shards with disjoint IDs."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+    num_rows = {'dmdSec': 6, 'file': 8}
+
+    first = Sampler(config, model).parallel_sample(num_rows=num_rows, workers=2, shards=3)
+    second = Sampler(config, model).parallel_sample(num_rows=num_rows, workers=3, shards=3)
+    assert len(first['dmdSec']) == 6
+    assert first['dmdSec']['dmd_id'].is_unique
+    for table_name in first:
+        assert first[table_name].equals(second[table_name])
+
+
+def test_parallel_sample_default_rows_do_not_grow_with_shards(config, model):
+    """Without configured row counts, the shards together sample the default rows once."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+    config['sampling'] = {key: value for key, value in config['sampling'].items() if key != 'num_rows'}
+
+    merged = Sampler(config, model).parallel_sample(workers=1, shards=4)
+    assert len(merged['dmdSec']) == DEFAULT_TABLE_ROWS
+
+
+def test_parallel_shards_differ(config, model):
+    """Shards are sampled with their own seeds, so their non-key columns are not copies of each other."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+
+    merged = Sampler(config, model).parallel_sample(num_rows={'dmdSec': 8}, workers=1, shards=2)
+    dmdsec = merged['dmdSec']
+    shards = [dmdsec[dmdsec['dmd_id'].str.startswith(f"s{index}_")] for index in range(2)]
+    columns = [column for column in dmdsec.columns if column != 'dmd_id']
+    assert not shards[0][columns].reset_index(drop=True).equals(shards[1][columns].reset_index(drop=True))
+
+
+def test_conditional_sample_groups_conditions(config, model):
+    """Identical conditions are merged and the matching rows come with their records and children."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+    conditions = [
+        {'table': 'file', 'column_values': {'mimetype': 'image/jpeg'}, 'num_rows': 3},
+        {'table': 'file', 'column_values': {'mimetype': 'image/jpeg'}, 'num_rows': 2},
+        {'table': 'dmdSec', 'column_values': {'dc_type': 'Text'}, 'num_rows': 2},
+    ]
+
+    sampler = Sampler(config, model)
+    synthetic_data = sampler.conditional_sample(conditions)
+    assert len(sampler.condition_report) == 2
+    files = sampler.condition_report[0]
+    assert files['requested'] == 5
+    assert files['sampled'] == 5
+    assert 0 <= files['rejection_rate'] < 1
+
+    assert (synthetic_data['file']['mimetype'] == 'image/jpeg').sum() >= 5
+    assert synthetic_data['dmdSec']['dmd_id'].is_unique
+    assert synthetic_data['file']['dmd_id'].isin(synthetic_data['dmdSec']['dmd_id']).all()
+    structmap = synthetic_data['structMap']
+    assert structmap['file_id'].dropna().isin(synthetic_data['file']['file_id']).all()
+
+
+def test_conditional_batches_are_not_repeats(config, model):
+    """Every rejection-sampling batch draws new candidates instead of repeating the first batch."""
+    config = copy.deepcopy(config)
+    config['output'].pop('synthetic_data_paths', None)
+    config['sampling'] = dict(config['sampling'], batch_size=2)
+
+    sampler = Sampler(config, model)
+    synthetic_data = sampler.conditional_sample([{'table': 'dmdSec', 'column_values': {'dc_type': 'Text'},
+                                                  'num_rows': 4}])
+    assert sampler.condition_report[0]['batches'] >= 2
+    dmdsec = synthetic_data['dmdSec']
+    batches = dmdsec.groupby(dmdsec['dmd_id'].str.extract(r'^g0_(\d+)_', expand=False))
+    columns = [column for column in dmdsec.columns if column != 'dmd_id']
+    rows = [frozenset(map(tuple, df[columns].astype(str).to_numpy())) for _, df in batches]
+    assert len(set(rows)) == len(rows)
+
+
+def test_conditional_sample_rejects_unknown_columns(config, model):
+    """Conditions on columns the model does not know are refused."""
+    with pytest.raises(ValueError, match="unknown table or columns"):
+        Sampler(config, model).conditional_sample([{'table': 'file', 'column_values': {'colour': 'red'},
+                                                    'num_rows': 1}])
@@ -0,0 +1,54 @@
+"""
+Tests for the StructMapTreeModel.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.data_archive_ml_synthesizer.structmap_tree import StructMapTreeModel
+
+
+def test_generated_hierarchy_is_valid(tables):
+    """Every generated parent_id refers to an earlier division and file pointers refer to known files."""
+    model = StructMapTreeModel().fit(tables['structMap'])
+    assert model.fitted
+
+    rows = pd.concat([tables['structMap']] * 20, ignore_index=True)
+    rows['struct_id'] = [f"S{i}" for i in range(len(rows))]
+    result = model.sample(rows, tables['file'], np.random.default_rng(0))
+
+    assert len(result) == len(rows)
+    positions = pd.Index(result['struct_id']).get_indexer(result['parent_id'])
+    has_parent = result['parent_id'].notna().to_numpy()
+    assert (positions[has_parent] >= 0).all()
+    assert (positions[has_parent] < np.flatnonzero(has_parent)).all()
+    assert result['file_id'].dropna().isin(tables['file']['file_id']).all()
+    assert (result['order'] >= 1).all()
+
+
+def test_parameters_round_trip(tables):
+    """The learned parameters survive serialization and give the same trees for the same seed."""
+    model = StructMapTreeModel().fit(tables['structMap'])
+    restored = StructMapTreeModel.from_dict(model.to_dict())
+
+    first = model.sample(tables['structMap'], tables['file'], np.random.default_rng(1))
+    second = restored.sample(tables['structMap'], tables['file'], np.random.default_rng(1))
+    assert first.equals(second)
+
+
+def test_trees_and_files_stay_within_their_dmdsec(tables):
+    """Parents and file pointers of every generated division belong to the division's own dmdSec."""
+    model = StructMapTreeModel().fit(tables['structMap'])
+    rows = pd.concat([tables['structMap']] * 20, ignore_index=True)
+    rows['struct_id'] = [f"S{i}" for i in range(len(rows))]
+    result = model.sample(rows, tables['file'], np.random.default_rng(0))
+
+    assert sorted(result['dmd_id']) == sorted(rows['dmd_id'])
+    dmd_of_div = result.set_index('struct_id')['dmd_id']
+    children = result[result['parent_id'].notna()]
+    assert (dmd_of_div[children['parent_id']].to_numpy() == children['dmd_id'].to_numpy()).all()
+
+    dmd_of_file = tables['file'].set_index('file_id')['dmd_id']
+    pointers = result[result['file_id'].notna()]
+    assert len(pointers)
+    assert (dmd_of_file[pointers['file_id']].to_numpy() == pointers['dmd_id'].to_numpy()).all()
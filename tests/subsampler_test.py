@@ -0,0 +1,35 @@
+"""
+Tests for the training Subsampler.
+"""
+
+import copy
+
+from src.data_archive_ml_synthesizer.integrity import ReferentialIntegrityChecker
+from src.data_archive_ml_synthesizer.subsampler import Subsampler
+
+
+def test_subsample_keeps_whole_subtrees(config, tables):
+    """Selected dmdSec records keep all their files and divs, and references stay valid."""
+    subsample_config = copy.deepcopy(config)
+    subsample_config['subsample'] = {'enabled': True, 'max_rows': 12, 'method': 'stratified'}
+
+    sample = Subsampler(subsample_config).subsample(tables)
+
+    selected = set(sample['dmdSec']['dmd_id'])
+    assert 0 < len(selected) < len(tables['dmdSec'])
+    assert set(sample['file']['dmd_id']) <= selected
+    assert len(sample['file']) == tables['file']['dmd_id'].isin(selected).sum()
+    assert len(sample['structMap']) == tables['structMap']['dmd_id'].isin(selected).sum()
+
+    _, report = ReferentialIntegrityChecker({'input': {}}).check(sample)
+    assert ReferentialIntegrityChecker.is_clean(report)
+
+
+def test_subsample_is_deterministic(config, tables):
+    """The same seed selects the same records."""
+    subsample_config = copy.deepcopy(config)
+    subsample_config['subsample'] = {'enabled': True, 'max_rows': 12, 'method': 'random'}
+
+    first = Subsampler(subsample_config).subsample(tables)
+    second = Subsampler(subsample_config).subsample(tables)
+    assert first['dmdSec']['dmd_id'].tolist() == second['dmdSec']['dmd_id'].tolist()